@@ -1,8 +1,21 @@
 """A library for managing and documenting user-supplied configurations"""
 
-__all__ = ["Config", "EMPTY", "Key", "SUBKEYS", "validators"]
+__all__ = ["CompactConfig", "Config", "EMPTY", "Key", "SUBKEYS", "validators"]
+
+from importlib import import_module
+from typing import Any
 
 from . import validators
-from .config import Config
+from .config import CompactConfig, Config
 from .key import EMPTY, Key, SUBKEYS
 from .version import __version__
+
+
+_LAZY_SUBMODULES = {"exporter", "loader", "reload", "sphinx"}
+"""submodules that are only imported when they are first accessed as attributes of this module"""
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_SUBMODULES:
+        return import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
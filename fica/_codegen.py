@@ -0,0 +1,342 @@
+"""Generating specialized population and validation routines for config classes"""
+
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from .config import _KeySchema, CompactConfig, Config
+from .key import EMPTY, Key, SUBKEYS
+
+
+PopulateFunction = Callable[[Config, Dict[str, Any], bool], bool]
+"""the type of generated population routines, which accept the config being created, the user
+config, and ``require_valid_keys`` and return whether they populated the config"""
+
+CheckFunction = Callable[[Dict[str, Any], bool], bool]
+"""the type of generated validation routines, which accept the user config and
+``require_valid_keys`` and return whether the user config is valid"""
+
+
+GENERATE_AFTER = 32
+"""the number of times configs of a class are created or checked with the generic routines before
+specialized routines are generated for it; generating them takes about as long as populating a
+config from a full user config several dozen times, so they aren't generated for classes that are
+only used a few times"""
+
+SPARSE_FACTOR = 4
+"""generated routines loop over the user config instead of looking up each key of the config class
+in turn when the user config has fewer than ``1 / SPARSE_FACTOR`` as many keys as the class"""
+
+
+_TYPE_ERROR = "User-specified value is not of the correct type"
+
+
+def _get_store_mode(config_cls: Type[Config]) -> Optional[str]:
+    """
+    Determine how a config class stores the values of its keys: in the instance ``__dict__``
+    (``"dict"``) or in the ``_values`` list of compact configs (``"compact"``). Returns ``None`` if
+    the class overrides how values are stored.
+    """
+    store, set_defaults = config_cls._store_value, config_cls._set_constant_defaults
+    if store is Config._store_value and set_defaults is Config._set_constant_defaults:
+        return "dict"
+    if store is CompactConfig._store_value and \
+            set_defaults is CompactConfig._set_constant_defaults:
+        return "compact"
+    return None
+
+
+def _can_generate(schema: _KeySchema, method: str) -> bool:
+    """
+    Determine whether routines can be generated for a schema, i.e. whether no two of its keys have
+    the same name and none of its keys override :py:meth:`fica.Key.get_value`,
+    :py:meth:`fica.Key.use_default`, or the method of :py:class:`fica.Key` whose behavior the
+    routine inlines.
+    """
+    return len(schema.compiled_attrs) == len(schema.keys) == len(schema.names_to_attrs) and \
+        all(getattr(type(k), method) is getattr(Key, method) for k in schema.keys.values())
+
+
+def _define_keys(namespace: Dict[str, Any], schema: _KeySchema) -> None:
+    """
+    Add the objects that generated code refers to for the key at each position ``i`` to the
+    namespace that the code is executed in.
+    """
+    for i, key in enumerate(schema.keys.values()):
+        namespace.update({
+            f"K{i}": key,
+            f"T{i}": key.type_,
+            f"V{i}": key.validator,
+            f"S{i}": key.subkey_container,
+            f"F{i}": key.factory,
+            f"D{i}": key.default,
+        })
+
+
+def _execute(lines: List[str], config_cls: Type[Config], namespace: Dict[str, Any]) -> Callable:
+    """
+    Execute generated source code that defines a single function and return the function.
+    """
+    name = lines[0][4:lines[0].index("(")]
+    exec(compile("\n".join(lines), f"<fica {name} {config_cls.__qualname__}>", "exec"), namespace)
+    return namespace[name]
+
+
+def _compile_value(lines: List[str], i: int, key: Key, indent: str) -> None:
+    """
+    Add the lines that compute the value of a key from the user-specified value ``v``, which is not
+    :py:data:`fica.EMPTY`, to the generated source.
+    """
+    if key.type_ is not None:
+        cond = f"not isinstance(v, T{i})"
+        if key.allow_none:
+            cond = f"v is not None and {cond}"
+        lines.append(f"{indent}if {cond}:")
+        lines.append(f"{indent}    raise TypeError({_TYPE_ERROR!r})")
+
+    if key.validator is not None:
+        lines.append(f"{indent}err = V{i}.validate(v)")
+        lines.append(f"{indent}if err is not None:")
+        lines.append(
+            f"{indent}    raise ValueError(f'User-specified value failed validation: {{err}}')")
+
+    if key.subkey_container is not None:
+        lines.append(f"{indent}if isinstance(v, dict):")
+        lines.append(f"{indent}    v = S{i}(v, require_valid_keys=require_valid_keys)")
+        if key.enforce_subkeys:
+            lines.append(f"{indent}else:")
+            lines.append(f"{indent}    raise ValueError("
+                "'Cannot override subkeys for a key with enforced subkeys')")
+
+
+def _compile_default(i: int, key: Key) -> str:
+    """
+    Get an expression that computes the default value of a key that isn't a constant, or a
+    statement that raises an error if the key is required.
+    """
+    if key.required:
+        return "raise ValueError('Key is required but there is no user-specified value')"
+    if key.default is SUBKEYS:
+        if key.share_default:
+            return f"S{i}._get_shared_default()"
+        return f"S{i}(require_valid_keys=False)"
+    if key.factory:
+        return f"F{i}()"
+    return f"D{i}"
+
+
+def compile_populate(config_cls: Type[Config], schema: _KeySchema) -> Optional[PopulateFunction]:
+    """
+    Generate a function that populates a new instance of a config class from a user config in the
+    same way as :py:meth:`fica.Config._populate`, with the names, defaults, and checks of each key
+    inlined.
+
+    The generated function returns ``False`` if it can't be used for a user config: if the instance
+    ``__dict__`` of a regular config isn't empty (e.g. because a subclass set a key before calling
+    ``Config.__init__``), if ``require_valid_keys`` is true and the user config contains unexpected
+    keys, or if computing the value of a key raises an error. In each case, the values of the keys
+    of the config are left unset so that the caller can fall back to
+    :py:meth:`fica.Config._populate`, which raises the same errors (wrapped with the names of the
+    keys that caused them) in the order of the user config.
+
+    Args:
+        config_cls (``type[fica.Config]``): the config class
+        schema (``_KeySchema``): the schema of the config class
+
+    Returns:
+        ``callable[[fica.Config, dict[str, object], bool], bool] | None``: the generated function,
+        or ``None`` if the class has keys or storage that the generated code can't handle
+    """
+    mode = _get_store_mode(config_cls)
+    if mode is None or config_cls._populate is not Config._populate or \
+            not _can_generate(schema, "_compile_plan"):
+        return None
+
+    # values are stored in the instance __dict__ by attribute name or in the values list by position
+    container = "d" if mode == "dict" else "values"
+    targets = {a: repr(a) if mode == "dict" else str(i) for a, i in schema.positions.items()}
+
+    namespace: Dict[str, Any] = {
+        "EMPTY": EMPTY,
+        "NAMES": frozenset(schema.names_to_attrs),
+        "CONSTANTS": schema.constant_defaults,
+        "LAYOUT": schema.compact_layout,
+        "ENTRIES": {
+            n: (a if mode == "dict" else schema.positions[a], 1 << schema.positions[a],
+                schema.keys[a]._plan)
+            for n, a in schema.names_to_attrs.items()
+        },
+        "set_internal": object.__setattr__,
+    }
+    _define_keys(namespace, schema)
+
+    lines = ["def populate(self, user_config, require_valid_keys):"]
+    if mode == "dict":
+        lines.append("    d = self.__dict__")
+        lines.append("    if d:")
+        lines.append("        return False")
+    else:
+        lines.append("    values = self._values")
+    lines.append("    if require_valid_keys and not user_config.keys() <= NAMES:")
+    lines.append("        return False")
+    lines.append("    try:")
+    if mode == "dict" and schema.constant_defaults:
+        lines.append("        d.update(CONSTANTS)")
+    lines.append("        provided = defaulted = 0")
+
+    # compute the values of the keys specified by the user, either by calling the plans of the keys
+    # in the user config (which is faster if there are only a few of them) or by looking up each key
+    # in turn
+    indent = " " * 8
+    threshold = len(schema.keys) // SPARSE_FACTOR
+    if threshold:
+        lines.append(f"        if len(user_config) < {threshold}:")
+        lines.append("            for name, v in user_config.items():")
+        lines.append("                entry = ENTRIES.get(name)")
+        lines.append("                if entry is not None and v is not EMPTY:")
+        lines.append("                    target, bit, plan = entry")
+        lines.append(f"                    {container}[target] = plan(v, require_valid_keys)")
+        lines.append("                    provided |= bit")
+        lines.append("        else:")
+        indent = " " * 12
+
+    lines.append(f"{indent}get = user_config.get")
+    for i, (a, key) in enumerate(schema.keys.items()):
+        lines.append(f"{indent}v = get({schema.attrs_to_names[a]!r}, EMPTY)")
+        lines.append(f"{indent}if v is not EMPTY:")
+        _compile_value(lines, i, key, indent + "    ")
+        lines.append(f"{indent}    {container}[{targets[a]}] = v")
+        lines.append(f"{indent}    provided |= {1 << i}")
+
+    # compute the defaults of the keys that weren't specified and whose defaults aren't constant
+    for a in schema.computed_defaults.values():
+        i, key = schema.positions[a], schema.keys[a]
+        unset = f"{targets[a]} not in d" if mode == "dict" else f"values[{i}] is K{i}"
+        default = _compile_default(i, key)
+        lines.append(f"        if {unset}:")
+        if default.startswith("raise "):
+            lines.append(f"            {default}")
+        else:
+            lines.append(f"            {container}[{targets[a]}] = {default}")
+            lines.append(f"            defaulted |= {1 << i}")
+
+    # discard any values that were set if an error occurs so that the caller can fall back to
+    # Config._populate
+    lines.append("    except Exception:")
+    lines.append("        d.clear()" if mode == "dict" else "        values[:] = LAYOUT")
+    lines.append("        return False")
+
+    if schema.constant_defaults_mask:
+        lines.append(f"    defaulted |= {schema.constant_defaults_mask} & ~provided")
+    lines.append("    set_internal(self, '_defaulted', defaulted)")
+    lines.append("    return True")
+
+    return _execute(lines, config_cls, namespace)
+
+
+def _compile_check(lines: List[str], i: int, key: Key, indent: str) -> None:
+    """
+    Add the lines that return ``False`` if :py:meth:`fica.Key._iter_errors` would find any errors in
+    the user-specified value ``v``, which is not :py:data:`fica.EMPTY`, to the generated source.
+    """
+    if key.type_ is not None:
+        cond = f"not isinstance(v, T{i})"
+        if key.allow_none:
+            cond = f"v is not None and {cond}"
+        lines.append(f"{indent}if {cond}:")
+        lines.append(f"{indent}    return False")
+
+    if key.validator is not None:
+        # errors raised by validators make the value invalid
+        lines.append(f"{indent}try:")
+        lines.append(f"{indent}    if V{i}.validate(v) is not None:")
+        lines.append(f"{indent}        return False")
+        lines.append(f"{indent}except Exception:")
+        lines.append(f"{indent}    return False")
+
+    if key.subkey_container is not None:
+        lines.append(f"{indent}if isinstance(v, dict):")
+        lines.append(f"{indent}    if not S{i}.is_valid(v, require_valid_keys):")
+        lines.append(f"{indent}        return False")
+        if key.enforce_subkeys:
+            lines.append(f"{indent}else:")
+            lines.append(f"{indent}    return False")
+
+
+def _compile_default_check(i: int, key: Key) -> Optional[str]:
+    """
+    Get a condition that is true if :py:meth:`fica.Key._iter_errors` would find any errors when a
+    key isn't specified by the user, or ``None`` if it never would.
+    """
+    if key.required:
+        return "True"
+    if key.default is SUBKEYS:
+        return f"not S{i}.is_valid({{}}, require_valid_keys)"
+    return None
+
+
+def compile_check(config_cls: Type[Config], schema: _KeySchema) -> Optional[CheckFunction]:
+    """
+    Generate a function that determines whether a config can be created from a user config in the
+    same way as :py:meth:`fica.Config.is_valid`, with the names and checks of each key inlined.
+
+    The generated function assumes that the user config has already been checked with
+    :py:meth:`fica.Config._validate_user_config`.
+
+    Args:
+        config_cls (``type[fica.Config]``): the config class
+        schema (``_KeySchema``): the schema of the config class
+
+    Returns:
+        ``callable[[dict[str, object], bool], bool] | None``: the generated function, or ``None``
+        if the class has keys that the generated code can't handle
+    """
+    if config_cls._iter_errors.__func__ is not Config._iter_errors.__func__ or \
+            not _can_generate(schema, "_iter_errors"):
+        return None
+
+    namespace: Dict[str, Any] = {
+        "EMPTY": EMPTY,
+        "NAMES": frozenset(schema.names_to_attrs),
+        "KEYS": {n: schema.keys[a] for n, a in schema.names_to_attrs.items()},
+    }
+    _define_keys(namespace, schema)
+
+    lines = ["def check(user_config, require_valid_keys):"]
+    lines.append("    if require_valid_keys and not user_config.keys() <= NAMES:")
+    lines.append("        return False")
+    lines.append("    get = user_config.get")
+
+    # check the keys specified by the user in the same way as populate above
+    indent = " " * 4
+    threshold = len(schema.keys) // SPARSE_FACTOR
+    if threshold:
+        lines.append(f"    if len(user_config) < {threshold}:")
+        lines.append("        for name, v in user_config.items():")
+        lines.append("            key = KEYS.get(name)")
+        lines.append("            if key is not None and v is not EMPTY:")
+        lines.append("                for _ in key._iter_errors(v, require_valid_keys):")
+        lines.append("                    return False")
+        lines.append("    else:")
+        indent = " " * 8
+
+    for i, (a, key) in enumerate(schema.keys.items()):
+        lines.append(f"{indent}v = get({schema.attrs_to_names[a]!r}, EMPTY)")
+        lines.append(f"{indent}if v is not EMPTY:")
+        before = len(lines)
+        _compile_check(lines, i, key, indent + "    ")
+        if len(lines) == before:
+            # the key accepts any value, so there is nothing to check
+            del lines[-2:]
+    if lines[-1].endswith("else:"):
+        lines.append(f"{indent}pass")
+
+    # check the keys that weren't specified and whose defaults aren't constant
+    for a in schema.computed_defaults.values():
+        i, key = schema.positions[a], schema.keys[a]
+        cond = _compile_default_check(i, key)
+        if cond is not None:
+            lines.append(f"    if get({schema.attrs_to_names[a]!r}, EMPTY) is EMPTY and {cond}:")
+            lines.append("        return False")
+
+    lines.append("    return True")
+
+    return _execute(lines, config_cls, namespace)
@@ -0,0 +1,38 @@
+"""
+The ``fica`` Sphinx directive, which is kept separate from :py:mod:`fica.sphinx` so that Sphinx and
+docutils are only imported when it is needed
+"""
+
+from docutils.parsers.rst import directives
+from sphinx.directives.code import CodeBlock
+from sphinx.util.typing import OptionSpec
+
+from . import sphinx as fica_sphinx
+
+
+class FicaDirective(CodeBlock):
+    """
+    A Sphinx directive for documenting a :py:class:`fica.Config` object.
+
+    This directive subclasses Sphinx's code block directive, and so the resulting documentation
+    string for the config object is displayed as a Sphinx code block with Pygments syntax
+    highlighting. The behavior of Sphinx's underlying code block arguments are unaffected.
+    """
+
+    option_spec: OptionSpec = {
+        **CodeBlock.option_spec,
+        "format": directives.unchanged,
+    }
+
+    def run(self):
+        """
+        Import the config object and update ``self.content`` to contain the code for the code block.
+        """
+        if "format" not in self.options:
+            self.options["format"] = "yaml"
+
+        self.content = \
+            fica_sphinx.get_export(self.env, self.arguments[0], self.options["format"]).split("\n")
+        self.arguments[0] = \
+            fica_sphinx.LEXER_OVERRIDES.get(self.options["format"], self.options["format"])
+        return super().run()
@@ -0,0 +1,137 @@
+"""YAML I/O helpers that use libyaml when it is available"""
+
+import re
+import yaml
+
+from typing import Any
+
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
+
+
+try:
+    from yaml import CDumper as _CDumper
+    from yaml.cyaml import CParser as _CParser
+except ImportError:
+    _CDumper = _CParser = None
+
+
+LIBYAML_AVAILABLE = _CDumper is not None
+"""whether PyYAML was built with libyaml"""
+
+
+_SAFE_STRING = re.compile(r"[\x20-\x7e]*\Z")
+"""strings that libyaml's emitter formats in the same way as PyYAML's"""
+
+_SAFE_SCALAR_TYPES = (bool, float, int, type(None))
+"""the (exact) types of non-string scalars that libyaml's emitter formats in the same way as
+PyYAML's"""
+
+_MAX_SAFE_KEY_LENGTH = 100
+"""the length of the longest mapping key that libyaml's emitter formats in the same way as
+PyYAML's (the emitters decide differently whether keys of around 128 characters are simple)"""
+
+
+def _emits_identically(value: Any, root: bool = True) -> bool:
+    """
+    Determine whether libyaml's emitter is guaranteed to produce the same output as PyYAML's for a
+    value.
+
+    The emitters differ in how they fold and escape strings containing non-printable or non-ASCII
+    characters, in how they emit empty and long mapping keys, and in whether they end documents
+    containing only a scalar with ``...``, so only lists and dicts of printable ASCII strings and
+    simple scalars are considered safe.
+    """
+    if type(value) is list:
+        return all(_emits_identically(v, False) for v in value)
+
+    if type(value) is dict:
+        return all(
+            type(k) is str and 0 < len(k) <= _MAX_SAFE_KEY_LENGTH and \
+                _SAFE_STRING.match(k) is not None and _emits_identically(v, False)
+            for k, v in value.items()
+        )
+
+    if root:
+        return False
+
+    if type(value) is str:
+        return _SAFE_STRING.match(value) is not None
+
+    return type(value) in _SAFE_SCALAR_TYPES
+
+
+def dump(value: Any, **kwargs) -> str:
+    """
+    Dump a value to a YAML string in the same way as ``yaml.dump``, using libyaml's emitter when it
+    is available and produces the same output as PyYAML's.
+
+    Args:
+        value (``object``): the value to dump
+        **kwargs: additional keyword arguments passed to ``yaml.dump``
+
+    Returns:
+        ``str``: the YAML string
+    """
+    dumper = _CDumper if LIBYAML_AVAILABLE and _emits_identically(value) else yaml.Dumper
+    return yaml.dump(value, Dumper=dumper, **kwargs)
+
+
+def has_aliases(value: Any) -> bool:
+    """
+    Determine whether dumping a value would create any anchors and aliases, i.e. whether any
+    object that the representer doesn't ignore aliases for occurs in it more than once.
+
+    Args:
+        value (``object``): the value to check
+
+    Returns:
+        ``bool``: whether the dumped value would contain aliases
+    """
+    seen, stack = set(), [value]
+    while stack:
+        v = stack.pop()
+        if yaml.representer.SafeRepresenter.ignore_aliases(None, v):
+            continue
+        if id(v) in seen:
+            return True
+        seen.add(id(v))
+        if isinstance(v, dict):
+            stack.extend(v.keys())
+            stack.extend(v.values())
+        elif isinstance(v, (list, tuple, set, frozenset)):
+            stack.extend(v)
+    return False
+
+
+def safe_load(stream: Any) -> Any:
+    """
+    Load a YAML document in the same way as ``yaml.safe_load``, using libyaml's parser when it is
+    available.
+
+    Args:
+        stream (``str | bytes | typing.IO``): the document
+
+    Returns:
+        ``object``: the loaded value
+    """
+    return yaml.load(stream, Loader=yaml.CSafeLoader if LIBYAML_AVAILABLE else yaml.SafeLoader)
+
+
+if LIBYAML_AVAILABLE:
+
+    class EventLoader(_CParser, Composer, SafeConstructor, Resolver):
+        """
+        A safe YAML loader whose events are parsed by libyaml and that can compose and construct
+        individual nodes, which ``yaml.CSafeLoader`` can't.
+        """
+
+        def __init__(self, stream: Any) -> None:
+            _CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+
+else:
+    EventLoader = yaml.SafeLoader
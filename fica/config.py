@@ -1,11 +1,296 @@
 """Configuration objects"""
 
-from typing import Any, Dict, Set
+import os
+
+from abc import ABCMeta
+from itertools import repeat
+from typing import (
+    Any, BinaryIO, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, TextIO, Tuple, Type,
+    Union)
 
 from .utils import ConfigProcessingException
 
 
-class Config:
+_INTERNAL_ATTRS = frozenset(
+    ("_defaulted", "_dirty", "_frozen", "_generation", "_hash", "_require_valid_keys", "_view"))
+"""the names of instance attributes used internally by :py:class:`Config`"""
+
+
+def _make_hashable(value: Any) -> Any:
+    """
+    Convert a value stored in a config into a hashable value, recursively converting lists, sets,
+    and dictionaries to their immutable counterparts.
+
+    Args:
+        value (``object``): the value to convert
+
+    Returns:
+        ``object``: the hashable value
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_make_hashable(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_make_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((k, _make_hashable(v)) for k, v in value.items())
+    return value
+
+
+def _values_differ(old: Any, new: Any) -> bool:
+    """
+    Determine whether two values of a key are different.
+
+    Values that can't be compared to one another as booleans (e.g. NumPy arrays) are considered
+    different unless they are the same object.
+    """
+    if old is new:
+        return False
+    try:
+        return bool(old != new)
+    except Exception:
+        return True
+
+
+def _is_shared_default(value: Any) -> bool:
+    """
+    Determine whether a value is the instance of a config class shared by keys with
+    ``share_default`` set (see :py:meth:`Config._get_shared_default`), as opposed to a config that
+    was frozen by the user.
+    """
+    return isinstance(value, Config) and value is type(value)._get_schema().shared_default
+
+
+def _collect_changes(path: str, old: Any, new: Any, changes: Dict[str, Tuple[Any, Any]]) -> bool:
+    """
+    Add the changes between the old and new values of a key to a dictionary of changes, recursing
+    into configs of the same type so that only the paths of nested keys that changed are added.
+
+    Args:
+        path (``str``): the dotted path of the key
+        old (``object``): the old value of the key
+        new (``object``): the new value of the key
+        changes (``dict[str, tuple[object, object]]``): the dictionary to add changes to
+
+    Returns:
+        ``bool``: whether any changes were added
+    """
+    if isinstance(old, Config) and type(old) is type(new):
+        changed = False
+        for a, n in old._get_schema().attrs_to_names.items():
+            changed |= _collect_changes(f"{path}.{n}", getattr(old, a), getattr(new, a), changes)
+        return changed
+
+    if _values_differ(old, new):
+        changes[path] = (old, new)
+        return True
+
+    return False
+
+
+class _CheckedUserConfig(dict):
+    """
+    A user config whose values have already been checked and computed by the keys they belong to,
+    which configs created from it store directly instead of computing them again.
+
+    Args:
+        values (``dict[str, object]``): a dictionary mapping key names to their computed values
+    """
+
+    values: Dict[str, Any]
+    """a dictionary mapping key names to their computed values"""
+
+    def __init__(self, values: Dict[str, Any]) -> None:
+        super().__init__()
+        self.values = values
+
+
+class _KeySchema:
+    """
+    The precomputed key layout of a :py:class:`Config` subclass.
+
+    Schemas are computed once per class (see :py:meth:`Config._get_schema`) so that config methods
+    don't have to walk the MRO looking for keys each time they are called.
+
+    Args:
+        config_cls (``type[Config]``): the config class to compute the schema of
+    """
+
+    attrs_to_names: Dict[str, str]
+    """a dictionary mapping class attribute names to key names in the user config, in declaration
+    order"""
+
+    names_to_attrs: Dict[str, str]
+    """a dictionary mapping key names in the user config to class attribute names"""
+
+    keys: Dict[str, "Key"]
+    """a dictionary mapping class attribute names to their keys"""
+
+    positions: Dict[str, int]
+    """a dictionary mapping class attribute names to the position of their keys in the schema; the
+    bit ``1 << position`` represents the key in bitmasks"""
+
+    key_positions: Dict[int, int]
+    """a dictionary mapping the ``id`` of each key to its position in the schema"""
+
+    key_attrs: Dict[int, str]
+    """a dictionary mapping the ``id`` of each key to its attribute name"""
+
+    subkey_containers: Dict[str, Type["Config"]]
+    """a dictionary mapping the attribute names of keys with subkey containers to those containers"""
+
+    constant_defaults: Dict[str, Any]
+    """a dictionary mapping the attribute names of keys whose default is a constant value (i.e. not
+    computed by a factory or subkey container) to that value"""
+
+    constant_defaults_mask: int
+    """a bitmask of the keys in :py:attr:`constant_defaults`"""
+
+    compact_layout: List[Any]
+    """the initial list of values for instances of :py:class:`CompactConfig`, containing the
+    constant default values and the keys themselves for keys whose values haven't been set"""
+
+    computed_defaults: Dict[str, str]
+    """a dictionary mapping key names to attribute names for keys whose default value is computed
+    when a config is created"""
+
+    shared_default: Optional["Config"]
+    """the frozen instance of the class shared by keys with ``share_default`` set, if it has been
+    created"""
+
+    compiled_attrs: FrozenSet[str]
+    """the attribute names of keys whose values can be computed by calling their compiled plans
+    directly (i.e. keys that don't override :py:meth:`Key.get_value` or
+    :py:meth:`Key.use_default`)"""
+
+    populate: Optional[Callable[["Config", Dict[str, Any], bool], bool]]
+    """the population routine generated for the class, or ``None`` if it hasn't been generated or
+    the class can't use one"""
+
+    check: Optional[Callable[[Dict[str, Any], bool], bool]]
+    """the validation routine generated for the class, or ``None`` if it hasn't been generated or
+    the class can't use one"""
+
+    generated: bool
+    """whether :py:attr:`populate` and :py:attr:`check` have been generated"""
+
+    uses: int
+    """the number of times configs of the class have been created or checked before its routines
+    were generated"""
+
+    def __init__(self, config_cls: Type["Config"]) -> None:
+        keys = {}
+        # iterate over config classes in reverse order so that attr collisions are resolved in favor
+        # of the lower class in the MRO
+        for cls in config_cls.__mro__[::-1]:
+            if not issubclass(cls, Config) or cls is Config:
+                continue
+
+            # iterate through cls.__dict__ because dicts maintain insertion order, and will
+            # therefore be ordered in the same order as the fields were declared
+            for a in cls.__dict__:
+                v = getattr(cls, a)
+                if isinstance(v, Key):
+                    keys[a] = v
+
+        self.keys = keys
+        self.shared_default = None
+        self.populate, self.check, self.generated, self.uses = None, None, False, 0
+        self.positions = {a: i for i, a in enumerate(keys)}
+        self.key_positions = {id(k): i for i, k in enumerate(keys.values())}
+        self.key_attrs = {id(k): a for a, k in keys.items()}
+        self.attrs_to_names = {a: k.get_name(a) for a, k in keys.items()}
+        self.names_to_attrs = {n: a for a, n in self.attrs_to_names.items()}
+        self.subkey_containers = {
+            a: k.get_subkey_container() for a, k in keys.items()
+            if k.get_subkey_container() is not None
+        }
+        self.compiled_attrs = frozenset(
+            a for a, k in keys.items()
+            if getattr(type(k), "get_value", None) is Key.get_value and \
+                getattr(type(k), "use_default", None) is Key.use_default
+        )
+
+        self.constant_defaults, self.computed_defaults = {}, {}
+        for n, a in self.names_to_attrs.items():
+            k = keys[a]
+            if a in self.compiled_attrs and not k.required and k.factory is None and \
+                    k.default is not SUBKEYS and not isinstance(k.default, Config):
+                self.constant_defaults[a] = k.default
+            else:
+                self.computed_defaults[n] = a
+        self.constant_defaults_mask = 0
+        for a in self.constant_defaults:
+            self.constant_defaults_mask |= 1 << self.positions[a]
+
+        self.compact_layout = [self.constant_defaults.get(a, k) for a, k in keys.items()]
+        if issubclass(config_cls, CompactConfig) and len(self.key_positions) != len(keys):
+            raise TypeError(
+                f"The keys of compact config {config_cls.__name__} must be distinct Key objects")
+
+
+class _ConfigMeta(ABCMeta):
+    """
+    The metaclass for :py:class:`Config`, which discards cached key schemas when keys are added to,
+    replaced on, or removed from a config class after it has been created.
+
+    This metaclass derives from ``abc.ABCMeta`` so that configs can also inherit from ``abc.ABC``.
+    """
+
+    def __new__(mcls, name: str, bases: Tuple[type, ...], namespace: Dict[str, Any], **kwargs):
+        # subclasses of compact configs must declare __slots__ so that their instances don't get an
+        # instance __dict__
+        if "__slots__" not in namespace and any(getattr(b, "_compact", False) for b in bases):
+            namespace["__slots__"] = ()
+        return super().__new__(mcls, name, bases, namespace, **kwargs)
+
+    def __setattr__(cls, attr: str, value: Any) -> None:
+        # ABCMeta sets its bookkeeping attributes while Config itself is being created, before Key
+        # has been imported
+        if attr in ("__abstractmethods__", "_abc_impl"):
+            return super().__setattr__(attr, value)
+        is_key = isinstance(value, Key) or isinstance(cls.__dict__.get(attr), Key)
+        if is_key:
+            cls._check_keys_mutable()
+        super().__setattr__(attr, value)
+        if isinstance(value, Key):
+            # type only calls __set_name__ for attributes set in the class body
+            value.__set_name__(cls, attr)
+        if is_key:
+            cls._invalidate_schema()
+
+    def __delattr__(cls, attr: str) -> None:
+        is_key = isinstance(cls.__dict__.get(attr), Key)
+        if is_key:
+            cls._check_keys_mutable()
+        super().__delattr__(attr)
+        if is_key:
+            cls._invalidate_schema()
+
+    def _check_keys_mutable(cls) -> None:
+        """
+        Assert that keys can be added to or removed from this class after it has been created.
+
+        Raises:
+            ``TypeError``: if the class is a compact config, whose layout is fixed
+        """
+        if getattr(cls, "_compact", False):
+            raise TypeError(f"Cannot change the keys of compact config {cls.__name__}")
+
+    def _invalidate_schema(cls) -> None:
+        """
+        Discard the cached key schema of this class and all of its subclasses. This is called when
+        keys are added to, replaced on, or removed from the class, or when the configuration of one
+        of its keys changes.
+        """
+        to_visit = [cls]
+        while to_visit:
+            c = to_visit.pop()
+            if "_key_schema" in c.__dict__:
+                type.__delattr__(c, "_key_schema")
+            to_visit.extend(type.__subclasses__(c))
+
+
+class Config(metaclass=_ConfigMeta):
     """
     A class defining the structure of configurations expected by an application.
 
@@ -30,13 +315,37 @@ class Config:
         require_valid_keys (``bool``): whether to require that all keys in the user config are valid
     """
 
-    _defaulted: Set[str]
-    """the names of keys that were not specified by the user"""
+    __slots__ = (
+        "_defaulted", "_dirty", "_frozen", "_generation", "_hash", "_require_valid_keys", "_view")
+
+    _defaulted: int
+    """a bitmask of the keys that were not specified by the user (see
+    :py:attr:`_KeySchema.positions`)"""
+
+    _dirty: int
+    """a bitmask of the keys whose values have changed since the config was created or since
+    :py:meth:`clear_dirty` was last called"""
+
+    _frozen: bool
+    """whether this config is frozen"""
+
+    _generation: int
+    """a counter that is incremented each time the values of this config's keys change"""
+
+    _hash: int
+    """the cached hash of this config, which is only set once it is frozen and hashed"""
 
     _require_valid_keys: bool
     """whether to require that all keys in the user config are valid"""
 
-    def _validate_user_config(self, user_config: Dict[str, Any]) -> None:
+    _view: Optional[Tuple[Dict[str, Any], str, Optional[str]]]
+    """for views created with :py:meth:`view`, the user config that the values of keys are computed
+    from when they are first accessed, the dotted path of the view in its root view (e.g. ``bar.``),
+    and the key that errors raised while computing default values are wrapped in (see
+    :py:meth:`_resolve_view_attr`)"""
+
+    @staticmethod
+    def _validate_user_config(user_config: Dict[str, Any]) -> None:
         """
         Validate that a dictionary containing user-specified configuration values has the correct
         format.
@@ -50,7 +359,7 @@ class Config:
         if not isinstance(user_config, dict):
             raise TypeError("The user-specified configurations must be passed as a dictionary")
 
-        if not all(isinstance(k, str) for k in user_config):
+        if not all(map(isinstance, user_config, repeat(str))):
             raise TypeError(
                 "Some keys of the user-specified configurations dictionary are not strings")
 
@@ -62,129 +371,792 @@ class Config:
         ) -> None:
         self._validate_user_config(user_config)
 
-        self._defaulted = set()
+        self._defaulted = 0
+        self._dirty = 0
+        self._frozen = False
+        self._generation = 0
         self._require_valid_keys = require_valid_keys
-        self._populate(user_config, True, documentation_mode)
+        self._view = None
+
+        # use the population routine generated for this class if there is one, falling back to the
+        # generic implementation if it can't handle the user config; the generic implementation is
+        # also used for checked user configs, whose values it doesn't compute again
+        populate = None if documentation_mode or type(user_config) is _CheckedUserConfig \
+            else self._get_generated_schema().populate
+        if populate is None or not populate(self, user_config, require_valid_keys):
+            self._populate(user_config, True, documentation_mode)
+
+    @classmethod
+    def view(cls, user_config: Dict[str, Any], require_valid_keys: bool = False) -> "Config":
+        """
+        Create a read-only view of a user config that computes the value of each key the first time
+        it is accessed.
+
+        Views are frozen instances of this class whose keys are validated and converted in the same
+        way as when a config is created, but only when they are first accessed, after which their
+        values are stored in the view. Defaults (including those computed by factories) are only
+        computed for keys that are accessed, and the values of keys with subkey containers are
+        views themselves, so nested user configs are only processed when their keys are accessed.
+        This makes views much cheaper than configs when only a few keys of a large user config are
+        needed.
+
+        Because the keys of a view are processed lazily, errors in the value of a key are raised
+        when the key is accessed instead of when the view is created. The structure of the user
+        config and, if ``require_valid_keys`` is true, the names of its keys are still checked up
+        front. The constructor of this class isn't called to create views.
+
+        .. code-block:: python
+
+            >>> my_config = MyConfig.view({"foo": 1, "bar": {"baz": "a"}})
+            >>> my_config.foo
+            ... 1
+            >>> my_config.bar.baz
+            ... ConfigProcessingException('An error occured while processing bar.baz: ...')
+
+        Args:
+            user_config (``dict[str, object]``): a dictionary containing the configurations
+                specified by the user
+            require_valid_keys (``bool``): whether to require that all keys in the user config are
+                valid
+
+        Returns:
+            :py:class:`Config`: the view
+
+        Raises:
+            ``TypeError``: if ``user_config`` is of the wrong type or structure
+            ``ValueError``: if ``require_valid_keys`` is true and ``user_config`` contains an
+                unexpected key
+        """
+        return cls._create_view(user_config, require_valid_keys, "", None)
+
+    @classmethod
+    def _create_view(
+        cls,
+        user_config: Dict[str, Any],
+        require_valid_keys: bool,
+        path: str,
+        default_key: Optional[str],
+    ) -> "Config":
+        """
+        Create a view of a user config (see :py:meth:`view`) nested at a dotted path in its root
+        view.
+
+        Args:
+            user_config (``dict[str, object]``): the user config
+            require_valid_keys (``bool``): whether to require that all keys in the user config are
+                valid
+            path (``str``): the dotted path of the view (e.g. ``bar.``)
+            default_key (``str | None``): the key that errors raised while computing default values
+                are wrapped in, if any
+
+        Returns:
+            :py:class:`Config`: the view
+        """
+        cls._validate_user_config(user_config)
+
+        schema = cls.__dict__.get("_key_schema") or cls._get_schema()
+        names_to_attrs = schema.names_to_attrs
+        if require_valid_keys and not user_config.keys() <= names_to_attrs.keys():
+            for name in user_config:
+                if name not in names_to_attrs:
+                    raise ValueError(f"Unexpected key found in config: '{name}'")
+
+        view = cls.__new__(cls)
+        set_internal = object.__setattr__
+        if isinstance(view, CompactConfig):
+            # the values of unresolved keys are the keys themselves, as in the layout of configs
+            # that are being created
+            set_internal(view, "_values", list(schema.keys.values()))
+        set_internal(view, "_defaulted", 0)
+        set_internal(view, "_dirty", 0)
+        set_internal(view, "_frozen", True)
+        set_internal(view, "_generation", 0)
+        set_internal(view, "_require_valid_keys", require_valid_keys)
+        set_internal(view, "_view", (user_config, path, default_key))
+
+        if len(schema.key_attrs) != len(schema.keys):
+            # keys shared by several attributes can't tell which attribute they're accessed through,
+            # so their values are computed up front
+            key_ids = [id(k) for k in schema.keys.values()]
+            for attr, key in schema.keys.items():
+                if key_ids.count(id(key)) > 1:
+                    view._resolve_view_key(key, attr)
+
+        return view
+
+    def _resolve_view_key(self, key: "Key", attr: Optional[str] = None) -> Any:
+        """
+        Compute and store the value of a key of a view from its user config.
+
+        Errors are raised in the same form as when a config is created: errors in keys specified by
+        the user are wrapped with the dotted paths of the keys, while those raised while computing
+        default values are only wrapped once they reach the nearest config whose key was specified
+        by the user.
+
+        Args:
+            key (:py:class:`fica.Key`): the key
+            attr (``str | None``): the attribute name of the key; if unspecified, it is looked up
+                from the key
+
+        Returns:
+            ``object``: the value of the key
+
+        Raises:
+            ``ConfigProcessingException``: if an error occurs while computing the value
+        """
+        schema = type(self).__dict__.get("_key_schema") or self._get_schema()
+        if attr is None:
+            attr = schema.key_attrs[id(key)]
+        user_config, path, default_key = self._view
+        name, pos = schema.attrs_to_names[attr], schema.positions[attr]
+        if name in user_config:
+            v, wrap_key = user_config[name], f"{path}{name}"
+        else:
+            v, wrap_key = EMPTY, default_key
+
+        compiled = attr in schema.compiled_attrs
+        try:
+            if not compiled:
+                value = key.get_value(v, require_valid_keys=self._require_valid_keys)
+            elif key.subkey_container is None:
+                value = key._plan(v, self._require_valid_keys)
+            else:
+                value = key._get_view_value(
+                    v, self._require_valid_keys, f"{path}{name}.", wrap_key)
+        except Exception as e:
+            # wrap the error message with one containing the path of the key
+            if wrap_key is None:
+                raise
+            if isinstance(e, ConfigProcessingException):
+                raise ConfigProcessingException.from_child(wrap_key, e)
+            else:
+                raise ConfigProcessingException(wrap_key, e)
+
+        # compiled keys don't override use_default, so its check is inlined for them
+        self._store_value(attr, pos, value)
+        if (v is EMPTY and not key.required) if compiled else key.use_default(v):
+            object.__setattr__(self, "_defaulted", self._defaulted | (1 << pos))
+        return value
+
+    @classmethod
+    def _get_schema(cls) -> _KeySchema:
+        """
+        Get the key schema of this class, computing it if it has not been computed yet.
+
+        Returns:
+            ``_KeySchema``: the key schema
+        """
+        # look in cls.__dict__ instead of using getattr so that the schema of a parent class isn't
+        # returned
+        schema = cls.__dict__.get("_key_schema")
+        if schema is None:
+            schema = _KeySchema(cls)
+            type.__setattr__(cls, "_key_schema", schema)
+        return schema
+
+    @classmethod
+    def _get_generated_schema(cls) -> _KeySchema:
+        """
+        Get the key schema of this class, generating its specialized population and validation
+        routines once the class has been used enough times (see
+        :py:data:`fica._codegen.GENERATE_AFTER`). Because the schema is discarded when the keys of
+        the class or their configurations change, the routines are regenerated in that case.
+
+        Returns:
+            ``_KeySchema``: the key schema
+        """
+        schema = cls.__dict__.get("_key_schema") or cls._get_schema()
+        if not schema.generated:
+            schema.uses += 1
+            if schema.uses >= GENERATE_AFTER:
+                schema.populate = compile_populate(cls, schema)
+                schema.check = compile_check(cls, schema)
+                schema.generated = True
+        return schema
+
+    @classmethod
+    def _get_shared_default(cls) -> "Config":
+        """
+        Get the frozen instance of this class with every key defaulted that is shared by keys
+        with ``share_default`` set, creating it if it has not been created yet.
+
+        Returns:
+            :py:class:`Config`: the shared instance
+        """
+        schema = cls._get_schema()
+        if schema.shared_default is None:
+            config = cls()
+            config.freeze()
+            schema.shared_default = config
+        return schema.shared_default
+
+    def freeze(self) -> "Config":
+        """
+        Make this config and any configs nested in it immutable.
+
+        Frozen configs raise an ``AttributeError`` when their keys are set or when they are updated.
+        Unlike regular configs, they are hashable, so they can be used as dictionary keys or in
+        sets. The hash of a frozen config is computed from the values of its keys the first time it
+        is needed and then cached, so mutable values (e.g. lists) stored in a frozen config should
+        not be modified in-place.
+
+        Returns:
+            :py:class:`Config`: this config
+        """
+        self._frozen = True
+        for a in self._get_schema().keys:
+            v = getattr(self, a)
+            if isinstance(v, Config) and not v._frozen:
+                v.freeze()
+        return self
+
+    def _check_not_frozen(self) -> None:
+        """
+        Assert that this config can be modified.
+
+        Raises:
+            ``AttributeError``: if this config is frozen
+        """
+        if self._frozen:
+            raise AttributeError(f"Cannot modify frozen config {type(self).__name__}")
 
     def __setattr__(self, attr: str, value: Any) -> None:
-        super().__setattr__(attr, value)
-        name = self._get_attrs_to_names().get(attr)
-        if name in self._defaulted:
-            self._defaulted.remove(name)
+        if attr in _INTERNAL_ATTRS:
+            object.__setattr__(self, attr, value)
+            return
+
+        self._check_not_frozen()
+        schema = type(self).__dict__.get("_key_schema") or self._get_schema()
+        pos = schema.positions.get(attr)
+        if pos is None:
+            object.__setattr__(self, attr, value)
+            return
+
+        self._store_value(attr, pos, value)
+        object.__setattr__(self, "_defaulted", self._defaulted & ~(1 << pos))
+        object.__setattr__(self, "_dirty", self._dirty | (1 << pos))
+        object.__setattr__(self, "_generation", self._generation + 1)
+
+    def __setstate__(self, state: Any) -> None:
+        # restore the attributes of unpickled and copied configs directly so that restoring them
+        # isn't treated as modifying the config, which frozen and compact configs don't allow
+        dict_state, slots_state = state if isinstance(state, tuple) else (state, None)
+        for attrs in (dict_state, slots_state):
+            for attr, value in (attrs or {}).items():
+                object.__setattr__(self, attr, value)
+
+    def _store_value(self, attr: str, pos: int, value: Any) -> None:
+        """
+        Store the value of a key without updating any of the config's bookkeeping.
+
+        Args:
+            attr (``str``): the attribute name of the key
+            pos (``int``): the position of the key in the schema
+            value (``object``): the value to store
+        """
+        self.__dict__[attr] = value
 
-    def update(self, user_config: Dict[str, Any]):
+    def _set_constant_defaults(self, schema: _KeySchema) -> None:
+        """
+        Set the values of all keys with constant defaults in bulk and mark them as defaulted.
+
+        Args:
+            schema (``_KeySchema``): the schema of this class
+        """
+        if schema.constant_defaults:
+            self.__dict__.update(schema.constant_defaults)
+            self._defaulted |= schema.constant_defaults_mask
+
+    def update(self, user_config: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
         """
         Recursively update the values for keys of this configuration in-place.
 
+        Keys whose values change are marked as dirty (see :py:meth:`get_dirty_keys`), and the
+        generation of each config whose keys changed is incremented (see
+        :py:meth:`get_generation`).
+
         Args:
             user_config (``dict[str, object]``): a dictionary of new configuration values
 
+        Returns:
+            ``dict[str, tuple[object, object]]``: a dictionary mapping the dotted paths of keys
+            whose values changed (e.g. ``bar.baz``) to tuples containing their old and new values
+
         Raises:
             ``TypeError``: if ``user_config`` is of the wrong type or structure
             ``Exception``: if an error occurs while parsing the specified value for a key
         """
+        self._check_not_frozen()
         self._validate_user_config(user_config)
-        self._populate(user_config, False)
+        return self._populate(user_config, False)
 
-    def _populate(
-        self,
-        user_config: Dict[str, Any],
-        populate_defaults: bool,
-        documentation_mode: bool = False,
-    ):
+    def get_generation(self) -> int:
         """
+        Get the generation of this config, a counter that is incremented each time the values of its
+        keys change (either through :py:meth:`update` or by setting them directly).
+
+        Returns:
+            ``int``: the generation
         """
-        cls, names_to_attrs, seen_attrs = type(self), self._get_names_to_attrs(), set()
+        return self._generation
 
-        # go through attributes on this class and every Config subclass it inherits from to find all
-        # keys
-        for name, v in user_config.items():
-            if name not in names_to_attrs:
-                if self._require_valid_keys:
-                    raise ValueError(f"Unexpected key found in config: '{name}'")
-                else:
-                    continue
+    def get_dirty_keys(self) -> List[str]:
+        """
+        Get the names of the keys of this config whose values have changed since it was created or
+        since :py:meth:`clear_dirty` was last called.
+
+        Keys containing nested configs are dirty if any of the nested config's keys changed.
+
+        Returns:
+            ``list[str]``: the names of the dirty keys, in the order they are declared in
+        """
+        schema = self._get_schema()
+        return [
+            n for a, n in schema.attrs_to_names.items() if self._dirty & (1 << schema.positions[a])
+        ]
+
+    def clear_dirty(self) -> None:
+        """
+        Mark all of the keys of this config and any configs nested in it as not dirty.
+        """
+        self._dirty = 0
+        for a in self._get_schema().keys:
+            v = getattr(self, a)
+            if isinstance(v, Config):
+                v.clear_dirty()
+
+    @classmethod
+    def from_many(
+        cls,
+        user_configs: Iterable[Dict[str, Any]],
+        require_valid_keys: bool = False,
+        lazy: bool = False,
+    ) -> Union[
+        List[Union["Config", ConfigProcessingException]],
+        Iterator[Union["Config", ConfigProcessingException]],
+    ]:
+        """
+        Create a config for each user config in a batch.
+
+        The class's key schema and its generated population routine are looked up once for the
+        whole batch rather than once per config, so this is faster than creating each config
+        individually (unless the class overrides its constructor, which is then called for each
+        config). If an error occurs while creating one of the configs, it is not raised; instead, a
+        :py:class:`ConfigProcessingException<fica.utils.ConfigProcessingException>` whose key is
+        prefixed with the index of the user config (e.g. ``[3].foo``) is returned in its place so
+        that the rest of the batch is still processed.
+
+        Args:
+            user_configs (``iterable[dict[str, object]]``): the user configs to create configs for
+            require_valid_keys (``bool``): whether to require that all keys in the user configs are
+                valid
+            lazy (``bool``): whether to return a generator that creates the configs as it is
+                iterated over instead of a list
+
+        Returns:
+            ``list[Config | ConfigProcessingException]`` or a generator of the same: the created
+            configs (or errors) in the same order as ``user_configs``
+        """
+        results = cls._iter_many(user_configs, require_valid_keys)
+        return results if lazy else list(results)
+
+    @classmethod
+    def from_stream(
+        cls,
+        stream: Union[BinaryIO, TextIO],
+        format: str = "json",
+        require_valid_keys: bool = False,
+    ) -> "Config":
+        """
+        Create a config from a stream containing a JSON object or YAML mapping.
+
+        The stream is parsed incrementally, and each key is checked as soon as it has been parsed:
+        unexpected keys are rejected (if ``require_valid_keys`` is true) before their values are
+        parsed, and reading stops at the first invalid value. Only the part of the stream
+        containing the value being parsed is kept in memory, rather than the whole document.
+
+        Args:
+            stream (``typing.BinaryIO | typing.TextIO``): the stream
+            format (``str``): the format of the stream (``"json"`` or ``"yaml"``)
+            require_valid_keys (``bool``): whether to require that all keys in the stream are valid
+
+        Returns:
+            ``Config``: the config
+
+        Raises:
+            ``ValueError``: if ``format`` is not supported
+        """
+        from .loader import load_stream
+        return load_stream(cls, stream, format=format, require_valid_keys=require_valid_keys)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: Union[str, "os.PathLike[str]"],
+        format: Optional[str] = None,
+        require_valid_keys: bool = False,
+    ) -> "Config":
+        """
+        Create a config from a JSON or YAML file, parsing it incrementally as described in
+        :py:meth:`from_stream`.
+
+        Args:
+            path (``str | os.PathLike``): the path to the file
+            format (``str | None``): the format of the file (``"json"`` or ``"yaml"``); if
+                unspecified, it is determined from the file's extension
+            require_valid_keys (``bool``): whether to require that all keys in the file are valid
+
+        Returns:
+            ``Config``: the config
+
+        Raises:
+            ``ValueError``: if no format is specified and the file's extension is not recognized
+        """
+        from .loader import load_file
+        return load_file(cls, path, format=format, require_valid_keys=require_valid_keys)
+
+    @classmethod
+    def _iter_many(
+        cls,
+        user_configs: Iterable[Dict[str, Any]],
+        require_valid_keys: bool,
+    ) -> Iterator[Union["Config", ConfigProcessingException]]:
+        """
+        Create a config for each user config in a batch, yielding errors in place of configs that
+        could not be created.
+        """
+        schema, set_internal = cls._get_schema(), object.__setattr__
+
+        # classes that don't customize their constructors have their instances initialized here so
+        # that the schema and the generated population routine are only looked up once per batch
+        construct = cls.__init__ not in (Config.__init__, CompactConfig.__init__)
+        compact_layout = schema.compact_layout if issubclass(cls, CompactConfig) else None
 
-            attr  = names_to_attrs[name]
+        for i, user_config in enumerate(user_configs):
+            key = f"[{i}]"
             try:
-                key = getattr(cls, attr)
-                if isinstance(getattr(self, attr), Config) and \
-                        isinstance(v, dict):
-                    getattr(self, names_to_attrs[name]).update(v)
+                if construct:
+                    yield cls(user_config, require_valid_keys=require_valid_keys)
+                    continue
 
-                else:
-                    value = key.get_value(v, require_valid_keys=self._require_valid_keys)
-                    setattr(self, attr, value)
+                cls._validate_user_config(user_config)
+                if not schema.generated:
+                    # each config in the batch counts as a use until the routines are generated
+                    cls._get_generated_schema()
+
+                config = cls.__new__(cls)
+                if compact_layout is not None:
+                    set_internal(config, "_values", compact_layout.copy())
+                set_internal(config, "_defaulted", 0)
+                set_internal(config, "_dirty", 0)
+                set_internal(config, "_frozen", False)
+                set_internal(config, "_generation", 0)
+                set_internal(config, "_require_valid_keys", require_valid_keys)
+                set_internal(config, "_view", None)
 
-                if key.use_default(v):
-                    self._defaulted.add(name)
-                elif name in self._defaulted:
-                    self._defaulted.remove(name)
+                populate = None if type(user_config) is _CheckedUserConfig else schema.populate
+                if populate is None or not populate(config, user_config, require_valid_keys):
+                    config._populate(user_config, True)
+                yield config
 
+            except ConfigProcessingException as e:
+                yield ConfigProcessingException.from_child(key, e)
             except Exception as e:
-                # wrap the error message with one containing the key name
+                yield ConfigProcessingException(key, e)
+
+    @classmethod
+    def validate(
+        cls,
+        user_config: Dict[str, Any],
+        require_valid_keys: bool = False,
+    ) -> List[ConfigProcessingException]:
+        """
+        Find all of the errors in a user config without creating a config from it.
+
+        Creating a config raises an error for the first invalid key it finds. This method instead
+        checks every key in the user config, including those of nested subkey containers, and
+        returns an error for each invalid key. The key of each error is the dotted path of the
+        invalid key (e.g. ``foo.bar``), and its message is the error that would have been raised
+        when creating the config.
+
+        Args:
+            user_config (``dict[str, object]``): the user config to validate
+            require_valid_keys (``bool``): whether to require that all keys in the user config are
+                valid
+
+        Returns:
+            ``list[ConfigProcessingException]``: the errors, in the order of the keys in the user
+            config followed by errors for keys that were not specified (e.g. required keys)
+
+        Raises:
+            ``TypeError``: if ``user_config`` is of the wrong type or structure
+        """
+        cls._validate_user_config(user_config)
+        return list(cls._iter_errors(user_config, require_valid_keys))
+
+    @classmethod
+    def is_valid(cls, user_config: Dict[str, Any], require_valid_keys: bool = False) -> bool:
+        """
+        Determine whether a config can be created from a user config without creating it.
+
+        This method performs the same checks as :py:meth:`validate`, but stops at the first error
+        it finds. Because no configs are created, no default values are computed (e.g. by calling
+        factories or creating subkey containers), which makes this method much faster than
+        creating a config when only the validity of the user config is needed.
+
+        Args:
+            user_config (``dict[str, object]``): the user config to check
+            require_valid_keys (``bool``): whether to require that all keys in the user config are
+                valid
+
+        Returns:
+            ``bool``: whether the user config is valid
+        """
+        try:
+            cls._validate_user_config(user_config)
+        except TypeError:
+            return False
+
+        check = cls._get_generated_schema().check
+        if check is not None:
+            return check(user_config, require_valid_keys)
+
+        for _ in cls._iter_errors(user_config, require_valid_keys):
+            return False
+
+        return True
+
+    @classmethod
+    def _iter_errors(
+        cls,
+        user_config: Dict[str, Any],
+        require_valid_keys: bool,
+        partial: bool = False,
+    ) -> Iterator[ConfigProcessingException]:
+        """
+        Find the errors that would occur when creating a config from a user config, keyed by the
+        dotted paths of the invalid keys.
+
+        Keys are checked without computing their values, except for keys whose classes override
+        :py:meth:`Key.get_value`, which is called to find any errors. If ``partial`` is true, only
+        the keys in the user config are checked (i.e. missing required keys are not reported).
+        """
+        schema, seen_attrs = cls._get_schema(), set()
+        names_to_attrs, keys, compiled_attrs = \
+            schema.names_to_attrs, schema.keys, schema.compiled_attrs
+
+        def check(name, attr, v):
+            key = keys[attr]
+            if attr in compiled_attrs:
+                errors = key._iter_errors(v, require_valid_keys)
+            else:
+                errors = []
+                try:
+                    key.get_value(v, require_valid_keys=require_valid_keys)
+                except Exception as e:
+                    errors.append(e)
+
+            for e in errors:
                 if isinstance(e, ConfigProcessingException):
-                    raise ConfigProcessingException.from_child(name, e)
+                    yield ConfigProcessingException.from_child(name, e)
                 else:
-                    raise ConfigProcessingException(name, e)
+                    yield ConfigProcessingException(name, e)
+
+        for name, v in user_config.items():
+            if name not in names_to_attrs:
+                if require_valid_keys:
+                    yield ConfigProcessingException(
+                        name, ValueError(f"Unexpected key found in config: '{name}'"))
+                continue
 
+            attr = names_to_attrs[name]
             seen_attrs.add(attr)
 
-        if not populate_defaults:
+            # check values of plain scalar keys inline, which avoids creating a generator for each
+            # of them
+            key = keys[attr]
+            if attr in compiled_attrs and key.validator is None and key.subkey_container is None \
+                    and v is not EMPTY and (key.type_ is None or isinstance(v, key.type_) or \
+                        (key.allow_none and v is None)):
+                continue
+
+            yield from check(name, attr, v)
+
+        if partial:
             return
 
+        # keys with constant defaults can't fail when they aren't specified
+        for name, attr in schema.computed_defaults.items():
+            if attr not in seen_attrs:
+                yield from check(name, attr, EMPTY)
+
+    def _populate(
+        self,
+        user_config: Dict[str, Any],
+        populate_defaults: bool,
+        documentation_mode: bool = False,
+    ) -> Optional[Dict[str, Tuple[Any, Any]]]:
+        """
+        Set the values of keys from a user config.
+
+        If the user config is a :py:class:`_CheckedUserConfig`, the values of its keys are stored
+        as they were computed when it was checked instead of being computed again.
+
+        Args:
+            user_config (``dict[str, object]``): the user config
+            populate_defaults (``bool``): whether this config is being created, in which case keys
+                not in ``user_config`` are set to their defaults; otherwise, it is being updated
+            documentation_mode (``bool``): whether the config is being created to document it
+
+        Returns:
+            ``dict[str, tuple[object, object]] | None``: if this config is being updated, a
+            dictionary mapping the dotted paths of keys whose values changed to their old and new
+            values
+        """
+        schema, seen_attrs = self._get_schema(), set()
+        names_to_attrs, keys, positions, compiled_attrs = \
+            schema.names_to_attrs, schema.keys, schema.positions, schema.compiled_attrs
+
+        defaults_to_compute = names_to_attrs
+        if populate_defaults and not documentation_mode:
+            # set keys with constant defaults in bulk up front; they are overwritten below if the
+            # user specified a value for them
+            self._set_constant_defaults(schema)
+            defaults_to_compute = schema.computed_defaults
+
+        computed = user_config.values if type(user_config) is _CheckedUserConfig else None
+        changes, dirty = None if populate_defaults else {}, 0
+        try:
+            for name, v in user_config.items():
+                if name not in names_to_attrs:
+                    if self._require_valid_keys:
+                        raise ValueError(f"Unexpected key found in config: '{name}'")
+                    else:
+                        continue
+
+                attr  = names_to_attrs[name]
+                pos = positions[attr]
+                try:
+                    key = keys[attr]
+                    old = getattr(self, attr)
+
+                    # update nested configs in-place unless they are shared defaults, which are
+                    # replaced with a new config below; nested configs frozen by the user raise an
+                    # error when they are updated
+                    if computed is None and isinstance(v, dict) and isinstance(old, Config) and \
+                            not _is_shared_default(old):
+                        child_changes = old.update(v)
+                        if child_changes and changes is not None:
+                            dirty |= 1 << pos
+                            changes.update({f"{name}.{p}": c for p, c in child_changes.items()})
+
+                    else:
+                        if computed is not None:
+                            value = computed[name]
+                        elif attr in compiled_attrs:
+                            value = key._plan(v, self._require_valid_keys)
+                        else:
+                            value = key.get_value(v, require_valid_keys=self._require_valid_keys)
+                        self._store_value(attr, pos, value)
+
+                        if changes is not None and _collect_changes(name, old, value, changes):
+                            dirty |= 1 << pos
+
+                    if key.use_default(v):
+                        self._defaulted |= 1 << pos
+                    else:
+                        self._defaulted &= ~(1 << pos)
+
+                except Exception as e:
+                    # wrap the error message with one containing the key name
+                    if isinstance(e, ConfigProcessingException):
+                        raise ConfigProcessingException.from_child(name, e)
+                    else:
+                        raise ConfigProcessingException(name, e)
+
+                seen_attrs.add(attr)
+
+        finally:
+            # record any changes that were made, even if an error occurred partway through
+            if dirty:
+                self._dirty |= dirty
+                self._generation += 1
+
+        if not populate_defaults:
+            return changes
+
         # set values for unspecified keys
-        for name, attr in names_to_attrs.items():
+        for name, attr in defaults_to_compute.items():
             if attr in seen_attrs:
                 continue
 
-            key = getattr(cls, attr)
+            key = keys[attr]
             if documentation_mode:
-                value = key.get_default()
+                # create default subkey containers in documentation mode as well so that the whole
+                # tree can be documented from this config
+                if key.default is SUBKEYS and not key.required:
+                    value = key.subkey_container(documentation_mode=True)
+                else:
+                    value = key.get_default()
+            elif attr in compiled_attrs:
+                value = key._plan(EMPTY, False)
             else:
                 value = key.get_value()
-            setattr(self, attr, value)
-            self._defaulted.add(name)
-
-    @property
-    def _config_classes(self):
-        """"""
-        return tuple(c for c in type(self).__mro__ if issubclass(c, Config) and c is not Config)
+            self._store_value(attr, positions[attr], value)
+            self._defaulted |= 1 << positions[attr]
 
     def _get_attrs_to_names(self) -> Dict[str, str]:
         """
         Get a dictionary mapping class attribute names to key names in the user config.
-        """
-        res = {}
-        # iterate over config classes in reverse order so that attr collisions are resolved in favor
-        # of the lower class in the MRO
-        for cls in self._config_classes[::-1]:
-            # iterate through cls.__dict__ because dicts maintain insertion order, and will
-            # therefore be ordered in the same order as the fields were declared
-            res.update({
-                a: getattr(cls, a).get_name(a)
-                for a
-                in cls.__dict__
-                if isinstance(getattr(cls, a), Key)
-            })
 
-        return res
+        The returned dictionary is shared by all instances of the class and should not be mutated.
+        """
+        return self._get_schema().attrs_to_names
 
     def _get_names_to_attrs(self) -> Dict[str, str]:
         """
         Get a dictionary mapping key names in the user config to class attribute names.
+
+        The returned dictionary is shared by all instances of the class and should not be mutated.
         """
-        return {v: k for k, v in self._get_attrs_to_names().items()}
+        return self._get_schema().names_to_attrs
 
     def __eq__(self, other: Any) -> bool:
         """
         Determine whether another object is equal to this config. An object is equal to a config iff
         it is also a config of the same type and has the same key values.
         """
+        if self is other:
+            return True
+
         if not isinstance(other, type(self)):
             return False
 
-        return all(getattr(self, k) == getattr(other, k) for k in self._get_attrs_to_names())
+        # frozen configs with different hashes can't be equal; hashes are only compared if they
+        # have already been computed because the values of some configs aren't hashable
+        self_hash, other_hash = getattr(self, "_hash", None), getattr(other, "_hash", None)
+        if self_hash is not None and other_hash is not None and self_hash != other_hash:
+            return False
+
+        return all(getattr(self, k) == getattr(other, k) for k in self._get_schema().keys)
+
+    def __hash__(self) -> int:
+        """
+        Get the hash of this config, which is only defined if the config is frozen.
+
+        Raises:
+            ``TypeError``: if the config is not frozen
+        """
+        if not self._frozen:
+            raise TypeError(f"unhashable type: '{type(self).__name__}' (only frozen configs are "
+                "hashable)")
+
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(tuple(
+                _make_hashable(getattr(self, a)) for a in self._get_schema().keys))
+            return self._hash
 
     def __getitem__(self, key) -> Any:
         """
@@ -209,17 +1181,81 @@ class Config:
         Returns:
             ``dict[str, object]``: the user configurations ``dict``
         """
-        attrs_to_names = self._get_attrs_to_names()
+        schema = self._get_schema()
         user_config = {}
-        for a, n in attrs_to_names.items():
+        for a, n in schema.attrs_to_names.items():
             v = getattr(self, a)
             if isinstance(v, Config):
                 v = v.get_user_config()
                 if len(v) > 0:
                     user_config[n] = v
-            elif n not in self._defaulted:
+            elif not self._defaulted & (1 << schema.positions[a]):
                 user_config[n] = v
         return user_config
 
 
-from .key import Key
+
+class CompactConfig(Config):
+    """
+    A :py:class:`Config` that stores the values of its keys compactly.
+
+    Instances of subclasses of this class don't have an instance ``__dict__``; instead, the values
+    of their keys are stored in a list laid out in the order the keys are declared in, which
+    significantly reduces the memory used by each instance. Apart from this, compact configs behave
+    the same as regular configs:
+
+    .. code-block:: python
+
+        class MyConfig(fica.CompactConfig):
+
+            foo = fica.Key(description="a value for foo")
+
+    Because the layout of a compact config is fixed, keys cannot be added to or removed from a
+    compact config class after it is created, and each key must be a distinct :py:class:`fica.Key`
+    object. Subclasses that need to store other attributes on their instances must declare them in
+    ``__slots__``.
+    """
+
+    __slots__ = ("_values", )
+
+    _compact = True
+
+    _values: List[Any]
+    """the values of the keys of this config, in the order of the schema"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        object.__setattr__(self, "_values", self._get_schema().compact_layout.copy())
+        super().__init__(*args, **kwargs)
+
+    def __setstate__(self, state: Any) -> None:
+        super().__setstate__(state)
+        # shallow copies get their own list of values, as regular configs get their own __dict__
+        object.__setattr__(self, "_values", list(self._values))
+
+    def _store_value(self, attr: str, pos: int, value: Any) -> None:
+        self._values[pos] = value
+
+    def _set_constant_defaults(self, schema: _KeySchema) -> None:
+        # the constant defaults are already in the values list, so only the mask needs updating
+        self._defaulted |= schema.constant_defaults_mask
+
+    def _get_key_value(self, key: "Key") -> Any:
+        """
+        Get the value of a key of this config.
+
+        Args:
+            key (:py:class:`fica.Key`): the key
+
+        Returns:
+            ``object``: the value of the key, or the key itself if its value hasn't been set yet
+            (the values of the keys of views are computed when they are first accessed)
+        """
+        schema = type(self).__dict__.get("_key_schema") or self._get_schema()
+        value = self._values[schema.key_positions[id(key)]]
+        if value is key and self._view is not None:
+            return self._resolve_view_key(key)
+        return value
+
+
+from .key import EMPTY, Key, SUBKEYS
+from ._codegen import compile_check, compile_populate, GENERATE_AFTER
@@ -1,11 +1,14 @@
 """Config exporters for different formats"""
 
 import json
-import yaml
+import threading
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple, Type
+from json.encoder import encode_basestring_ascii
+from typing import (
+    Any, Dict, Generator, Hashable, Iterable, Iterator, List, Optional, TextIO, Tuple, Type)
 
 from .config import Config
 from .key import Key
@@ -50,12 +53,16 @@ class ConfigExporter(ABC):
             instc (:py:class:`fica.Config`): an instance of a :py:class:`fica.Config` subclass
             d (``dict[str, object]``): the dictionary to populate with the default values
         """
-        for n, a in instc._get_names_to_attrs().items():
+        schema = instc._get_schema()
+        for n, a in schema.names_to_attrs.items():
             v = getattr(instc, a)
-            skc = getattr(type(instc), a).get_subkey_container()
+            skc = schema.subkey_containers.get(a)
             if skc:
+                # reuse the subkey container created along with instc if there is one
+                if not isinstance(v, skc):
+                    v = skc(documentation_mode=True)
                 subd = {}
-                cls.recursively_populate_config_dict(skc(documentation_mode=True), subd)
+                cls.recursively_populate_config_dict(v, subd)
                 v = subd
             d[a] = (n, v)
 
@@ -118,6 +125,59 @@ class ConfigExporter(ABC):
 
         return descriptions
 
+    def collect(self, config: Type[Config]) -> \
+            Tuple[Dict[str, Tuple[str, Any]], List[Description]]:
+        """
+        Create the dictionary of default values returned by :py:meth:`config_to_dict` and the list
+        of descriptions returned by :py:meth:`get_descriptions` for a :py:class:`fica.Config`
+        subclass in a single traversal of its keys.
+
+        The config is instantiated in documentation mode once, and the values and descriptions of
+        the keys of nested configs are taken from the subkey containers created along with it, so
+        no other configs are created (except for subkey containers of keys whose default value is
+        not a subkey container).
+
+        Args:
+            config (``type[Config]``): the :py:class:`fica.Config` subclass
+
+        Returns:
+            ``tuple[dict[str, tuple[str, object]], list[Description]]``: the dictionary of default
+            values and the list of descriptions
+        """
+        config_dict, descriptions = {}, []
+        self._collect(config(documentation_mode=True), config_dict, descriptions)
+        return config_dict, descriptions
+
+    def _collect(
+        self,
+        instc: Config,
+        config_dict: Dict[str, Tuple[str, Any]],
+        descriptions: List[Description],
+    ) -> None:
+        """
+        Populate the dictionary of default values and the list of descriptions for a config
+        instantiated in documentation mode, recursing into its subkey containers.
+        """
+        schema = instc._get_schema()
+        for n, a in schema.names_to_attrs.items():
+            key, v = schema.keys[a], getattr(instc, a)
+            descriptions.append(Description(key.get_description()))
+
+            skc = schema.subkey_containers.get(a)
+            if skc:
+                if not isinstance(v, skc):
+                    descriptions.append(
+                        Description(f"Default value: {self.export_primitive(v)}", is_default=True))
+                    v = skc(documentation_mode=True)
+
+                subd, subkey_descriptions = {}, []
+                self._collect(v, subd, subkey_descriptions)
+                if key.should_document_subkeys():
+                    descriptions.extend(subkey_descriptions)
+                v = subd
+
+            config_dict[a] = (n, v)
+
     def add_descriptions(self, lines: List[str], descriptions: List[Description]) -> List[str]:
         """
         Add descriptions to lines of configurations as comments.
@@ -134,23 +194,34 @@ class ConfigExporter(ABC):
             ``list[str]``: a list of each line with its description appended
         """
         pad_to = max(len(l) for l in lines) + 1
-        pad_line = lambda l: l + " " * (pad_to - len(l))
-        concat_line = lambda l, d: l if d is None else pad_line(l) + " " + self.comment_char + " " + d
-
-        ret, iter_d = [], iter(descriptions)
+        return list(self._iter_with_descriptions(lines, descriptions, pad_to))
+
+    def _iter_with_descriptions(
+        self,
+        lines: Iterable[str],
+        descriptions: List[Description],
+        pad_to: int,
+    ) -> Iterator[str]:
+        """
+        Lazily add descriptions to lines of configurations as comments, padding each line that a
+        description is appended to to ``pad_to`` characters.
+        """
+        comment_char = self.comment_char
+        iter_d = iter(descriptions)
         for l in lines:
             if self.should_add_description(l):
-                d = next(iter_d)
-
-                while d.is_default:
-                    ret.append(infer_indentation(l) + self.comment_char + " " + d.text)
-                    d = next(iter_d)
+                # the descriptions can run out before the lines do (e.g. if a value spans several
+                # lines), so a sentinel is used instead of letting StopIteration end the generator
+                d = next(iter_d, None)
 
-                l = concat_line(l, d.text)
+                while d is not None and d.is_default:
+                    yield infer_indentation(l) + comment_char + " " + d.text
+                    d = next(iter_d, None)
 
-            ret.append(l)
+                if d is not None and d.text is not None:
+                    l = l + " " * (pad_to - len(l)) + " " + comment_char + " " + d.text
 
-        return ret
+            yield l
 
     def should_add_description(self, line: str) -> bool:
         """
@@ -179,6 +250,56 @@ class ConfigExporter(ABC):
         """
         raise NotImplementedError()
 
+    def export_iter(self, config: Type[Config]) -> Iterator[str]:
+        """
+        Export a :py:class:`fica.Config` subclass line by line.
+
+        The lines are the same as those of the string returned by :py:meth:`export`, but they are
+        generated lazily rather than all at once. To align the comments, the width of the lines is
+        computed in a pre-pass that discards each line once it has been measured, so only the
+        user config and a bounded number of lines are held in memory at once.
+
+        Args:
+            config (``type[Config]``): the :py:class:`fica.Config` subclass
+
+        Returns:
+            ``iterator[str]``: the lines of the exported config, without line endings
+        """
+        config_dict, descriptions = self.collect(config)
+        user_config = self.config_dict_to_user_config(config_dict)
+        pad_to = self._line_width(user_config) + 1
+        yield from self._iter_with_descriptions(
+            self._iter_lines(user_config), descriptions, pad_to)
+
+    def export_to(self, config: Type[Config], fp: TextIO) -> None:
+        """
+        Export a :py:class:`fica.Config` subclass to a text stream (e.g. a file) with
+        :py:meth:`export_iter`.
+
+        The text written is the same as the string returned by :py:meth:`export`.
+
+        Args:
+            config (``type[Config]``): the :py:class:`fica.Config` subclass
+            fp (``typing.TextIO``): the stream to write to
+        """
+        for i, l in enumerate(self.export_iter(config)):
+            if i:
+                fp.write("\n")
+            fp.write(l)
+
+    def _iter_lines(self, user_config: Dict[str, Any]) -> Iterator[str]:
+        """
+        Generate the lines of code representing a user config, without descriptions.
+        """
+        raise NotImplementedError()
+
+    def _line_width(self, user_config: Dict[str, Any]) -> int:
+        """
+        Compute the length of the longest line generated by :py:meth:`_iter_lines` for a user
+        config.
+        """
+        return max((len(l) for l in self._iter_lines(user_config)), default=0)
+
     @classmethod
     def config_dict_to_user_config(cls, config_dict: Dict[str, Tuple[str, Any]]) -> Dict[str, Any]:
         """
@@ -188,9 +309,80 @@ class ConfigExporter(ABC):
             in config_dict.items()}
 
 
+def _encode_json_key(key: Any) -> str:
+    """
+    Encode a dictionary key as a JSON string in the same way as ``json.dumps``, which converts
+    non-string keys to strings.
+    """
+    if isinstance(key, str):
+        return encode_basestring_ascii(key)
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(json.dumps(key))
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _encode_json_scalar(value: Any) -> str:
+    """
+    Encode a value in the same way as ``json.dumps``, with fast paths for common scalar types.
+    """
+    t = type(value)
+    if t is str:
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    if t is bool:
+        return "true" if value else "false"
+    if t is int:
+        return int.__repr__(value)
+    if t is float and value - value == 0:  # finite
+        return float.__repr__(value)
+    return json.dumps(value)
+
+
+def _iter_json_lines(value: Any, indent: str, prefix: str, suffix: str) -> Iterator[str]:
+    """
+    Generate the lines of the JSON representation of a value in the same format as
+    ``json.dumps(value, indent=2)``.
+
+    Args:
+        value (``object``): the value
+        indent (``str``): the indentation of the first and last lines
+        prefix (``str``): a string inserted before the value on the first line (e.g. a key)
+        suffix (``str``): a string appended to the last line (e.g. a comma)
+
+    Returns:
+        ``iterator[str]``: the lines
+    """
+    if isinstance(value, dict) and value:
+        yield indent + prefix + "{"
+        last = len(value) - 1
+        for i, (k, v) in enumerate(value.items()):
+            yield from _iter_json_lines(
+                v, indent + "  ", _encode_json_key(k) + ": ", "," if i < last else "")
+        yield indent + "}" + suffix
+
+    elif isinstance(value, (list, tuple)) and value:
+        yield indent + prefix + "["
+        last = len(value) - 1
+        for i, v in enumerate(value):
+            yield from _iter_json_lines(v, indent + "  ", "", "," if i < last else "")
+        yield indent + "]" + suffix
+
+    else:
+        yield indent + prefix + _encode_json_scalar(value) + suffix
+
+
+_JsonEntry = Tuple[str, Optional[Description]]
+"""a line of an exported JSON config and the description to add to it"""
+
+
 class JsonExporter(ConfigExporter):
     """
     A configuration exporter that displays its configurations as JSON.
+
+    Rather than dumping the config and guessing which lines belong to keys, this exporter emits the
+    lines of each key itself, so descriptions are attached to the right lines whatever the values
+    of the keys contain.
     """
 
     comment_char = "//"
@@ -201,38 +393,245 @@ class JsonExporter(ConfigExporter):
     def export_primitive(self, value: Any) -> str:
         return json.dumps(value)
 
+    def _iter_entries(
+        self,
+        config_dict: Dict[str, Tuple[str, Any]],
+        descriptions: List[Description],
+        i: int,
+        indent: str,
+    ) -> Generator[_JsonEntry, None, int]:
+        """
+        Generate the lines of the keys in ``config_dict`` along with their descriptions, starting
+        at index ``i`` of ``descriptions``.
+
+        Lines containing only the default value of a subkey container are generated with the
+        indentation of the comment as the line and the ``Description`` with ``is_default`` set.
+
+        Returns:
+            ``int``: the index of the first description not consumed
+        """
+        last = len(config_dict) - 1
+        for j, (n, v) in enumerate(config_dict.values()):
+            prefix, suffix = _encode_json_key(n) + ": ", "," if j < last else ""
+            d = descriptions[i]
+            i += 1
+
+            if not isinstance(v, (dict, list, tuple)):
+                yield indent + prefix + _encode_json_scalar(v) + suffix, d
+                continue
+
+            if not isinstance(v, dict):
+                lines = _iter_json_lines(v, indent, prefix, suffix)
+                yield next(lines), d
+                for l in lines:
+                    yield l, None
+                continue
+
+            defaults = []
+            while i < len(descriptions) and descriptions[i].is_default:
+                defaults.append(descriptions[i])
+                i += 1
+
+            if not v:
+                for dd in defaults:
+                    yield indent, dd
+                yield indent + prefix + "{}" + suffix, d
+                continue
+
+            yield indent + prefix + "{", d
+            for dd in defaults:
+                yield indent + "  ", dd
+            i = yield from self._iter_entries(v, descriptions, i, indent + "  ")
+            yield indent + "}" + suffix, None
+
+        return i
+
+    def _iter_config_entries(
+        self,
+        config_dict: Dict[str, Tuple[str, Any]],
+        descriptions: List[Description],
+    ) -> Iterator[_JsonEntry]:
+        """
+        Generate the lines of an exported config along with their descriptions.
+        """
+        if not config_dict:
+            yield "{}", None
+            return
+
+        yield "{", None
+        yield from self._iter_entries(config_dict, descriptions, 0, "  ")
+        yield "}", None
+
+    def _format_entry(self, line: str, description: Optional[Description], pad_to: int) -> str:
+        """
+        Format a line and its description as a line of the exported config.
+        """
+        if description is None or description.text is None:
+            return line
+        if description.is_default:
+            return line + self.comment_char + " " + description.text
+        return line + " " * (pad_to - len(line)) + " " + self.comment_char + " " + description.text
+
+    @staticmethod
+    def _pad_width(entries: Iterable[_JsonEntry]) -> int:
+        """
+        Compute the width that lines with descriptions are padded to.
+        """
+        return max((len(l) for l, d in entries if d is None or not d.is_default), default=0) + 1
+
     def export(self, config: Type[Config]) -> str:
-        config_dict = self.config_to_dict(config)
-        descriptions = self.get_descriptions(config, config_dict)
-        conf_str = json.dumps(self.config_dict_to_user_config(config_dict), indent=2)
-        lines = conf_str.split("\n")
-        lines[1:-1] = self.add_descriptions(lines[1:-1], descriptions)
-        return "\n".join(lines)
+        config_dict, descriptions = self.collect(config)
+        entries = list(self._iter_config_entries(config_dict, descriptions))
+        pad_to = self._pad_width(entries)
+        return "\n".join(self._format_entry(l, d, pad_to) for l, d in entries)
+
+    def export_iter(self, config: Type[Config]) -> Iterator[str]:
+        config_dict, descriptions = self.collect(config)
+        # the lines are short-lived strings built from the key names and values, so they're cheap
+        # to generate twice
+        pad_to = self._pad_width(self._iter_config_entries(config_dict, descriptions))
+        for l, d in self._iter_config_entries(config_dict, descriptions):
+            yield self._format_entry(l, d, pad_to)
 
 
 class YamlExporter(ConfigExporter):
     """
     A configuration exporter that displays its configurations as YAML.
+
+    ``yaml`` is imported the first time a config is exported, so importing this module doesn't
+    import it.
     """
 
     comment_char = "#"
 
     def export_primitive(self, value: Any) -> str:
-        out = yaml.dump(value)
+        from . import _yaml
+        out = _yaml.dump(value)
         if out.endswith("\n...\n"):
             out = out[:-5]
         return out
 
     def export(self, config: Type[Config]) -> str:
-        config_dict = self.config_to_dict(config)
-        descriptions = self.get_descriptions(config, config_dict)
-        conf_str = yaml.dump(
+        from . import _yaml
+        config_dict, descriptions = self.collect(config)
+        conf_str = _yaml.dump(
             self.config_dict_to_user_config(config_dict),
             indent=2,
             sort_keys=False,
         ).strip()
         return "\n".join(self.add_descriptions(conf_str.split("\n"), descriptions))
 
+    def _iter_lines(self, user_config: Dict[str, Any]) -> Iterator[str]:
+        from . import _yaml
+
+        # the top-level keys are dumped one at a time unless they would need to refer to each other
+        # with aliases
+        if not user_config or _yaml.has_aliases(user_config):
+            yield from _yaml.dump(user_config, indent=2, sort_keys=False).strip().split("\n")
+            return
+
+        for n, v in user_config.items():
+            yield from _yaml.dump({n: v}, indent=2, sort_keys=False).rstrip().split("\n")
+
+
+def _fingerprint(config: Type[Config]) -> Tuple[Hashable, ...]:
+    """
+    Compute a fingerprint of the parts of a :py:class:`fica.Config` subclass that affect how it is
+    exported: the name, description, and default value of each of its keys and the fingerprints of
+    their subkey containers.
+    """
+    fingerprint = []
+    for a, key in config._get_schema().keys.items():
+        skc = key.get_subkey_container()
+        fingerprint.append((
+            a,
+            type(key),
+            key.get_name(a),
+            key.get_description(),
+            repr(key.default),
+            key.factory,
+            key.required,
+            None if skc is None else (skc, _fingerprint(skc)),
+        ))
+    return tuple(fingerprint)
+
+
+class ExportCache:
+    """
+    A least-recently-used cache of exported :py:class:`fica.Config` subclasses.
+
+    Outputs are cached by config class, exporter class, and the exporter's options (its instance
+    attributes). Along with each output, a fingerprint of the config class's keys (their names,
+    descriptions, defaults, and subkey containers) is stored, and if the fingerprint has changed
+    (e.g. because a key was added or its default was changed) when the output is retrieved, the
+    config is exported again. The cache is guarded by a lock, so it can be shared between threads.
+
+    The cache is used by passing an exporter and a config to :py:meth:`export` instead of calling
+    the exporter's :py:meth:`ConfigExporter.export` method directly, so it works with any subclass
+    of :py:class:`ConfigExporter`.
+
+    Note that the default values of keys with factories are only computed when the config is
+    first exported.
+
+    Args:
+        maxsize (``int | None``): the maximum number of outputs to cache; if ``None``, the cache is
+            unbounded
+    """
+
+    _maxsize: Optional[int]
+    """the maximum number of outputs to cache"""
+
+    _cache: "OrderedDict[Tuple[Hashable, ...], Tuple[Tuple[Hashable, ...], str]]"
+    """the cached fingerprints and outputs, ordered from least to most recently used"""
+
+    def __init__(self, maxsize: Optional[int] = 128) -> None:
+        self._maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def export(self, exporter: ConfigExporter, config: Type[Config]) -> str:
+        """
+        Export a config with an exporter, returning the cached output if there is one.
+
+        Args:
+            exporter (:py:class:`ConfigExporter`): the exporter
+            config (``type[Config]``): the :py:class:`fica.Config` subclass to export
+
+        Returns:
+            ``str``: the exported config
+        """
+        options = tuple(sorted(vars(exporter).items()))
+        key, fingerprint = (config, type(exporter), options), _fingerprint(config)
+        try:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] == fingerprint:
+                    self._cache.move_to_end(key)
+                    return cached[1]
+        except TypeError:
+            # the exporter has unhashable options
+            return exporter.export(config)
+
+        out = exporter.export(config)
+        with self._lock:
+            if self._maxsize is None or self._maxsize > 0:
+                self._cache[key] = (fingerprint, out)
+                self._cache.move_to_end(key)
+                if self._maxsize is not None and len(self._cache) > self._maxsize:
+                    self._cache.popitem(last=False)
+
+        return out
+
+    def clear(self) -> None:
+        """
+        Remove all outputs from the cache.
+        """
+        with self._lock:
+            self._cache.clear()
+
 
 EXPORTER_CLASSES = {
     "json": JsonExporter,
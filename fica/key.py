@@ -1,6 +1,8 @@
 """Configuration keys"""
 
-from typing import Any, Callable, Optional, Tuple, Type, Union
+import weakref
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
 
 from .config import Config
 from .validators import _Validator
@@ -14,6 +16,9 @@ class _Empty:
     def __repr__(self) -> str:
         return "fica.EMPTY"
 
+    def __reduce__(self) -> str:
+        return "EMPTY"
+
 
 class _Subkeys():
     """
@@ -23,6 +28,9 @@ class _Subkeys():
     def __repr__(self) -> str:
         return "fica.SUBKEYS"
 
+    def __reduce__(self) -> str:
+        return "SUBKEYS"
+
 
 EMPTY = _Empty()
 SUBKEYS = _Subkeys()
@@ -48,6 +56,11 @@ class Key:
     This function will be called each time a :py:class:`fica.Config` is created to set the value of
     the key if no value is specified by the user.
 
+    To avoid creating a new instance of the subkey container for each config that doesn't specify a
+    value for a key, set ``share_default`` to ``True``. All such configs then share a single
+    read-only instance of the subkey container, which is replaced with a private copy when the key is
+    updated through its parent config (e.g. with :py:meth:`fica.Config.update`).
+
     Args:
         description (``str | None``): a description of the configuration for documentation
         default (``object``): the default value of the key
@@ -61,6 +74,10 @@ class Key:
             attribute name on the :py:class:`fica.Config` object)
         factory (``callable[[], object] | None``): a factory used to create the default value of the
             key
+        required (``bool``): whether the key is required to be specified by the user
+        share_default (``bool``): whether configs that don't specify a value for this key should
+            share a single read-only instance of the subkey container instead of each creating their
+            own
     """
 
     description: Optional[str]
@@ -93,6 +110,16 @@ class Key:
     required: bool
     """whether the key is required to be specified by the user"""
 
+    share_default: bool
+    """whether the default subkey container instance is shared between configs"""
+
+    _plan: Callable[[Any, bool], Any]
+    """a function specialized to this key's configuration that computes its value"""
+
+    _owners: List["weakref.ref[Type[Config]]"]
+    """weak references to the config classes this key has been assigned to, whose key schemas are
+    invalidated when the key's configuration changes"""
+
     def __init__(
         self,
         description: Optional[str] = None,
@@ -105,6 +132,7 @@ class Key:
         name: Optional[str] = None,
         factory: Optional[Callable[[], Any]] = None,
         required: bool = False,
+        share_default: bool = False,
     ) -> None:
         if type_ is not None:
             if not (isinstance(type_, Type) or (isinstance(type_, tuple) and \
@@ -141,6 +169,9 @@ class Key:
         if required and (default is not None or factory is not None):
             raise ValueError('A required key cannot have a default value or factory')
 
+        if share_default and subkey_container is None:
+            raise ValueError("Cannot share defaults when no subkey container is provided")
+
         self.description = description
         self.default = default
         self.type_ = type_
@@ -151,6 +182,24 @@ class Key:
         self.name = name
         self.factory = factory
         self.required = required
+        self.share_default = share_default
+        self._plan = self._compile_plan()
+        self._owners = []
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._owners.append(weakref.ref(owner))
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        # regular configs store key values in their instance __dict__, which takes precedence over
+        # this method, so it is only reached for compact configs or keys whose values aren't set
+        if instance is None:
+            return self
+        # check the class flag instead of using isinstance, which is slow for subclasses of abc.ABC
+        if getattr(owner, "_compact", False):
+            return instance._get_key_value(self)
+        if getattr(instance, "_view", None) is not None:
+            return instance._resolve_view_key(self)
+        return self
 
     def get_description(self) -> Optional[str]:
         """
@@ -213,40 +262,209 @@ class Key:
             ``TypeError``: if the user-specified value is not of the correct type
             ``ValueError``: if the user-specified value fails validation
         """
-        if self.use_default(user_value):
-            if self.default is SUBKEYS:
-                return self.subkey_container(require_valid_keys=require_valid_keys)
+        return self._plan(user_value, require_valid_keys)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        object.__setattr__(self, attr, value)
+        # recompile the plan and invalidate the schemas of the classes the key belongs to if the
+        # key's configuration changes after it has been constructed
+        if not attr.startswith("_") and "_plan" in self.__dict__:
+            self._plan = self._compile_plan()
+            for ref in self._owners:
+                owner = ref()
+                if owner is not None and issubclass(owner, Config):
+                    owner._invalidate_schema()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # compiled plans are closures and owners are weak references, neither of which can be
+        # pickled, so plans are recompiled when keys are unpickled
+        state = self.__dict__.copy()
+        state.pop("_plan", None)
+        state.pop("_owners", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._plan = self._compile_plan()
+        self._owners = []
+
+    def _compile_plan(self) -> Callable[[Any, bool], Any]:
+        """
+        Create a function that computes the value of this key in the same way as
+        :py:meth:`get_value`, specialized to the configuration of this key so that branches that
+        can't apply to it aren't evaluated on each call.
 
-            elif self.factory:
-                return self.factory()
+        Returns:
+            ``callable[[object, bool], object]``: the compiled plan, which accepts the user-specified
+            value and ``require_valid_keys``
+        """
+        default, factory, required = self.default, self.factory, self.required
+        type_, allow_none, validator = self.type_, self.allow_none, self.validator
+        subkey_container, enforce_subkeys = self.subkey_container, self.enforce_subkeys
+        share_default = self.share_default
+
+        # plain scalar keys with a constant default, which are the most common
+        if not required and validator is None and subkey_container is None and factory is None:
+            if type_ is None:
+                def plan(user_value, require_valid_keys):
+                    return default if user_value is EMPTY else user_value
+
+            elif allow_none:
+                def plan(user_value, require_valid_keys):
+                    if user_value is EMPTY:
+                        return default
+                    if user_value is not None and not isinstance(user_value, type_):
+                        raise TypeError("User-specified value is not of the correct type")
+                    return user_value
 
             else:
-                return self.default
-
-        else:
-            if self.required and user_value is EMPTY:
-                raise ValueError("Key is required but there is no user-specified value")
-
-            if not ((self.type_ is None or isinstance(user_value, self.type_)) or \
-                    (self.allow_none and user_value is None)):
+                def plan(user_value, require_valid_keys):
+                    if user_value is EMPTY:
+                        return default
+                    if not isinstance(user_value, type_):
+                        raise TypeError("User-specified value is not of the correct type")
+                    return user_value
+
+            return plan
+
+        def plan(user_value, require_valid_keys):
+            if user_value is EMPTY:
+                if required:
+                    raise ValueError("Key is required but there is no user-specified value")
+                if default is SUBKEYS:
+                    if share_default:
+                        return subkey_container._get_shared_default()
+                    return subkey_container(require_valid_keys=require_valid_keys)
+                if factory:
+                    return factory()
+                return default
+
+            if type_ is not None and not (isinstance(user_value, type_) or \
+                    (allow_none and user_value is None)):
                 raise TypeError("User-specified value is not of the correct type")
 
             # validate the value
-            if self.validator is not None:
-                err = self.validator.validate(user_value)
+            if validator is not None:
+                err = validator.validate(user_value)
                 if err is not None:
                     raise ValueError(f"User-specified value failed validation: {err}")
 
             # handle user-inputted dict w/ missing subkeys
-            if self.subkey_container is not None:
+            if subkey_container is not None:
                 if isinstance(user_value, dict):
-                    return self.subkey_container(user_value, require_valid_keys=require_valid_keys)
+                    return subkey_container(user_value, require_valid_keys=require_valid_keys)
 
-                elif self.enforce_subkeys:
+                elif enforce_subkeys:
                     raise ValueError("Cannot override subkeys for a key with enforced subkeys")
 
             return user_value
 
+        return plan
+
+    def _get_view_value(
+        self,
+        user_value: Any,
+        require_valid_keys: bool,
+        path: str,
+        default_key: Optional[str],
+    ) -> Any:
+        """
+        Compute the value of this key in a view (see :py:meth:`fica.Config.view`) in the same way as
+        :py:meth:`get_value`, except that subkey containers are created as views.
+
+        Args:
+            user_value (``object``): the value specified by the user
+            require_valid_keys (``bool``): whether to require that all keys in the user config are
+                valid in the subkey container, if applicable
+            path (``str``): the dotted path of the subkey container in the root view (e.g.
+                ``bar.``)
+            default_key (``str | None``): the key that errors raised while computing the default
+                values of the subkey container are wrapped in, if any
+
+        Returns:
+            ``object``: the value of the key
+
+        Raises:
+            ``TypeError``: if the user-specified value is not of the correct type
+            ``ValueError``: if the user-specified value fails validation
+        """
+        if self.subkey_container is None or type(self)._compile_plan is not Key._compile_plan:
+            return self._plan(user_value, require_valid_keys)
+
+        if user_value is EMPTY:
+            if self.default is SUBKEYS and not self.share_default:
+                return self.subkey_container._create_view(
+                    {}, require_valid_keys, path, default_key)
+
+        elif isinstance(user_value, dict):
+            if self.type_ is not None and not isinstance(user_value, self.type_):
+                raise TypeError("User-specified value is not of the correct type")
+
+            if self.validator is not None:
+                err = self.validator.validate(user_value)
+                if err is not None:
+                    raise ValueError(f"User-specified value failed validation: {err}")
+
+            return self.subkey_container._create_view(
+                user_value, require_valid_keys, path, path[:-1])
+
+        return self._plan(user_value, require_valid_keys)
+
+    def _iter_errors(self, user_value: Any, require_valid_keys: bool) -> Iterator[Exception]:
+        """
+        Find the errors that :py:meth:`get_value` would raise for a user-specified value without
+        computing the value.
+
+        Unlike :py:meth:`get_value`, which stops at the first error, this method yields all of the
+        errors in the subkeys of the value, if applicable, wrapped in
+        :py:class:`ConfigProcessingException<fica.utils.ConfigProcessingException>` objects keyed by
+        their paths relative to this key.
+
+        Args:
+            user_value (``object``): the value specified by the user
+            require_valid_keys (``bool``): whether to require that all keys in the user config are
+                valid in the subkey container, if applicable
+
+        Returns:
+            ``iterator[Exception]``: the errors
+        """
+        if user_value is EMPTY:
+            if self.required:
+                yield ValueError("Key is required but there is no user-specified value")
+            elif self.default is SUBKEYS:
+                # the default subkey container is created from an empty user config, which fails if
+                # any of its subkeys are required
+                yield from self.subkey_container._iter_errors({}, require_valid_keys)
+            return
+
+        if self.type_ is not None and not (isinstance(user_value, self.type_) or \
+                (self.allow_none and user_value is None)):
+            yield TypeError("User-specified value is not of the correct type")
+            return
+
+        if self.validator is not None:
+            # get_value lets errors raised by validators propagate, so they are reported as they are
+            try:
+                err = self.validator.validate(user_value)
+            except Exception as e:
+                yield e
+                return
+            if err is not None:
+                yield ValueError(f"User-specified value failed validation: {err}")
+                return
+
+        if self.subkey_container is not None:
+            if isinstance(user_value, dict):
+                try:
+                    Config._validate_user_config(user_value)
+                except TypeError as e:
+                    yield e
+                else:
+                    yield from self.subkey_container._iter_errors(user_value, require_valid_keys)
+
+            elif self.enforce_subkeys:
+                yield ValueError("Cannot override subkeys for a key with enforced subkeys")
+
     def get_default(self) -> Any:
         """
         Get the default valu of this key.
@@ -0,0 +1,429 @@
+"""Loading configs incrementally from JSON and YAML streams"""
+
+import codecs
+import json
+import os
+import re
+
+from collections.abc import Hashable
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Set, TextIO, Tuple, Type, Union
+
+from .config import _CheckedUserConfig, Config
+from .utils import ConfigProcessingException
+
+
+KeyCallback = Callable[[Any], None]
+"""the type of callbacks called with the name of each key before its value is parsed"""
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+"""a pattern matching characters that could continue a number"""
+
+_YAML_MERGE_TAG = "tag:yaml.org,2002:merge"
+"""the tag of YAML merge keys (``<<``)"""
+
+_MAX_PARTIAL_TOKEN = len("-Infinity")
+"""the maximum length of the part of a token at the end of the buffer that can cause a decoding
+error because the rest of the token hasn't been read yet (e.g. ``tr`` or ``\\u00``)"""
+
+
+class _JSONStreamReader:
+    """
+    A buffered reader that decodes the JSON values in a stream one at a time.
+
+    Only the unconsumed part of the stream is kept in the buffer, so the memory used by the reader
+    is proportional to the size of the largest value decoded rather than that of the whole stream.
+
+    Args:
+        stream (``typing.BinaryIO | typing.TextIO``): the stream to read from
+        chunk_size (``int``): the minimum number of bytes or characters to read at a time
+    """
+
+    _buffer: str
+    """the characters that have been read from the stream but not consumed"""
+
+    _pos: int
+    """the position of the next unconsumed character in the buffer"""
+
+    _eof: bool
+    """whether the end of the stream has been reached"""
+
+    def __init__(self, stream: Union[BinaryIO, TextIO], chunk_size: int) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self) -> bool:
+        """
+        Read more of the stream into the buffer, discarding the consumed characters.
+
+        At least as many characters as are currently unconsumed are read so that a value spanning
+        many chunks is only re-decoded a logarithmic number of times.
+
+        Returns:
+            ``bool``: whether anything was read (i.e. whether the end of the stream had not been
+            reached)
+        """
+        if self._eof:
+            return False
+
+        raw = self._stream.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if not raw:
+            self._eof = True
+            chunk = self._text_decoder.decode(b"", final=True) if isinstance(raw, bytes) else ""
+            if not chunk:
+                return False
+        else:
+            chunk = self._text_decoder.decode(raw) if isinstance(raw, bytes) else raw
+
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character in the stream without consuming it.
+
+        Returns:
+            ``str``: the next character, or an empty string at the end of the stream
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return ""
+
+    def expect(self, char: str, message: str) -> None:
+        """
+        Consume the next non-whitespace character, which must be ``char``.
+
+        Raises:
+            ``json.JSONDecodeError``: if the next character is not ``char``
+        """
+        if self.peek() != char:
+            self.error(message)
+        self._pos += 1
+
+    def error(self, message: str) -> None:
+        """
+        Raise a ``json.JSONDecodeError`` at the current position.
+        """
+        raise json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def decode_value(self) -> Any:
+        """
+        Decode and consume the next value in the stream.
+
+        Returns:
+            ``object``: the decoded value
+
+        Raises:
+            ``json.JSONDecodeError``: if the value is not valid JSON
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # if the error is at the end of the buffer, the value may just be incomplete, so try
+                # again with more of the stream; otherwise, the value is invalid no matter what
+                # follows it, so the rest of the stream isn't read
+                if self._may_be_truncated(e) and self._read():
+                    continue
+                raise
+
+            # a number that ends at the end of the buffer or is followed only by characters that
+            # could continue it (e.g. ``1.``) may continue in the next chunk
+            if isinstance(value, (int, float)) and \
+                    _NUMBER_TAIL.match(self._buffer, end).end() == len(self._buffer) and \
+                    self._read():
+                continue
+
+            self._pos = end
+            return value
+
+    def _may_be_truncated(self, error: json.JSONDecodeError) -> bool:
+        """
+        Determine whether an error raised while decoding a value may have been caused by the value
+        continuing past the end of the buffer.
+        """
+        # unterminated strings run to the end of the buffer
+        return error.msg.startswith("Unterminated string") or \
+            len(self._buffer) - error.pos <= _MAX_PARTIAL_TOKEN
+
+
+def iter_json_items(
+    stream: Union[BinaryIO, TextIO],
+    on_key: KeyCallback,
+    chunk_size: int = 65536,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Parse the key-value pairs of the JSON object in a stream one at a time.
+
+    Args:
+        stream (``typing.BinaryIO | typing.TextIO``): the stream
+        on_key (``callable[[object], None]``): a function called with each key before its value
+            is parsed
+        chunk_size (``int``): the minimum number of bytes or characters to read at a time
+
+    Returns:
+        ``iterator[tuple[str, object]]``: the key-value pairs
+
+    Raises:
+        ``json.JSONDecodeError``: if the stream does not contain valid JSON
+        ``TypeError``: if the stream does not contain a JSON object
+    """
+    reader = _JSONStreamReader(stream, chunk_size)
+    c = reader.peek()
+    if c != "{":
+        if c == "":
+            reader.error("Expecting value")
+        raise TypeError("The user-specified configurations must be passed as a dictionary")
+
+    reader.expect("{", "Expecting '{'")
+    if reader.peek() == "}":
+        reader.expect("}", "Expecting '}'")
+
+    else:
+        while True:
+            if reader.peek() != '"':
+                reader.error("Expecting property name enclosed in double quotes")
+
+            name = reader.decode_value()
+            on_key(name)
+            reader.expect(":", "Expecting ':' delimiter")
+            yield name, reader.decode_value()
+
+            if reader.peek() == "}":
+                reader.expect("}", "Expecting '}'")
+                break
+            reader.expect(",", "Expecting ',' delimiter")
+
+    if reader.peek() != "":
+        reader.error("Extra data")
+
+
+def _iter_merged_yaml_items(
+    loader: Any,
+    merge_key: Any,
+    yielded: Set[Any],
+    on_key: KeyCallback,
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Construct the rest of a YAML mapping, starting at a merge key, as a whole and generate the
+    key-value pairs it contains that take precedence over those already generated.
+
+    Keys merged into a mapping take precedence only over keys that aren't specified in the mapping
+    itself, wherever the merge key is, so the rest of the mapping has to be composed before any of
+    its keys can be generated.
+
+    Args:
+        loader (``fica._yaml.EventLoader``): the loader, positioned after the merge key
+        merge_key (``yaml.Node``): the node of the merge key
+        yielded (``set[object]``): the keys already generated from the mapping
+        on_key (``callable[[object], None]``): a function called with each key generated
+
+    Returns:
+        ``iterator[tuple[object, object]]``: the key-value pairs
+    """
+    import yaml
+
+    pairs = [(merge_key, loader.compose_node(None, None))]
+    while not loader.check_event(yaml.MappingEndEvent):
+        pairs.append((loader.compose_node(None, None), loader.compose_node(None, None)))
+
+    # keys specified again after the merge key replace their earlier values, but merged keys don't
+    for key_node, _ in pairs:
+        if key_node.tag != _YAML_MERGE_TAG:
+            name = loader.construct_document(key_node)
+            if isinstance(name, Hashable):
+                yielded.discard(name)
+
+    mapping = loader.construct_document(yaml.MappingNode(
+        "tag:yaml.org,2002:map", pairs, merge_key.start_mark, pairs[-1][1].end_mark))
+    for name, value in mapping.items():
+        if name not in yielded:
+            on_key(name)
+            yield name, value
+
+
+def iter_yaml_items(
+    stream: Union[BinaryIO, TextIO],
+    on_key: KeyCallback,
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Parse the key-value pairs of the YAML mapping in a stream one at a time.
+
+    The stream is parsed with the YAML event API (using libyaml, if it is available), and each value
+    is composed and constructed separately, so only one value is held as a YAML node at a time. If
+    the mapping contains a merge key (``<<``), the rest of the mapping is composed and constructed
+    at once so that merged keys don't override the keys specified in the mapping; ``on_key`` is
+    then called with those keys after their values have been parsed.
+
+    Args:
+        stream (``typing.BinaryIO | typing.TextIO``): the stream
+        on_key (``callable[[object], None]``): a function called with each key before its value
+            is parsed
+
+    Returns:
+        ``iterator[tuple[object, object]]``: the key-value pairs
+
+    Raises:
+        ``yaml.YAMLError``: if the stream does not contain valid YAML
+        ``TypeError``: if the stream does not contain a YAML mapping
+    """
+    import yaml
+    from ._yaml import EventLoader
+
+    loader = EventLoader(stream)
+    try:
+        loader.get_event()  # StreamStartEvent
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+
+        document = loader.get_event()  # DocumentStartEvent
+        if not loader.check_event(yaml.MappingStartEvent):
+            if loader.construct_document(loader.compose_node(None, None)) is not None:
+                raise TypeError("The user-specified configurations must be passed as a dictionary")
+
+        else:
+            loader.get_event()  # MappingStartEvent
+            yielded = set()
+            while not loader.check_event(yaml.MappingEndEvent):
+                key_node = loader.compose_node(None, None)
+                if key_node.tag == _YAML_MERGE_TAG:
+                    yield from _iter_merged_yaml_items(loader, key_node, yielded, on_key)
+                    break
+
+                name = loader.construct_document(key_node)
+                on_key(name)
+                if isinstance(name, Hashable):
+                    yielded.add(name)
+                yield name, loader.construct_document(loader.compose_node(None, None))
+            loader.get_event()  # MappingEndEvent
+
+        loader.get_event()  # DocumentEndEvent
+        if not loader.check_event(yaml.StreamEndEvent):
+            event = loader.get_event()
+            raise yaml.composer.ComposerError(
+                "expected a single document in the stream", document.start_mark,
+                "but found another document", event.start_mark)
+
+    finally:
+        loader.dispose()
+
+
+PARSERS = {
+    "json": iter_json_items,
+    "yaml": iter_yaml_items,
+}
+"""a dictionary mapping formats to the functions used to parse streams in them"""
+
+
+EXTENSIONS = {
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+"""a dictionary mapping file extensions to the formats of files with them"""
+
+
+def load_stream(
+    config_cls: Type[Config],
+    stream: Union[BinaryIO, TextIO],
+    format: str = "json",
+    require_valid_keys: bool = False,
+) -> Config:
+    """
+    Create a config from a JSON or YAML stream, checking each key as soon as it is parsed.
+
+    Unexpected keys are rejected (if ``require_valid_keys`` is true) before their values are
+    parsed, and the value of each key is computed (and therefore checked) as soon as it has been
+    parsed, so reading stops at the first invalid key instead of after the whole stream has been
+    read. The config is then created from the computed values, so the values aren't checked again
+    (e.g. validators are only called once for each value).
+
+    Args:
+        config_cls (``type[fica.Config]``): the config class to create
+        stream (``typing.BinaryIO | typing.TextIO``): the stream
+        format (``str``): the format of the stream (one of the keys of :py:data:`PARSERS`)
+        require_valid_keys (``bool``): whether to require that all keys in the stream are valid
+
+    Returns:
+        ``fica.Config``: the config
+
+    Raises:
+        ``ValueError``: if ``format`` is not supported
+    """
+    if format not in PARSERS:
+        raise ValueError(f"Unsupported format: '{format}'")
+
+    schema = config_cls._get_schema()
+    names_to_attrs, keys = schema.names_to_attrs, schema.keys
+
+    def check_key(name):
+        if not isinstance(name, str):
+            raise TypeError(
+                "Some keys of the user-specified configurations dictionary are not strings")
+        if require_valid_keys and name not in names_to_attrs:
+            raise ValueError(f"Unexpected key found in config: '{name}'")
+
+    user_config = _CheckedUserConfig({})
+    for name, value in PARSERS[format](stream, check_key):
+        # values of keys that aren't in the config would be ignored, so discard them right away
+        if name not in names_to_attrs:
+            continue
+
+        try:
+            computed = keys[names_to_attrs[name]].get_value(
+                value, require_valid_keys=require_valid_keys)
+        except Exception as e:
+            # wrap the error message with one containing the key name, as creating the config would
+            if isinstance(e, ConfigProcessingException):
+                raise ConfigProcessingException.from_child(name, e)
+            else:
+                raise ConfigProcessingException(name, e)
+
+        user_config[name] = value
+        user_config.values[name] = computed
+
+    return config_cls(user_config, require_valid_keys=require_valid_keys)
+
+
+def load_file(
+    config_cls: Type[Config],
+    path: Union[str, "os.PathLike[str]"],
+    format: Optional[str] = None,
+    require_valid_keys: bool = False,
+) -> Config:
+    """
+    Create a config from a JSON or YAML file with :py:func:`load_stream`.
+
+    Args:
+        config_cls (``type[fica.Config]``): the config class to create
+        path (``str | os.PathLike``): the path to the file
+        format (``str | None``): the format of the file; if unspecified, it is determined from the
+            file's extension using :py:data:`EXTENSIONS`
+        require_valid_keys (``bool``): whether to require that all keys in the file are valid
+
+    Returns:
+        ``fica.Config``: the config
+
+    Raises:
+        ``ValueError``: if no format is specified and the file's extension is not recognized
+    """
+    if format is None:
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in EXTENSIONS:
+            raise ValueError(f"Cannot determine the format of files with extension '{ext}'")
+        format = EXTENSIONS[ext]
+
+    with open(path, "rb") as f:
+        return load_stream(config_cls, f, format=format, require_valid_keys=require_valid_keys)
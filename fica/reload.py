@@ -0,0 +1,354 @@
+"""Reloading configs from files when they change"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from .config import _is_shared_default, _values_differ, Config
+from .key import EMPTY
+from .utils import ConfigProcessingException
+
+
+ChangeCallback = Callable[[Config, Dict[str, Tuple[Any, Any]]], None]
+"""the type of callbacks notified when a reloaded config changes"""
+
+
+def load_json(contents: bytes) -> Dict[str, Any]:
+    """
+    Parse the contents of a JSON config file.
+    """
+    return json.loads(contents)
+
+
+def load_yaml(contents: bytes) -> Dict[str, Any]:
+    """
+    Parse the contents of a YAML config file, using libyaml if it is available.
+    """
+    from ._yaml import safe_load
+    return safe_load(contents)
+
+
+LOADERS = {
+    ".json": load_json,
+    ".yaml": load_yaml,
+    ".yml": load_yaml,
+}
+"""a dictionary mapping file extensions to the functions used to parse files with them"""
+
+
+def _get_nested_config(config: Config, name: str) -> Optional[Config]:
+    """
+    Get the config that :py:meth:`fica.Config.update` updates in place when the value of a key is
+    a dictionary, if there is one.
+    """
+    attr = config._get_names_to_attrs().get(name)
+    value = getattr(config, attr) if attr is not None else None
+    return value if isinstance(value, Config) and not _is_shared_default(value) else None
+
+
+def _diff_user_configs(config: Config, old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Create a user config that updates a config created from ``old`` so that it matches a config
+    created from ``new``. The user config only contains the keys whose values differ, recursing
+    into the user configs of nested configs, and sets keys that are in ``old`` but not ``new`` to
+    :py:data:`fica.EMPTY` (i.e. resets them to their defaults).
+    """
+    patch = {}
+    for k, v in new.items():
+        if k not in old:
+            patch[k] = v
+            continue
+
+        nested = _get_nested_config(config, k)
+        if nested is not None and isinstance(v, dict) and isinstance(old[k], dict):
+            nested_patch = _diff_user_configs(nested, old[k], v)
+            if nested_patch:
+                patch[k] = nested_patch
+
+        # values of different types are different even if they are equal (e.g. 1 and True)
+        elif type(old[k]) is not type(v) or _values_differ(old[k], v):
+            patch[k] = v
+
+    for k in old:
+        if k not in new:
+            patch[k] = EMPTY
+
+    return patch
+
+
+def _copy_for_patch(config: Config, patch: Dict[str, Any]) -> Config:
+    """
+    Create a shallow copy of a config that a user config created by :py:func:`_diff_user_configs`
+    can be applied to without modifying the original, copying the nested configs that the user
+    config updates in place, recursively. The copies keep the generations and dirty keys of the
+    configs they were copied from.
+    """
+    copied, schema = copy.copy(config), config._get_schema()
+    for k, v in patch.items():
+        nested = _get_nested_config(config, k)
+        if nested is not None and isinstance(v, dict):
+            attr = schema.names_to_attrs[k]
+            copied._store_value(attr, schema.positions[attr], _copy_for_patch(nested, v))
+    return copied
+
+
+def _iter_patch_errors(
+    config: Config,
+    patch: Dict[str, Any],
+    require_valid_keys: bool,
+) -> Iterator[Exception]:
+    """
+    Find the errors that updating a config with a user config created by
+    :py:func:`_diff_user_configs` would raise without updating it.
+    """
+    rest = {}
+    for k, v in patch.items():
+        nested = _get_nested_config(config, k)
+        if nested is None or not isinstance(v, dict):
+            rest[k] = v
+            continue
+
+        # nested configs are updated in place, so only the keys in their user configs are checked
+        try:
+            nested._validate_user_config(v)
+        except TypeError as e:
+            yield ConfigProcessingException(k, e)
+            continue
+        for e in _iter_patch_errors(nested, v, require_valid_keys):
+            yield ConfigProcessingException.from_child(k, e)
+
+    yield from type(config)._iter_errors(rest, require_valid_keys, partial=True)
+
+
+class ConfigReloader:
+    """
+    A manager that keeps a :py:class:`fica.Config` in sync with the JSON or YAML file it was loaded
+    from.
+
+    The file is polled for changes to its modification time and size, either manually with
+    :py:meth:`check` or in a background thread started with :py:meth:`start`. Once a change has
+    settled for ``debounce`` seconds (so that bursts of writes only cause a single reload), the file
+    is read and, if its contents have changed, parsed and compared to the previous contents of the
+    file. Only the keys whose values changed are checked and then applied with
+    :py:meth:`fica.Config.update` to a copy of :py:attr:`config` (copying only the nested configs
+    that change), which carries over the config's generation and dirty keys (see
+    :py:meth:`fica.Config.get_generation` and :py:meth:`fica.Config.get_dirty_keys`) so that they
+    reflect all of the reloads applied to it. Callbacks registered with :py:meth:`add_callback` are
+    then called with the new config and the changes returned by :py:meth:`fica.Config.update`.
+
+    Reloads are applied atomically: the new config is published by assigning it to
+    :py:attr:`config` once all of the changes have been applied to it, and the previous config is
+    never modified. Threads reading the config never need to acquire a lock; to see the values of
+    several keys from the same version of the file, they should get :py:attr:`config` once and
+    read the keys from that object.
+
+    Args:
+        config_cls (``type[fica.Config]``): the config class to load the file into
+        path (``str | os.PathLike``): the path to the config file
+        require_valid_keys (``bool``): whether to require that all keys in the file are valid
+        loader (``callable[[bytes], dict[str, object]] | None``): a function that parses the
+            contents of the file; if unspecified, it is chosen from :py:data:`LOADERS` based on the
+            file's extension
+        poll_interval (``float``): the number of seconds between polls in the background thread
+        debounce (``float``): the number of seconds a change to the file must settle for before it
+            is reloaded
+
+    Raises:
+        ``ValueError``: if no loader is specified and the file's extension is not recognized
+    """
+
+    config: Config
+    """the config, which is replaced with an updated copy when the file is reloaded"""
+
+    _user_config: Dict[str, Any]
+    """the user config parsed from the file when it was last loaded"""
+
+    _callbacks: List[ChangeCallback]
+    """the callbacks to notify when the config changes"""
+
+    _changed_at: Optional[float]
+    """the time at which an unsettled change to the file was last detected"""
+
+    _thread: Optional[threading.Thread]
+    """the background polling thread, if it is running"""
+
+    def __init__(
+        self,
+        config_cls: Type[Config],
+        path: Union[str, "os.PathLike[str]"],
+        require_valid_keys: bool = False,
+        loader: Optional[Callable[[bytes], Dict[str, Any]]] = None,
+        poll_interval: float = 1.0,
+        debounce: float = 0.1,
+    ) -> None:
+        if loader is None:
+            ext = os.path.splitext(path)[1].lower()
+            if ext not in LOADERS:
+                raise ValueError(f"No loader is available for files with extension '{ext}'")
+            loader = LOADERS[ext]
+
+        self._config_cls = config_cls
+        self._path = path
+        self._require_valid_keys = require_valid_keys
+        self._loader = loader
+        self._poll_interval = poll_interval
+        self._debounce = debounce
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        self._last_stat = self._stat()
+        self._changed_at = None
+        contents = self._read()
+        self._digest = hashlib.sha256(contents).digest()
+        self._user_config = self._parse(contents)
+        self.config = self._create_config(self._user_config)
+
+    def _stat(self) -> Tuple[int, int, int]:
+        """
+        Get the modification time, size, and inode of the file.
+        """
+        st = os.stat(self._path)
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _read(self) -> bytes:
+        """
+        Read the contents of the file.
+        """
+        with open(self._path, "rb") as f:
+            return f.read()
+
+    def _parse(self, contents: bytes) -> Dict[str, Any]:
+        """
+        Parse the contents of the file into a user config.
+        """
+        user_config = self._loader(contents)
+        return {} if user_config is None else user_config
+
+    def _create_config(self, user_config: Dict[str, Any]) -> Config:
+        """
+        Create an instance of the config class from a user config.
+        """
+        return self._config_cls(user_config, require_valid_keys=self._require_valid_keys)
+
+    def add_callback(self, callback: ChangeCallback) -> None:
+        """
+        Register a function to be called each time a reload changes the config.
+
+        Callbacks are called with the new config and a dictionary mapping the dotted paths of the
+        keys whose values changed to tuples containing their old and new values.
+
+        Args:
+            callback (``callable[[fica.Config, dict[str, tuple[object, object]]], None]``): the
+                callback
+        """
+        self._callbacks.append(callback)
+
+    def check(self) -> Optional[Dict[str, Tuple[Any, Any]]]:
+        """
+        Check whether the file has changed and reload it if it has and the change has settled.
+
+        Returns:
+            ``dict[str, tuple[object, object]] | None``: the changes made to the config, or
+            ``None`` if the file was not reloaded
+
+        Raises:
+            ``Exception``: if an error occurs while parsing the file or updating the config
+        """
+        stat, now = self._stat(), time.monotonic()
+        if stat != self._last_stat:
+            self._last_stat, self._changed_at = stat, now
+
+        if self._changed_at is None or now - self._changed_at < self._debounce:
+            return None
+
+        self._changed_at = None
+        return self.reload()
+
+    def reload(self) -> Optional[Dict[str, Tuple[Any, Any]]]:
+        """
+        Reload the file if its contents have changed.
+
+        The keys that changed are checked before any of them are applied, so if the file is invalid,
+        the config is left unchanged. Otherwise, they are applied to a copy of the config, which
+        then replaces :py:attr:`config`.
+
+        Returns:
+            ``dict[str, tuple[object, object]] | None``: the changes made to the config, or
+            ``None`` if the contents of the file have not changed
+
+        Raises:
+            ``Exception``: if an error occurs while parsing the file or updating the config
+        """
+        with self._lock:
+            contents = self._read()
+            digest = hashlib.sha256(contents).digest()
+            if digest == self._digest:
+                return None
+
+            user_config = self._parse(contents)
+            Config._validate_user_config(user_config)
+
+            patch = _diff_user_configs(self.config, self._user_config, user_config)
+            for error in _iter_patch_errors(self.config, patch, self._require_valid_keys):
+                raise error
+
+            config = _copy_for_patch(self.config, patch)
+            changes = config.update(patch)
+
+            # publish the new config with a single assignment so that readers see either all of
+            # the changes or none of them
+            self.config = config
+            self._digest, self._user_config = digest, user_config
+
+        if changes:
+            for callback in self._callbacks:
+                callback(config, changes)
+
+        return changes
+
+    def start(self, error_callback: Optional[Callable[[Exception], None]] = None) -> None:
+        """
+        Start polling the file for changes in a background daemon thread.
+
+        Args:
+            error_callback (``callable[[Exception], None] | None``): a function called with any
+                errors that occur while reloading the file; errors are otherwise ignored
+
+        Raises:
+            ``RuntimeError``: if the background thread is already running
+        """
+        if self._thread is not None:
+            raise RuntimeError("The reloader is already running")
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._poll, args=(error_callback, ), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread, if it is running, and wait for it to exit.
+        """
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _poll(self, error_callback: Optional[Callable[[Exception], None]]) -> None:
+        """
+        Poll the file for changes until the reloader is stopped.
+        """
+        while not self._stop_event.wait(self._poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                if error_callback is not None:
+                    error_callback(e)
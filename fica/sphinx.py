@@ -1,20 +1,44 @@
-"""fica Sphinx extension"""
+"""
+fica Sphinx extension
+
+Sphinx and docutils are only imported when :py:class:`FicaDirective` is first accessed (e.g. by
+:py:func:`setup`), so the other functions in this module can be used without importing them.
+"""
+
+import inspect
 
-from docutils.parsers.rst import directives
 from importlib import import_module
-from sphinx.directives.code import CodeBlock
-from sphinx.util.typing import OptionSpec
+from typing import Any, Dict, List, Set, Tuple, Type, TYPE_CHECKING
 
+from .config import Config
 from .exporter import create_exporter
 from .version import __version__
 
 
+if TYPE_CHECKING:
+    from sphinx.environment import BuildEnvironment
+
+
 LEXER_OVERRIDES = {
     "json": "javascript",
 }
 """alternative Pygments lexers to use for specific export formats"""
 
 
+ExportCacheEntry = Tuple[str, List[str]]
+"""the type of the entries in the cache of exports stored in the Sphinx environment: the exported
+config and the paths to the source files it depends on"""
+
+
+def _import_object(object_path: str) -> Any:
+    """
+    Import an object given the path to it, e.g. ``fica_demo.Config``.
+    """
+    mod, cls = object_path.rsplit(".", 1)
+    module = import_module(mod)
+    return getattr(module, cls)
+
+
 def import_and_get_config(object_path: str, exporter_type: str) -> str:
     """
     Import a :py:class:`Config<fica.Config>` subclass from a library and return its exported
@@ -29,43 +53,152 @@ def import_and_get_config(object_path: str, exporter_type: str) -> str:
     Returns:
         ``str``: the code block contents documenting the configurations in the imported object
     """
-    mod, cls = object_path.rsplit(".", 1)
-    module = import_module(mod)
-    config_object = getattr(module, cls)
+    config_object = _import_object(object_path)
     return create_exporter(exporter_type).export(config_object)
 
 
-class FicaDirective(CodeBlock):
+def get_source_files(config: Type[Config]) -> List[str]:
+    """
+    Get the paths to the source files that define a :py:class:`fica.Config` subclass, the configs it
+    inherits from, and its subkey containers, recursively.
+
+    Classes whose source files can't be determined (e.g. classes created dynamically) are skipped.
+
+    Args:
+        config (``type[fica.Config]``): the config class
+
+    Returns:
+        ``list[str]``: the sorted paths to the source files
+    """
+    files: Set[str] = set()
+    seen, stack = set(), [config]
+    while stack:
+        c = stack.pop()
+        if c in seen:
+            continue
+        seen.add(c)
+
+        for b in c.__mro__:
+            if b is Config or not issubclass(b, Config):
+                continue
+            try:
+                f = inspect.getsourcefile(b)
+            except TypeError:
+                f = None
+            if f is not None:
+                files.add(f)
+
+        stack.extend(c._get_schema().subkey_containers.values())
+
+    return sorted(files)
+
+
+def _get_env_data(env: "BuildEnvironment") -> \
+        Tuple[Dict[Tuple[str, str], ExportCacheEntry], Dict[str, Set[Tuple[str, str]]]]:
+    """
+    Get the cache of exports stored in the Sphinx environment and the dictionary mapping the name
+    of each document to the keys of the exports it uses, creating them if necessary.
     """
-    A Sphinx directive for documenting a :py:class:`fica.Config` object.
+    if not hasattr(env, "fica_exports"):
+        env.fica_exports = {}
+    if not hasattr(env, "fica_documented"):
+        env.fica_documented = {}
+    return env.fica_exports, env.fica_documented
 
-    This directive subclasses Sphinx's code block directive, and so the resulting documentation
-    string for the config object is displayed as a Sphinx code block with Pygments syntax
-    highlighting. The behavior of Sphinx's underlying code block arguments are unaffected.
+
+def get_export(env: "BuildEnvironment", object_path: str, exporter_type: str) -> str:
     """
+    Get the exported documentation string of a :py:class:`Config<fica.Config>` subclass for the
+    document currently being read, using the cache stored in the Sphinx environment.
 
-    option_spec: OptionSpec = {
-        **CodeBlock.option_spec,
-        "format": directives.unchanged,
-    }
+    Exports are cached by object path and format, so documenting the same config in the same
+    format more than once (e.g. on different pages) only imports and exports it once. The source
+    files that the config is defined in are recorded as dependencies of the current document with
+    ``env.note_dependency``, so that incremental builds skip documents whose configs haven't
+    changed and re-read those whose configs have. Exports are kept between builds only while they
+    are used by documents that aren't re-read.
+
+    Args:
+        env (``sphinx.environment.BuildEnvironment``): the Sphinx environment
+        object_path (``str``): a string containing the object to import and the library it is
+            imported from, e.g. ``fica_demo.Config``
+        exporter_type (``str``): the type of exporter to use; see
+            :py:func:`fica.exporter.create_exporter`
+
+    Returns:
+        ``str``: the code block contents documenting the configurations in the imported object
+    """
+    (cache, documented), key = _get_env_data(env), (object_path, exporter_type)
+    if key not in cache:
+        config_object = _import_object(object_path)
+        cache[key] = (
+            create_exporter(exporter_type).export(config_object),
+            get_source_files(config_object),
+        )
+
+    export, source_files = cache[key]
+    for f in source_files:
+        env.note_dependency(f)
+    documented.setdefault(env.docname, set()).add(key)
+
+    return export
+
+
+def _prune_env_cache(app, env: "BuildEnvironment", docnames: List[str]) -> None:
+    """
+    Before documents are read, discard the cached exports that aren't used by any document that
+    won't be re-read, since their configs may have changed.
+    """
+    cache, documented = _get_env_data(env)
+    for docname in docnames:
+        documented.pop(docname, None)
+
+    used = set().union(*documented.values())
+    for key in list(cache):
+        if key not in used:
+            del cache[key]
+
+
+def _purge_doc(app, env: "BuildEnvironment", docname: str) -> None:
+    """
+    Remove the record of the exports used by a document that is being removed or re-read.
+    """
+    _get_env_data(env)[1].pop(docname, None)
+
+
+def _merge_info(app, env: "BuildEnvironment", docnames: List[str], other: "BuildEnvironment") -> None:
+    """
+    Merge the exports cached and the records of the exports used by documents in the environment
+    of a parallel reading process into the main environment.
+    """
+    cache, documented = _get_env_data(env)
+    other_cache, other_documented = _get_env_data(other)
+    for docname in docnames:
+        if docname in other_documented:
+            documented[docname] = other_documented[docname]
+    for key, entry in other_cache.items():
+        cache.setdefault(key, entry)
 
-    def run(self):
-        """
-        Import the config object and update ``self.content`` to contain the code for the code block.
-        """
-        if "format" not in self.options:
-            self.options["format"] = "yaml"
 
-        self.content = import_and_get_config(self.arguments[0], self.options["format"]).split("\n")
-        self.arguments[0] = LEXER_OVERRIDES.get(self.options["format"], self.options["format"])
-        return super().run()
+def __getattr__(name: str) -> Any:
+    # FicaDirective and its base class are defined in a separate module that is only imported when
+    # they are first accessed
+    if name in ("CodeBlock", "FicaDirective"):
+        from . import _sphinx_directive
+        value = globals()[name] = getattr(_sphinx_directive, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def setup(app):
     """
     Add the ``fica`` directive to the Sphinx app.
     """
+    from ._sphinx_directive import FicaDirective
     app.add_directive("fica", FicaDirective)
+    app.connect("env-before-read-docs", _prune_env_cache)
+    app.connect("env-purge-doc", _purge_doc)
+    app.connect("env-merge-info", _merge_info)
     return {
         "version": __version__,
         "parallel_read_safe": True,
@@ -1,7 +1,14 @@
 """User-specified value validators"""
 
+import numbers
+import re
+import sys
+import threading
+
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, Optional
+from collections import OrderedDict
+from typing import (
+    Any, Callable, FrozenSet, List, NamedTuple, Optional, Pattern, Sequence, Tuple, Union)
 
 
 class _Validator(ABC):
@@ -25,33 +32,159 @@ class _Validator(ABC):
         """
         raise NotImplementedError
 
+    def _validate_each(self, values: Sequence[Any]) -> Optional[str]:
+        """
+        Validate each element of a sequence, returning the error for the first invalid element.
+
+        Subclasses can override this method to check all of the elements in a single batched pass.
+        """
+        for i, v in enumerate(values):
+            err = self.validate(v)
+            if err is not None:
+                return _format_element_error(i, err)
+
+    def _validate_array(self, array: Any) -> Optional[str]:
+        """
+        Validate each element of a NumPy array, returning the error for the first invalid element.
+
+        Subclasses can override this method to check the array with vectorized operations; by
+        default, the flattened array is converted to a list and checked with
+        :py:meth:`_validate_each`.
+        """
+        return self._validate_each(array.ravel().tolist())
+
+
+def _format_value(value: Any) -> str:
+    """
+    Format a value for display in a validation error message, quoting strings.
+    """
+    return "'" + value + "'" if isinstance(value, str) else str(value)
+
+
+def _format_element_error(index: Any, message: str) -> str:
+    """
+    Format a validation error message for an element of a list.
+    """
+    return f"invalid element at index {index}: {message}"
+
+
+def _in_range(choices: range, value: Any) -> bool:
+    """
+    Determine whether a value is equal to one of the integers in a range without iterating over it.
+    """
+    if isinstance(value, int):
+        return value in choices
+
+    if isinstance(value, numbers.Number):
+        try:
+            int_value = int(value)
+        except (TypeError, ValueError, OverflowError):
+            return False
+        return int_value == value and int_value in choices
+
+    return False
+
 
 class choice(_Validator):
     """
     A validator that asserts that a value is one of a pre-defined set of options.
 
+    Membership is checked with a hash-based index built when the validator is created, so checking a
+    value takes constant time regardless of the number of options. Unhashable options are kept in a
+    separate list that is scanned only for values not found in the index. Large domains can be
+    passed as a ``frozenset`` or, for integers, a ``range``, which are used directly without being
+    expanded into a list.
+
     Args:
-        choices (``list[object]``): the list of valid options
+        choices (``list[object] | frozenset[object] | range``): the valid options
 
     Raises:
-        ``TypeError``: if ``choices`` is not a ``list``
+        ``TypeError``: if ``choices`` is not a ``list``, ``frozenset``, or ``range``
     """
 
-    _choices: List[Any]
-    """the list of valid options"""
+    _choices: Union[List[Any], FrozenSet[Any], range]
+    """the valid options"""
+
+    _index: Union[FrozenSet[Any], range]
+    """the hashable valid options, or the range of valid options"""
 
-    def __init__(self, choices: List[Any]) -> None:
-        if not isinstance(choices, list):
-            raise TypeError("choices is not a list")
+    _unhashable_choices: List[Any]
+    """the valid options that are not hashable"""
+
+    _choices_str: Optional[str]
+    """the valid options formatted for error messages, once they have been formatted"""
+
+    def __init__(self, choices: Union[List[Any], FrozenSet[Any], range]) -> None:
+        if not isinstance(choices, (list, frozenset, range)):
+            raise TypeError("choices is not a list, frozenset, or range")
 
         self._choices = choices
+        self._choices_str = None
+        if isinstance(choices, list):
+            hashable, self._unhashable_choices = [], []
+            for c in choices:
+                try:
+                    hash(c)
+                except TypeError:
+                    self._unhashable_choices.append(c)
+                else:
+                    hashable.append(c)
+            self._index = frozenset(hashable)
+
+        else:
+            self._index, self._unhashable_choices = choices, []
+
+    def _contains(self, value: Any) -> bool:
+        """
+        Determine whether a value is one of the valid options.
+        """
+        if isinstance(self._index, range):
+            return _in_range(self._index, value)
+
+        try:
+            if value in self._index:
+                return True
+        except TypeError:
+            # unhashable values can only be found by comparing them to each option
+            return any(c is value or c == value for c in self._choices)
+
+        return bool(self._unhashable_choices) and value in self._unhashable_choices
+
+    def _format_choices(self) -> str:
+        """
+        Format the valid options for error messages, caching the result.
+        """
+        if self._choices_str is None:
+            if isinstance(self._choices, range):
+                self._choices_str = str(self._choices)
+            else:
+                choices = self._choices
+                if isinstance(choices, frozenset):
+                    try:
+                        choices = sorted(choices)
+                    except TypeError:
+                        pass
+                self._choices_str = "{" + ", ".join(_format_value(c) for c in choices) + "}"
+        return self._choices_str
 
     def validate(self, value: Any) -> Optional[str]:
-        if value not in self._choices:
-            as_str = lambda v: "'" + v + "'" if isinstance(v, str) else str(v)
-            choices = '{' + ', '.join(as_str(c) for c in self._choices) + '}'
-            value = as_str(value)
-            return f"{value} is not one of {choices}"
+        if not self._contains(value):
+            return f"{_format_value(value)} is not one of {self._format_choices()}"
+
+    def _validate_each(self, values: Sequence[Any]) -> Optional[str]:
+        try:
+            distinct = set(values)
+        except TypeError:
+            return super()._validate_each(values)
+
+        # each distinct value only needs to be checked once, and if the index is a frozenset, the
+        # values in it can be removed with a single set difference
+        if isinstance(self._index, frozenset):
+            distinct -= self._index
+        if all(self._contains(v) for v in distinct):
+            return None
+
+        return super()._validate_each(values)
 
 
 class validator(_Validator):
@@ -78,3 +211,369 @@ class validator(_Validator):
             raise TypeError("The validation function did not return a string or None")
 
         return ret
+
+
+class all_of(_Validator):
+    """
+    A validator that asserts that a value is valid according to each of a series of validators.
+
+    The validators are called in order, and the error message of the first validator that rejects
+    the value is returned without calling the rest.
+
+    Args:
+        *validators (``fica.validators._Validator``): the validators to apply
+    """
+
+    _validators: List[_Validator]
+    """the validators to apply"""
+
+    def __init__(self, *validators: _Validator) -> None:
+        self._validators = list(validators)
+
+    def validate(self, value: Any) -> Optional[str]:
+        for v in self._validators:
+            err = v.validate(value)
+            if err is not None:
+                return err
+
+    def _validate_each(self, values: Sequence[Any]) -> Optional[str]:
+        for v in self._validators:
+            err = v._validate_each(values)
+            if err is not None:
+                return err
+
+    def _validate_array(self, array: Any) -> Optional[str]:
+        for v in self._validators:
+            err = v._validate_array(array)
+            if err is not None:
+                return err
+
+
+class any_of(_Validator):
+    """
+    A validator that asserts that a value is valid according to at least one of a series of
+    validators.
+
+    The validators are called in order until one of them accepts the value. If none do, the error
+    messages of all of the validators are combined into a single error message.
+
+    Args:
+        *validators (``fica.validators._Validator``): the validators to apply
+    """
+
+    _validators: List[_Validator]
+    """the validators to apply"""
+
+    def __init__(self, *validators: _Validator) -> None:
+        self._validators = list(validators)
+
+    def validate(self, value: Any) -> Optional[str]:
+        errs = []
+        for v in self._validators:
+            err = v.validate(value)
+            if err is None:
+                return None
+            errs.append(err)
+
+        return f"{_format_value(value)} does not satisfy any of the following: {'; '.join(errs)}"
+
+
+class range_(_Validator):
+    """
+    A validator that asserts that a value is within an inclusive range.
+
+    Either bound can be omitted to leave that side of the range unbounded. Values that cannot be
+    compared to the bounds are invalid.
+
+    When used with :py:class:`each`, the bounds are checked against the smallest and largest
+    elements of a list, or with vectorized comparisons for NumPy arrays.
+
+    Args:
+        minimum (``object``): the smallest valid value
+        maximum (``object``): the largest valid value
+
+    Raises:
+        ``ValueError``: if neither ``minimum`` nor ``maximum`` is specified
+    """
+
+    _minimum: Any
+    """the smallest valid value"""
+
+    _maximum: Any
+    """the largest valid value"""
+
+    def __init__(self, minimum: Any = None, maximum: Any = None) -> None:
+        if minimum is None and maximum is None:
+            raise ValueError("At least one of minimum and maximum must be specified")
+
+        self._minimum = minimum
+        self._maximum = maximum
+
+    def validate(self, value: Any) -> Optional[str]:
+        try:
+            if self._minimum is not None and value < self._minimum:
+                return f"{_format_value(value)} is less than {_format_value(self._minimum)}"
+            if self._maximum is not None and value > self._maximum:
+                return f"{_format_value(value)} is greater than {_format_value(self._maximum)}"
+        except TypeError:
+            bounds = [b for b in (self._minimum, self._maximum) if b is not None]
+            return f"{_format_value(value)} cannot be compared to " + \
+                " and ".join(_format_value(b) for b in bounds)
+
+    def _validate_each(self, values: Sequence[Any]) -> Optional[str]:
+        if not values:
+            return None
+
+        try:
+            smallest, largest = min(values), max(values)
+        except TypeError:
+            return super()._validate_each(values)
+
+        # min and max can skip over elements when the first element is NaN, so only trust them when
+        # they return values that are equal to themselves
+        if smallest == smallest and largest == largest and \
+                self.validate(smallest) is None and self.validate(largest) is None:
+            return None
+
+        return super()._validate_each(values)
+
+    def _validate_array(self, array: Any) -> Optional[str]:
+        np = sys.modules["numpy"]
+        try:
+            invalid = np.zeros(array.shape, dtype=bool)
+            if self._minimum is not None:
+                invalid |= array < self._minimum
+            if self._maximum is not None:
+                invalid |= array > self._maximum
+        except TypeError:
+            return super()._validate_array(array)
+
+        indices = np.flatnonzero(invalid)
+        if indices.size == 0:
+            return None
+
+        i = int(indices[0])
+        index = np.unravel_index(i, array.shape)
+        index = int(index[0]) if len(index) == 1 else tuple(int(j) for j in index)
+        return _format_element_error(index, self.validate(array.ravel()[i:i + 1].tolist()[0]))
+
+
+class regex(_Validator):
+    """
+    A validator that asserts that a value is a string that matches a regular expression.
+
+    The pattern is compiled once when the validator is created and must match the entire string.
+
+    Args:
+        pattern (``str | re.Pattern``): the regular expression
+        flags (``int``): flags to compile the regular expression with
+
+    Raises:
+        ``re.error``: if the pattern is not a valid regular expression
+    """
+
+    _pattern: Pattern
+    """the compiled regular expression"""
+
+    def __init__(self, pattern: Union[str, Pattern], flags: int = 0) -> None:
+        self._pattern = re.compile(pattern, flags)
+
+    def validate(self, value: Any) -> Optional[str]:
+        if not isinstance(value, str):
+            return f"{_format_value(value)} is not a string"
+
+        if self._pattern.fullmatch(value) is None:
+            return f"{_format_value(value)} does not match the pattern " + \
+                _format_value(self._pattern.pattern)
+
+
+class length(_Validator):
+    """
+    A validator that asserts that the length of a value is within an inclusive range.
+
+    Either bound can be omitted to leave that side of the range unbounded.
+
+    Args:
+        minimum (``int | None``): the smallest valid length
+        maximum (``int | None``): the largest valid length
+
+    Raises:
+        ``ValueError``: if neither ``minimum`` nor ``maximum`` is specified
+    """
+
+    _minimum: Optional[int]
+    """the smallest valid length"""
+
+    _maximum: Optional[int]
+    """the largest valid length"""
+
+    def __init__(self, minimum: Optional[int] = None, maximum: Optional[int] = None) -> None:
+        if minimum is None and maximum is None:
+            raise ValueError("At least one of minimum and maximum must be specified")
+
+        self._minimum = minimum
+        self._maximum = maximum
+
+    def validate(self, value: Any) -> Optional[str]:
+        try:
+            n = len(value)
+        except TypeError:
+            return f"{_format_value(value)} does not have a length"
+
+        if self._minimum is not None and n < self._minimum:
+            return f"{_format_value(value)} has length {n}, which is less than {self._minimum}"
+        if self._maximum is not None and n > self._maximum:
+            return f"{_format_value(value)} has length {n}, which is greater than {self._maximum}"
+
+
+class each(_Validator):
+    """
+    A validator that asserts that a value is a list or tuple whose elements are each valid according
+    to another validator.
+
+    If NumPy has been imported, NumPy arrays are also accepted. Rather than calling the inner
+    validator once per element, the whole list is passed to it so that validators like
+    :py:class:`range_` and :py:class:`choice` can check every element in a single batched pass, and
+    NumPy arrays are checked with vectorized operations where the inner validator supports them.
+    The error message identifies the first invalid element found.
+
+    Args:
+        validator (``fica.validators._Validator``): the validator to apply to each element
+    """
+
+    _validator: _Validator
+    """the validator to apply to each element"""
+
+    def __init__(self, validator: _Validator) -> None:
+        self._validator = validator
+
+    def validate(self, value: Any) -> Optional[str]:
+        if isinstance(value, (list, tuple)):
+            return self._validator._validate_each(value)
+
+        # if NumPy hasn't been imported, the value can't be an array
+        np = sys.modules.get("numpy")
+        if np is not None and isinstance(value, np.ndarray):
+            return self._validator._validate_array(value)
+
+        return f"{_format_value(value)} is not a list"
+
+
+class CacheInfo(NamedTuple):
+    """
+    Statistics about the results cached by a :py:class:`cached` validator.
+    """
+
+    hits: int
+    """the number of validations answered from the cache"""
+
+    misses: int
+    """the number of validations of hashable values that were not in the cache"""
+
+    maxsize: Optional[int]
+    """the maximum number of results cached"""
+
+    currsize: int
+    """the number of results currently cached"""
+
+
+def _cache_key(value: Any) -> Tuple[type, Any]:
+    """
+    Get the key that the result of validating a value is cached under in a :py:class:`cached`
+    validator, which includes the types of the elements of tuples and frozensets, recursively.
+    """
+    if isinstance(value, tuple):
+        return (type(value), tuple(map(_cache_key, value)))
+    if isinstance(value, frozenset):
+        return (type(value), frozenset(map(_cache_key, value)))
+    return (type(value), value)
+
+
+class cached(_Validator):
+    """
+    A validator that memoizes the results of another validator.
+
+    Results are kept in a least-recently-used cache keyed on the type and value of the values
+    validated (so that, e.g., ``1`` and ``True`` are cached separately), including the types of the
+    elements of tuples and frozensets (so that ``(1,)`` and ``(True,)`` are too). Values that are not
+    hashable bypass the cache and are always passed to the wrapped validator. The cache is guarded by a lock,
+    so a single instance can be shared between threads.
+
+    This is useful for validators that are expensive to run, like custom validation functions, when
+    the same values are validated repeatedly. The wrapped validator must return the same result
+    each time it is called with the same value.
+
+    Args:
+        validator (``fica.validators._Validator``): the validator to cache the results of
+        maxsize (``int | None``): the maximum number of results to cache; if ``None``, the cache is
+            unbounded
+    """
+
+    _validator: _Validator
+    """the validator whose results are cached"""
+
+    _maxsize: Optional[int]
+    """the maximum number of results to cache"""
+
+    _cache: "OrderedDict[Tuple[type, Any], Optional[str]]"
+    """the cached results, ordered from least to most recently used"""
+
+    _hits: int
+    """the number of validations answered from the cache"""
+
+    _misses: int
+    """the number of validations of hashable values that were not in the cache"""
+
+    def __init__(self, validator: _Validator, maxsize: Optional[int] = 128) -> None:
+        self._validator = validator
+        self._maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def validate(self, value: Any) -> Optional[str]:
+        key = _cache_key(value)
+        try:
+            with self._lock:
+                ret = self._cache[key]
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return ret
+        except KeyError:
+            pass
+        except TypeError:
+            return self._validator.validate(value)
+
+        # the wrapped validator is called without holding the lock so that slow validations don't
+        # block other threads
+        ret = self._validator.validate(value)
+        with self._lock:
+            self._misses += 1
+            if self._maxsize is None or self._maxsize > 0:
+                self._cache[key] = ret
+                self._cache.move_to_end(key)
+                if self._maxsize is not None and len(self._cache) > self._maxsize:
+                    self._cache.popitem(last=False)
+
+        return ret
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Get statistics about the cache.
+
+        Returns:
+            ``fica.validators.CacheInfo``: the number of cache hits and misses and the maximum and
+            current sizes of the cache
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._cache))
+
+    def cache_clear(self) -> None:
+        """
+        Remove all results from the cache and reset its statistics.
+        """
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
@@ -5,6 +5,29 @@ import pytest
 from fica import Config, Key
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-benchmarks", action="store_true", default=False,
+        help="run the timing benchmarks, which are skipped by default")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: a benchmark that compares timings and is only run with "
+        "--run-benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+
+    # timing ratios depend on the machine and its load, so they aren't checked by default
+    skip = pytest.mark.skip(reason="timing benchmarks are only run with --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture
 def sample_config() -> Config:
     """
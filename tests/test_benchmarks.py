@@ -0,0 +1,316 @@
+"""Benchmarks for the performance characteristics of fica"""
+
+import contextlib
+import io
+import json
+import os
+import pytest
+import subprocess
+import sys
+import tracemalloc
+
+from unittest import mock
+
+from fica import _yaml, CompactConfig, Config, Key, validators
+from fica._codegen import GENERATE_AFTER
+from fica.exporter import YamlExporter
+
+from .utils import (
+    best_time, generic_routines, make_documented_config, make_flat_config, make_half_user_config)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("generated", [False, True], ids=["generic", "generated"])
+def test_population_scales_linearly(generated):
+    """
+    Tests that the time it takes to populate a config grows linearly with its number of keys, with
+    both the generic population routine and the generated ones.
+    """
+    per_key = {}
+    for n in (10, 100, 1000):
+        config_cls = make_flat_config(n)
+        user_config = {f"k{i}": i + 1 for i in range(0, n, 2)}
+        with contextlib.nullcontext() if generated else generic_routines():
+            # warm up the schema cache and generate the population routine if it's being timed
+            for _ in range(GENERATE_AFTER):
+                config_cls(user_config)
+            assert (config_cls._get_schema().populate is not None) is generated
+            per_key[n] = best_time(lambda: config_cls(user_config), number=max(1, 1000 // n)) / n
+
+    # a quadratic population routine would make the per-key time grow 10x between 100 and 1,000
+    # keys
+    assert per_key[1000] < 4 * per_key[100]
+    assert per_key[1000] < 4 * per_key[10]
+
+
+@pytest.mark.benchmark
+def test_setattr_is_constant_time():
+    """
+    Tests that the time it takes to set the value of a key on a config doesn't grow with its number
+    of keys.
+    """
+    per_key = {}
+    for n in (10, 100, 1000):
+        config = make_flat_config(n)()
+        attrs = [f"k{i}" for i in range(n)]
+
+        def set_all():
+            for i, a in enumerate(attrs):
+                setattr(config, a, i)
+
+        per_key[n] = best_time(set_all, number=max(1, 1000 // n)) / n
+
+    # looking up each key by scanning the config's keys would make the per-key time grow 100x
+    # between 10 and 1,000 keys
+    assert per_key[1000] < 4 * per_key[10]
+
+
+@pytest.mark.benchmark
+def test_from_many():
+    """
+    Benchmarks ``Config.from_many`` against a loop that creates each config individually.
+    """
+    config_cls = make_flat_config(50)
+    user_configs = [{f"k{j}": i for j in range(i % 50)} for i in range(500)]
+
+    loop_time = best_time(lambda: [config_cls(uc) for uc in user_configs], number=5)
+    batch_time = best_time(lambda: config_cls.from_many(user_configs), number=5)
+
+    # the schema and the generated population routine are looked up once for the whole batch
+    # instead of once per config
+    assert batch_time < loop_time
+
+
+@pytest.mark.benchmark
+def test_is_valid():
+    """
+    Benchmarks ``Config.is_valid`` against creating configs.
+    """
+    class InnerConfig(Config):
+        a = Key(default=1, type_=int, validator=validators.range_(0, 100))
+        b = Key(factory=list)
+        c = Key(default="c", type_=str)
+
+    class OuterConfig(Config):
+        x = Key(subkey_container=InnerConfig)
+        y = Key(subkey_container=InnerConfig)
+        z = Key(subkey_container=InnerConfig)
+        w = Key(factory=dict)
+        v = Key(default=0, type_=int)
+
+    flat_config_cls = make_flat_config(50)
+    for config_cls, user_config in [
+        (OuterConfig, {"x": {"a": 5, "c": "d"}, "v": 3}),
+        (flat_config_cls, {f"k{i}": i for i in range(0, 50, 2)}),
+    ]:
+        assert config_cls.is_valid(user_config)
+        create_time = best_time(lambda: config_cls(user_config), number=200)
+        check_time = best_time(lambda: config_cls.is_valid(user_config), number=200)
+
+        # checking a user config doesn't compute defaults or create subkey containers, so it should
+        # be substantially faster than creating a config
+        assert check_time < 0.75 * create_time
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("config_cls, min_speedup", [
+    (make_flat_config(10), 1.5),
+    (make_flat_config(100), 2),
+    (make_flat_config(1000), 2.5),
+    (make_documented_config(10, 2), 1.5),
+    (make_documented_config(100, 1), 2),
+], ids=["flat-10", "flat-100", "flat-1000", "nested-10x2", "nested-100x1"])
+def test_generated_population(config_cls, min_speedup):
+    """
+    Benchmarks creating configs with the population routines generated for their classes against
+    the generic routine.
+    """
+    user_config = make_half_user_config(config_cls)
+    number = max(5, 2000 // len(config_cls._get_schema().keys))
+    with generic_routines():
+        expected = config_cls(user_config)
+        generic_time = best_time(lambda: config_cls(user_config), number=number)
+
+    # create enough configs for the routines to be generated before timing them
+    for _ in range(GENERATE_AFTER):
+        config_cls(user_config)
+    assert config_cls._get_schema().populate is not None
+    assert config_cls(user_config) == expected
+    generated_time = best_time(lambda: config_cls(user_config), number=number)
+
+    assert generated_time * min_speedup < generic_time
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("config_cls", [
+    make_flat_config(1000),
+    make_documented_config(20, 3),
+], ids=["flat-1000", "nested-20x3"])
+def test_view(config_cls):
+    """
+    Benchmarks reading a few keys from views of large user configs against creating configs.
+    """
+    user_config = make_half_user_config(config_cls)
+    attrs = list(config_cls._get_schema().keys)[:3]
+
+    def read_view():
+        view = config_cls.view(user_config)
+        for a in attrs:
+            getattr(view, a)
+
+    for _ in range(GENERATE_AFTER):
+        config_cls(user_config)
+    create_time = best_time(lambda: config_cls(user_config), number=20)
+    view_time = best_time(read_view, number=20)
+
+    # views only compute the values of the keys that are accessed
+    assert view_time < 0.25 * create_time
+
+
+def test_from_stream_memory():
+    """
+    Benchmarks the peak memory used by ``Config.from_stream`` against loading the whole document
+    before creating the config.
+    """
+    config_cls = make_flat_config(10)
+    document = {f"k{i}": i + 1 for i in range(10)}
+    for i in range(20):
+        document[f"ignored{i}"] = list(range(i * 10000, (i + 1) * 10000))
+    contents = json.dumps(document).encode("utf-8")
+
+    def measure(load):
+        stream = io.BytesIO(contents)
+        tracemalloc.start()
+        try:
+            config = load(stream)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        assert config == config_cls({f"k{i}": i + 1 for i in range(10)})
+        return peak
+
+    full_peak = measure(lambda stream: config_cls(json.load(stream)))
+    stream_peak = measure(config_cls.from_stream)
+
+    # only one value is held in memory at a time when streaming, so the peak should be bounded by
+    # the size of the largest value instead of the size of the document
+    assert stream_peak < 0.25 * full_peak
+
+
+def test_from_stream_memory_with_large_values():
+    """
+    Benchmarks the memory used by ``Config.from_stream`` when the document's large values are kept
+    in the config.
+    """
+    config_cls = type("LargeValuesConfig", (Config, ), {
+        f"k{i}": Key(type_=list, allow_none=True) for i in range(10)
+    })
+    document = {f"k{i}": list(range(i * 10000, (i + 1) * 10000)) for i in range(10)}
+    contents = json.dumps(document).encode("utf-8")
+
+    def measure(load):
+        stream = io.BytesIO(contents)
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            config = load(stream)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert config == config_cls(document)
+        return current - start, peak - start
+
+    full_retained, full_peak = measure(lambda stream: config_cls(json.load(stream)))
+    stream_retained, stream_peak = measure(config_cls.from_stream)
+
+    # the config holds the parsed values themselves, so streaming shouldn't retain any copies of
+    # them...
+    assert stream_retained < 1.1 * full_retained
+
+    # ...and beyond the values it keeps, it should only need memory for the value being parsed
+    # instead of for the whole document
+    assert stream_peak - stream_retained < 0.25 * (full_peak - full_retained)
+
+
+def test_compact_config_memory():
+    """
+    Benchmarks the memory used by instances of ``CompactConfig`` subclasses against regular configs.
+    """
+    def measure(base):
+        config_cls = type("MemoryConfig", (base, ), {
+            f"k{i}": Key(default=i, type_=int) for i in range(20)
+        })
+        user_config = {f"k{i}": 100 + i for i in range(0, 20, 2)}
+        config_cls(user_config)
+
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            configs = [config_cls(user_config) for _ in range(2000)]
+            used = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+
+        assert len(configs) == 2000
+        return used
+
+    assert measure(CompactConfig) < 0.75 * measure(Config)
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not _yaml.LIBYAML_AVAILABLE, reason="libyaml is not available")
+def test_yaml_export_with_libyaml():
+    """
+    Benchmarks exporting a large documented config to YAML with and without libyaml.
+    """
+    config_cls = make_documented_config(40, 2)
+    exporter = YamlExporter()
+
+    libyaml_time = best_time(lambda: exporter.export(config_cls), number=3)
+    with mock.patch("fica._yaml.LIBYAML_AVAILABLE", False):
+        python_time = best_time(lambda: exporter.export(config_cls), number=3)
+
+    assert libyaml_time < 0.8 * python_time
+
+
+def import_times(module):
+    """
+    Import a module in a new interpreter with ``python -X importtime`` and return a dictionary
+    mapping the name of each module imported to its cumulative import time in microseconds.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=root,
+        env={**os.environ, "PYTHONPATH": root})
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["fica", "fica.exporter", "fica.sphinx"])
+def test_import_dependencies(module):
+    """
+    Tests that importing ``fica`` and its exporter and Sphinx extension modules doesn't import
+    heavy optional dependencies.
+    """
+    times = import_times(module)
+    assert module in times
+    for name in times:
+        assert name.split(".")[0] not in {"docutils", "numpy", "sphinx", "yaml"}, name
+
+
+def test_import_time_of_fica():
+    """
+    Tests that importing ``fica`` is fast.
+    """
+    # importing fica takes ~5ms; the cap is generous so that this can run in the default test suite
+    # on slow machines
+    assert import_times("fica")["fica"] < 100000
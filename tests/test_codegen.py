@@ -0,0 +1,201 @@
+"""Tests for ``fica._codegen``"""
+
+import pytest
+
+from unittest import mock
+
+from fica import CompactConfig, Config, EMPTY, Key, validators
+from fica.utils import ConfigProcessingException
+
+from .utils import (
+    generic_routines, make_documented_config, make_flat_config, make_half_user_config)
+
+
+@pytest.fixture(autouse=True)
+def generate_immediately():
+    """
+    A pytest fixture that makes config classes generate their routines the first time they are
+    used.
+    """
+    with mock.patch("fica.config.GENERATE_AFTER", 1):
+        yield
+
+
+def make_nested_config(base: type) -> type:
+    """
+    Create a config class that uses every kind of key that the generated routines inline.
+    """
+    class InnerConfig(base):
+        a = Key(default=1, type_=int, validator=validators.range_(0, 10))
+        b = Key(default=None, type_=str, allow_none=True)
+
+    class RequiredConfig(base):
+        r = Key(required=True)
+
+    class OuterConfig(base):
+        x = Key(subkey_container=InnerConfig)
+        y = Key(subkey_container=InnerConfig, enforce_subkeys=True)
+        z = Key(subkey_container=InnerConfig, share_default=True)
+        f = Key(factory=list)
+        n = Key(default=2, name="en")
+        opt = Key(default=1, subkey_container=RequiredConfig)
+
+    return OuterConfig
+
+
+def create_generic(config_cls: type, *args, **kwargs) -> Config:
+    """
+    Create a config with the generic population routine.
+    """
+    with generic_routines():
+        return config_cls(*args, **kwargs)
+
+
+USER_CONFIGS = [
+    {},
+    {"x": {"a": 5}, "en": 3},
+    {"x": {"a": 5, "b": "s"}, "y": {}, "z": {"b": None}, "f": [1], "en": None, "opt": 4},
+    {"opt": {"r": 0}, "x": EMPTY, "unexpected": 1},
+    {"x": {"a": 11}},
+    {"x": {"a": "a"}},
+    {"x": {"b": 1}, "y": 1},
+    {"y": 1},
+    {"opt": {}},
+    {"x": {"c": 1}},
+    {"en": 1, "unexpected": 1},
+]
+
+
+@pytest.mark.parametrize("base", [Config, CompactConfig])
+def test_compile_populate(base):
+    """
+    Tests that configs populated by the generated routines are the same as those populated by the
+    generic routine, and that the generic routine is used to raise errors.
+    """
+    config_cls = make_nested_config(base)
+    for user_config in USER_CONFIGS:
+        for require_valid_keys in (False, True):
+            try:
+                expected = create_generic(
+                    config_cls, user_config, require_valid_keys=require_valid_keys)
+            except (ConfigProcessingException, ValueError) as e:
+                with pytest.raises(type(e)) as excinfo:
+                    config_cls(user_config, require_valid_keys=require_valid_keys)
+                assert str(excinfo.value) == str(e)
+                continue
+
+            config = config_cls(user_config, require_valid_keys=require_valid_keys)
+            assert config == expected
+            assert config._defaulted == expected._defaulted
+            assert config.get_user_config() == expected.get_user_config()
+
+    assert config_cls._get_schema().populate is not None
+    assert config_cls().z is config_cls().z
+
+
+def test_compile_populate_sparse():
+    """
+    Tests that the generated routines handle user configs with few keys in the same way as those
+    with many keys.
+    """
+    config_cls = make_flat_config(40)
+    for user_config in [{}, {"k3": 1}, {"k3": EMPTY}, {f"k{i}": 0 for i in range(20)}]:
+        config, expected = config_cls(user_config), create_generic(config_cls, user_config)
+        assert config == expected
+        assert config._defaulted == expected._defaulted
+
+    with pytest.raises(ConfigProcessingException, match="k3"):
+        config_cls({"k3": "a"})
+
+    schema = config_cls._get_schema()
+    assert schema.populate(object.__new__(config_cls), {"k3": "a"}, False) is False
+
+
+@pytest.mark.parametrize("config_cls", [
+    make_flat_config(1000),
+    make_documented_config(10, 2),
+], ids=["flat-1000", "nested-10x2"])
+def test_compile_populate_large(config_cls):
+    """
+    Tests that the generated routines populate large and nested configs in the same way as the
+    generic routine.
+    """
+    user_config = make_half_user_config(config_cls)
+    expected = create_generic(config_cls, user_config)
+    config = config_cls(user_config)
+    assert config == expected
+    assert config._defaulted == expected._defaulted
+    assert config_cls._get_schema().populate is not None
+    assert config_cls.from_many([user_config, {}]) == [config, config_cls()]
+    assert config_cls.view(user_config) == config
+
+
+def test_compile_check():
+    """
+    Tests that the generated validation routines agree with ``Config._iter_errors``.
+    """
+    config_cls = make_nested_config(Config)
+    for user_config in USER_CONFIGS:
+        for require_valid_keys in (False, True):
+            with generic_routines():
+                expected = config_cls.is_valid(user_config, require_valid_keys)
+            assert config_cls.is_valid(user_config, require_valid_keys) is expected
+
+    assert config_cls._get_schema().check is not None
+
+
+def test_fallback():
+    """
+    Tests that routines aren't generated for classes that the generated code can't handle.
+    """
+    class CustomKey(Key):
+        def get_value(self, user_value=EMPTY, require_valid_keys=False):
+            return 0
+
+    class CustomKeyConfig(Config):
+        a = CustomKey(default=1)
+
+    class CustomStorageConfig(Config):
+        a = Key(default=1)
+
+        def _store_value(self, attr, pos, value):
+            super()._store_value(attr, pos, value + 1)
+
+    class PresetConfig(Config):
+        a = Key(default=1)
+
+        def __init__(self, *args, **kwargs):
+            self.__dict__["a"] = 3
+            super().__init__(*args, **kwargs)
+
+    assert CustomKeyConfig({"a": 2}).a == 0
+    assert CustomKeyConfig._get_schema().populate is None
+    assert CustomStorageConfig({"a": 2}).a == 3
+    assert CustomStorageConfig._get_schema().populate is None
+    assert PresetConfig().a == 1
+    assert PresetConfig._get_schema().populate is not None
+
+
+def test_regeneration():
+    """
+    Tests that routines are generated once classes have been used enough times and are regenerated
+    when the configuration of a key changes.
+    """
+    class A(Config):
+        a = Key(default=1, type_=int)
+
+    with mock.patch("fica.config.GENERATE_AFTER", 3):
+        A(), A()
+        assert A._get_schema().populate is None
+        A()
+        populate = A._get_schema().populate
+        assert populate is not None
+        A()
+        assert A._get_schema().populate is populate
+
+    A.a.type_ = str
+    assert A({"a": "s"}).a == "s"
+    assert A._get_schema().populate is not populate
+    with pytest.raises(ConfigProcessingException):
+        A({"a": 1})
+    assert not A.is_valid({"a": 1})
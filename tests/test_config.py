@@ -1,12 +1,17 @@
 """Tests for ``fica.key``"""
 
+import abc
+import copy
 import pytest
 
 from unittest import mock
 
-from fica import Config, Key, validators
+from fica import CompactConfig, Config, Key, validators
+from fica._codegen import GENERATE_AFTER
 from fica.utils import ConfigProcessingException
 
+from .utils import generic_routines
+
 
 class TestConfig:
     """
@@ -120,6 +125,332 @@ class TestConfig:
         ):
             c.update({"a": {"b": {"c": 3}}})
 
+    def test_update_changes(self, sample_config):
+        """
+        Tests for the changes returned by ``update`` and the tracking of dirty keys.
+        """
+        config = sample_config({"foo": 1})
+        assert config.get_generation() == 0
+        assert config.get_dirty_keys() == []
+
+        changes = config.update({"foo": 1, "bar": {"baz": 1}, "garplish": 3})
+        assert changes == {}
+        assert config.get_generation() == 0
+        assert config.get_dirty_keys() == []
+
+        changes = config.update({"foo": 2, "bar": {"baz": 2, "quux": None}, "grault": None})
+        assert changes == {"foo": (1, 2), "bar.baz": (1, 2), "grault": (2, None)}
+        assert config.get_generation() == 1
+        assert config.get_dirty_keys() == ["foo", "bar", "grault"]
+        assert config.bar.get_generation() == 1
+        assert config.bar.get_dirty_keys() == ["baz"]
+
+        # replacing a nested config with a value or vice versa is a change to the key itself
+        old_bar = config.bar
+        changes = config.update({"bar": 1, "quuz": {"corge": False}})
+        assert changes == {
+            "bar": (old_bar, 1),
+            "quuz": (1, sample_config.QuuzValue({"corge": False})),
+        }
+        assert config.get_generation() == 2
+
+        config.clear_dirty()
+        assert config.get_dirty_keys() == []
+        assert config.quuz.get_dirty_keys() == []
+
+        # setting keys directly marks them as dirty
+        config.garply = 4
+        assert config.get_dirty_keys() == ["garplish"]
+        assert config.get_generation() == 3
+
+        # changes made before an error are still recorded
+        config.clear_dirty()
+        with pytest.raises(ConfigProcessingException):
+            config.update({"foo": 3, "grault": "a"})
+        assert config.foo == 3
+        assert config.get_dirty_keys() == ["foo"]
+
+    def test_from_many(self, sample_config):
+        """
+        Tests for the ``from_many`` method.
+        """
+        user_configs = [{}, {"foo": 1, "bar": {"baz": 2}}, {"garplish": 4}]
+        configs = sample_config.from_many(user_configs)
+        assert configs == [sample_config(uc) for uc in user_configs]
+
+        configs = sample_config.from_many(iter(user_configs), lazy=True)
+        assert not isinstance(configs, list)
+        assert list(configs) == [sample_config(uc) for uc in user_configs]
+
+        # configs of classes that don't customize their constructors are initialized by from_many
+        # itself, before and after the population routines are generated
+        for base in (Config, CompactConfig):
+            class BatchConfig(base):
+                a = Key(default=1, type_=int)
+                b = Key(factory=list)
+
+            user_configs = [{"a": i} if i % 2 else {"b": [i]} for i in range(2 * GENERATE_AFTER)]
+            configs = BatchConfig.from_many(user_configs, require_valid_keys=True)
+            assert BatchConfig._get_schema().populate is not None
+            assert configs == [BatchConfig(uc) for uc in user_configs]
+            assert configs[0].b is not configs[2].b
+            assert configs[0]._require_valid_keys
+            configs[0].a = 2
+            assert configs[1].a == 1 and configs[2].a == 1
+
+            configs = BatchConfig.from_many([{"a": "x"}, {"c": 1}], require_valid_keys=True)
+            assert [c.key for c in configs] == ["[0].a", "[1]"]
+
+        # errors are returned in place of configs without aborting the batch
+        configs = sample_config.from_many([
+            {"foo": 1},
+            {"grault": "a"},
+            1,
+            {"quuz": {"doesnotexist": True}},
+            {"doesnotexist": True},
+        ], require_valid_keys=True)
+        assert configs[0] == sample_config({"foo": 1})
+        assert isinstance(configs[1], ConfigProcessingException)
+        assert configs[1].key == "[1].grault"
+        assert isinstance(configs[2], ConfigProcessingException)
+        assert configs[2].key == "[2]"
+        assert isinstance(configs[2].message, TypeError)
+        assert isinstance(configs[3], ConfigProcessingException)
+        assert configs[3].key == "[3].quuz"
+        assert isinstance(configs[4], ConfigProcessingException)
+        assert str(configs[4]) == \
+            "An error occured while processing [4]: Unexpected key found in config: 'doesnotexist'"
+
+    def test_validate(self, sample_config):
+        """
+        Tests for the ``validate`` method.
+        """
+        # configs are not created when validating
+        sample_config.raise_if_not_in_doc_mode = True
+        with mock.patch.object(
+                sample_config.BarValue, "__init__", side_effect=RuntimeError()):
+            assert sample_config.validate({}) == []
+            assert sample_config.validate({"foo": 1, "bar": {"baz": 2}, "garplish": 4}) == []
+
+            errors = sample_config.validate({
+                "bar": {"doesnotexist": 1},
+                "grault": "a",
+                "garplish": None,
+                "quuz": {"corge": False, "other": 1},
+                "doesnotexist": True,
+            }, require_valid_keys=True)
+
+        assert [e.key for e in errors] == \
+            ["bar.doesnotexist", "grault", "garplish", "quuz.other", "doesnotexist"]
+        assert all(isinstance(e, ConfigProcessingException) for e in errors)
+        assert str(errors[1]) == "An error occured while processing grault: User-specified " \
+            "value is not of the correct type"
+        assert str(errors[4]) == "An error occured while processing doesnotexist: Unexpected " \
+            "key found in config: 'doesnotexist'"
+
+        sample_config.raise_if_not_in_doc_mode = False
+        assert sample_config.validate({"doesnotexist": True, "bar": {"doesnotexist": 1}}) == []
+
+        # errors match those raised when creating the config (except that unexpected keys are
+        # reported at their own paths)
+        for user_config in [{"grault": "a"}, {"quuz": {"corge": 1, "other": 1}}, {"bar": {1: 2}}]:
+            errors = sample_config.validate(user_config, require_valid_keys=True)
+            assert len(errors) == 1
+            with pytest.raises(ConfigProcessingException) as exc_info:
+                sample_config(user_config, require_valid_keys=True)
+            assert errors[0].key.startswith(exc_info.value.key)
+            assert str(errors[0].message) == str(exc_info.value.message)
+
+        # test required keys, validators, enforced subkeys, and custom keys
+        class CustomKey(Key):
+
+            def get_value(self, user_value, require_valid_keys=False):
+                if user_value == "bad":
+                    raise ValueError("bad value")
+                return super().get_value(user_value, require_valid_keys=require_valid_keys)
+
+        class A(Config):
+
+            class BValue(Config):
+                c = Key(required=True)
+                d = Key(validator=validators.choice([1, 2]))
+
+            b = Key(subkey_container=BValue, enforce_subkeys=True)
+            e = Key(required=True, type_=int, allow_none=True)
+            f = CustomKey()
+
+        errors = A.validate({})
+        assert [(e.key, str(e.message)) for e in errors] == [
+            ("b.c", "Key is required but there is no user-specified value"),
+            ("e", "Key is required but there is no user-specified value"),
+        ]
+
+        errors = A.validate({"b": {"c": 1, "d": 3}, "e": 1, "f": "bad"})
+        assert [(e.key, str(e.message)) for e in errors] == [
+            ("b.d", "User-specified value failed validation: 3 is not one of {1, 2}"),
+            ("f", "bad value"),
+        ]
+
+        errors = A.validate({"b": 1, "e": 1})
+        assert [(e.key, str(e.message)) for e in errors] == \
+            [("b", "Cannot override subkeys for a key with enforced subkeys")]
+
+        # errors raised by validators are reported as they are when creating the config
+        class PositiveConfig(Config):
+            n = Key(validator=validators.validator(lambda v: None if v > 0 else "not positive"))
+
+        errors = PositiveConfig.validate({"n": "x"})
+        assert len(errors) == 1
+        with pytest.raises(ConfigProcessingException) as exc_info:
+            PositiveConfig({"n": "x"})
+        assert errors[0].key == exc_info.value.key == "n"
+        assert isinstance(errors[0].message, TypeError)
+        assert str(errors[0].message) == str(exc_info.value.message)
+        assert PositiveConfig.validate({"n": 1}) == []
+
+        # test errors
+        with pytest.raises(TypeError):
+            A.validate(1)
+
+        with pytest.raises(TypeError):
+            A.validate({1: 2})
+
+    def test_is_valid(self, sample_config):
+        """
+        Tests for the ``is_valid`` method.
+        """
+        factory = mock.Mock(return_value=[])
+
+        class A(Config):
+
+            class BValue(Config):
+                c = Key(required=True)
+
+            b = Key(subkey_container=BValue)
+            d = Key(factory=factory)
+            e = Key(type_=int, default=1)
+
+        assert A.is_valid({"b": {"c": 1}})
+        assert A.is_valid({"b": {"c": 1}, "e": 2, "f": 3})
+        assert not A.is_valid({"b": {"c": 1}, "e": "a"})
+        assert not A.is_valid({"b": {"c": 1}, "f": 3}, require_valid_keys=True)
+        assert not A.is_valid({})
+        assert not A.is_valid({"b": {}})
+        assert not A.is_valid({"b": {1: 2}})
+        assert not A.is_valid(1)
+        factory.assert_not_called()
+
+        # checking stops at the first error
+        vdtr = validators.validator(mock.Mock(return_value="invalid"))
+
+        class C(Config):
+            f = Key(validator=vdtr)
+            g = Key(validator=vdtr)
+
+        assert not C.is_valid({"f": 1, "g": 2})
+        vdtr._func.assert_called_once_with(1)
+
+        # errors raised by validators make user configs invalid with both the generic routine and
+        # the generated one
+        class PositiveConfig(Config):
+            n = Key(validator=validators.validator(lambda v: None if v > 0 else "not positive"))
+            m = Key(default=1, type_=int)
+
+        with generic_routines():
+            assert not PositiveConfig.is_valid({"n": "x"})
+            assert PositiveConfig.is_valid({"n": 1})
+        for _ in range(GENERATE_AFTER):
+            assert not PositiveConfig.is_valid({"n": "x"})
+            assert PositiveConfig.is_valid({"n": 1})
+        assert PositiveConfig._get_schema().check is not None
+        assert not PositiveConfig.is_valid({"n": "x"})
+        assert not PositiveConfig.is_valid({"n": "x", "m": 2})
+
+        # test with the sample config
+        sample_config.raise_if_not_in_doc_mode = True
+        assert sample_config.is_valid({"foo": 1, "bar": {"baz": 2}, "garplish": 4})
+        assert not sample_config.is_valid({"garplish": None})
+
+    def test_view(self, sample_config):
+        """
+        Tests for the ``view`` method.
+        """
+        factory = mock.Mock(return_value=[])
+
+        class A(Config):
+
+            class BValue(Config):
+                c = Key(required=True)
+                d = Key(default=1, type_=int)
+
+            class GValue(Config):
+                h = Key(default=1)
+
+            b = Key(subkey_container=BValue)
+            e = Key(factory=factory)
+            f = Key(type_=int, default=1)
+            g = Key(subkey_container=GValue, share_default=True)
+
+        # values are only computed when they are first accessed
+        user_config = {"b": {"c": 1}, "f": "a"}
+        view = A.view(user_config)
+        assert isinstance(view, A)
+        assert view.__dict__ == {}
+        assert view.b.c == 1
+        assert view.b.d == 1
+        assert isinstance(view.b, A.BValue)
+        assert view.__dict__.keys() == {"b"}
+        assert view.b is view.b
+        factory.assert_not_called()
+        assert view.e == []
+        assert view.e is view.e
+        factory.assert_called_once_with()
+
+        # errors are raised when invalid keys are accessed
+        with pytest.raises(ConfigProcessingException, match="processing f: User-specified value"):
+            view.f
+        view = A.view({"b": {"c": 1, "d": "a"}})
+        assert view.b.c == 1
+        with pytest.raises(ConfigProcessingException, match="processing b.d: User-specified value"):
+            view.b.d
+        with pytest.raises(ConfigProcessingException, match="processing b: Key is required"):
+            A.view({"b": {}}).b.c
+        with pytest.raises(ValueError, match="Key is required"):
+            A.view({}).b.c
+
+        # the structure and key names of the user config are checked up front
+        with pytest.raises(TypeError):
+            A.view(1)
+        with pytest.raises(TypeError):
+            A.view({1: 2})
+        with pytest.raises(ValueError, match="Unexpected key found in config: 'h'"):
+            A.view({"f": 2, "h": 3}, require_valid_keys=True)
+        A.view({"b": {"h": 3}}, require_valid_keys=True)
+        with pytest.raises(ConfigProcessingException, match="processing b: Unexpected key"):
+            A.view({"b": {"h": 3}}, require_valid_keys=True).b
+
+        # views are read-only
+        with pytest.raises(AttributeError):
+            view.f = 2
+        with pytest.raises(AttributeError):
+            view.b.c = 2
+
+        # views are equal to configs created from the same user config
+        user_config = {"b": {"c": 1}, "f": 2, "g": {"h": 2}}
+        view, config = A.view(user_config), A(user_config)
+        assert view == config
+        assert config == view
+        assert view.get_user_config() == config.get_user_config() == user_config
+        assert A.view({"b": {"c": 1}}).g is A({"b": {"c": 1}}).g
+
+        # test with the sample config, whose constructor isn't called
+        sample_config.raise_if_not_in_doc_mode = True
+        user_config = {"foo": 1, "bar": {"baz": 2}, "garplish": 4}
+        view = sample_config.view(user_config)
+        assert view.get_user_config() == user_config
+        assert repr(view) == \
+            "SampleConfig(foo=1, bar=BarValue(baz=2, quux=None), quuz=1, grault=2, garply=4)"
+
     def test___eq__(self, sample_config):
         """
         Tests for the ``__eq__`` method.
@@ -133,6 +464,65 @@ class TestConfig:
 
         assert sample_config() != OtherConfig()
 
+    def test_freeze(self, sample_config):
+        """
+        Tests for the ``freeze`` method and hashing frozen configs.
+        """
+        config = sample_config({"foo": [1, {"a": {2}}], "bar": {"baz": 2}})
+        with pytest.raises(TypeError):
+            hash(config)
+
+        assert config.freeze() is config
+        assert config.bar._frozen
+
+        with pytest.raises(AttributeError):
+            config.foo = 1
+
+        with pytest.raises(AttributeError):
+            config.bar.baz = 1
+
+        with pytest.raises(AttributeError):
+            config.update({"foo": 1})
+
+        assert config.foo == [1, {"a": {2}}]
+        assert config.bar.baz == 2
+
+        other = sample_config({"foo": [1, {"a": {2}}], "bar": {"baz": 2}}).freeze()
+        assert hash(config) == hash(other)
+        assert config == other
+        assert len({config, other}) == 1
+        assert {config: 1}[other] == 1
+
+        other = sample_config({"foo": [1, {"a": {3}}], "bar": {"baz": 2}}).freeze()
+        assert config != other
+        assert config != sample_config()
+
+        # the hash is computed once and cached
+        with mock.patch("fica.config._make_hashable") as mocked_make_hashable:
+            hash(config)
+            mocked_make_hashable.assert_not_called()
+
+        # comparing frozen configs doesn't require their values to be hashable
+        config = sample_config({"foo": [bytearray(b"a")]}).freeze()
+        assert config == sample_config({"foo": [bytearray(b"a")]}).freeze()
+        assert config != sample_config({"foo": [bytearray(b"b")]}).freeze()
+        with pytest.raises(TypeError):
+            hash(config)
+
+        config = sample_config({"foo": [1, 2]}).freeze()
+        assert config == sample_config({"foo": [1, 2]}).freeze()
+        assert config != sample_config({"foo": [1, 3]}).freeze()
+
+        # nested configs frozen by the user can't be updated through their parent config
+        config = sample_config({"bar": {"baz": 10}})
+        bar = config.bar.freeze()
+        with pytest.raises(ConfigProcessingException, match="bar: Cannot modify frozen config"):
+            config.update({"bar": {"quux": 20}})
+        assert config.bar is bar
+        assert config.bar.baz == 10
+        assert config.bar.quux is None
+        assert config.get_dirty_keys() == []
+
     def test___getitem__(self, sample_config):
         """
         Tests for the ``__getitem__`` method.
@@ -285,3 +675,296 @@ class TestConfig:
                 if a == "b" and isinstance(v, dict):
                     v = BValue(v)
                 assert getattr(c, a) == v
+
+    def test_shared_defaults(self):
+        """
+        Tests for keys with shared default subkey containers.
+        """
+        class CValue(Config):
+            c = Key(default=1)
+
+        class BValue(Config):
+            b = Key(default=1)
+            c = Key(subkey_container=CValue)
+
+        class A(Config):
+            a = Key(default=1)
+            b = Key(subkey_container=BValue, share_default=True)
+
+        x, y = A(), A()
+        assert x.b is y.b
+        assert x.b == BValue()
+        assert x.get_user_config() == {}
+
+        # the shared default is read-only, including the configs nested in it
+        with pytest.raises(AttributeError):
+            x.b.b = 2
+
+        with pytest.raises(AttributeError):
+            x.b.c.c = 2
+
+        with pytest.raises(AttributeError):
+            x.b.update({"b": 2})
+
+        assert y.b == BValue()
+
+        # updating through the parent config creates a private copy
+        x.update({"b": {"c": {"c": 2}}})
+        assert x.b is not y.b
+        assert x.b == BValue({"c": {"c": 2}})
+        assert y.b == BValue()
+        assert x.get_user_config() == {"b": {"c": {"c": 2}}}
+        assert y.get_user_config() == {}
+
+        x.update({"b": {"b": 3}})
+        assert x.b == BValue({"b": 3, "c": {"c": 2}})
+
+        x.b = BValue({"b": 4})
+        assert x.get_user_config() == {"b": {"b": 4}}
+
+        assert A({"b": {"b": 2}}).b == BValue({"b": 2})
+        assert A({"b": 2}).b == 2
+
+        # the shared default is discarded when the container's keys change
+        BValue.d = Key(default=2)
+        assert A().b.d == 2
+        assert A().b is A().b
+
+    def test__get_schema(self, sample_config):
+        """
+        Tests for the ``_get_schema`` method and the invalidation of cached schemas.
+        """
+        schema = sample_config._get_schema()
+        assert sample_config._get_schema() is schema
+        assert schema.attrs_to_names == {
+            "foo": "foo",
+            "bar": "bar",
+            "quuz": "quuz",
+            "grault": "grault",
+            "garply": "garplish",
+        }
+        assert schema.names_to_attrs == {v: k for k, v in schema.attrs_to_names.items()}
+        assert schema.keys == {a: getattr(sample_config, a) for a in schema.attrs_to_names}
+        assert schema.subkey_containers == {
+            "bar": sample_config.BarValue,
+            "quuz": sample_config.QuuzValue,
+        }
+
+        class A(Config):
+            a = Key()
+
+        class B(A):
+            b = Key()
+
+        assert list(B._get_schema().attrs_to_names) == ["a", "b"]
+
+        # setting non-key attributes doesn't invalidate the schema
+        a_schema, b_schema = A._get_schema(), B._get_schema()
+        A.foo = 1
+        assert A._get_schema() is a_schema
+        assert B._get_schema() is b_schema
+
+        # adding keys invalidates the schema of the class and its subclasses
+        A.c = Key(name="see")
+        assert A._get_schema() is not a_schema
+        assert list(A._get_schema().attrs_to_names) == ["a", "c"]
+        assert list(B._get_schema().attrs_to_names) == ["a", "c", "b"]
+        assert B({"see": 1}).c == 1
+
+        # replacing keys invalidates the schema
+        B.b = Key(default=2)
+        assert B().b == 2
+
+        # removing keys invalidates the schema
+        del A.c
+        assert list(B._get_schema().attrs_to_names) == ["a", "b"]
+
+        # changing the configuration of a key invalidates the schemas of the classes it belongs to
+        b_schema = B._get_schema()
+        assert B().a is None
+        A.a.default = 3
+        assert B._get_schema() is not b_schema
+        assert A().a == 3
+        assert B().a == 3
+
+        A.a.name = "ay"
+        assert B({"ay": 4}).a == 4
+        assert B({"ay": 4}).get_user_config() == {"ay": 4}
+        with pytest.raises(ValueError):
+            B({"a": 4}, require_valid_keys=True)
+
+        # including keys that were added after the class was created
+        A.c = Key(default=5)
+        assert B().c == 5
+        A.c.default = 6
+        assert B().c == 6
+
+        class C(CompactConfig):
+            a = Key(default=1)
+
+        assert C().a == 1
+        C.a.default = 2
+        assert C().a == 2
+
+    def test_abstract_base_classes(self):
+        """
+        Tests that configs can inherit from ``abc.ABC``.
+        """
+        class A(Config, abc.ABC):
+
+            a = Key(default=1)
+
+            @abc.abstractmethod
+            def f(self):
+                ...
+
+        class B(A):
+
+            b = Key(default=2)
+
+            def f(self):
+                return self.a + self.b
+
+        with pytest.raises(TypeError):
+            A()
+
+        assert B({"b": 3}).f() == 4
+        assert isinstance(B(), A)
+
+
+class TestCompactConfig:
+    """
+    Tests for ``fica.config.CompactConfig``.
+    """
+
+    @pytest.fixture
+    def compact_config(self):
+        """
+        A pytest fixture for generating a sample ``CompactConfig`` subclass.
+        """
+        class SampleCompactConfig(CompactConfig):
+
+            foo = Key(description="foo")
+
+            class BarValue(CompactConfig):
+                baz = Key(default=1)
+
+            bar = Key(subkey_container=BarValue)
+
+            quux = Key(factory=lambda: [])
+
+            garply = Key(default=3, type_=int, name="garplish")
+
+        return SampleCompactConfig
+
+    def test_storage(self, compact_config):
+        """
+        Tests that compact configs don't have an instance ``__dict__``.
+        """
+        config = compact_config()
+        assert not hasattr(config, "__dict__")
+        assert not hasattr(config.bar, "__dict__")
+
+        with pytest.raises(AttributeError):
+            config.doesnotexist = 1
+
+        class Subclass(compact_config):
+            corge = Key(default=True)
+
+        config = Subclass()
+        assert not hasattr(config, "__dict__")
+        assert config.corge is True
+
+    def test_behavior(self, compact_config):
+        """
+        Tests that compact configs behave the same as regular configs.
+        """
+        config = compact_config()
+        assert config.foo is None
+        assert config.bar == compact_config.BarValue()
+        assert config.bar.baz == 1
+        assert config.quux == []
+        assert config.quux is not compact_config().quux
+        assert config.garply == 3
+        assert config["garply"] == 3
+        assert config.get_user_config() == {}
+        assert repr(config) == "SampleCompactConfig(foo=None, bar=BarValue(baz=1), quux=[], garply=3)"
+        assert isinstance(compact_config.foo, Key)
+
+        config.foo = 2
+        assert config.foo == 2
+        assert config.get_user_config() == {"foo": 2}
+
+        config.update({"bar": {"baz": 2}, "garplish": 4})
+        assert config.bar.baz == 2
+        assert config.get_user_config() == {"foo": 2, "bar": {"baz": 2}, "garplish": 4}
+        assert config == compact_config({"foo": 2, "bar": {"baz": 2}, "garplish": 4})
+        assert config != compact_config()
+
+        with pytest.raises(ConfigProcessingException):
+            config.update({"garplish": "a"})
+
+    def test_view(self, compact_config):
+        """
+        Tests that views of compact configs compute their values lazily.
+        """
+        user_config = {"foo": 2, "bar": {"baz": 2}, "garplish": 4}
+        view = compact_config.view(user_config)
+        assert not hasattr(view, "__dict__")
+        assert view._values == list(compact_config._get_schema().keys.values())
+        assert view.garply == 4
+        assert view._values[3] == 4
+        assert view.bar.baz == 2
+        assert view == compact_config(user_config)
+        assert view.get_user_config() == user_config
+
+        with pytest.raises(ConfigProcessingException):
+            compact_config.view({"garplish": "a"}).garply
+
+    def test_copy(self, compact_config):
+        """
+        Tests that compact configs can be copied.
+        """
+        config = compact_config({"foo": 1, "bar": {"baz": 2}})
+        for copied in [copy.copy(config), copy.deepcopy(config)]:
+            assert copied == config
+            assert copied.get_user_config() == {"foo": 1, "bar": {"baz": 2}}
+
+        copied = copy.deepcopy(config.freeze())
+        assert copied == config
+        assert copied._frozen
+        with pytest.raises(AttributeError):
+            copied.foo = 2
+
+        copied = copy.deepcopy(compact_config())
+        copied.foo = 2
+        assert copied.get_user_config() == {"foo": 2}
+
+        # shallow copies don't share their values with the original
+        original = compact_config({"foo": 1})
+        copied = copy.copy(original)
+        copied.foo = 2
+        assert original.foo == 1
+        assert copied.foo == 2
+
+    def test_fixed_layout(self, compact_config):
+        """
+        Tests that the keys of compact configs can't be changed.
+        """
+        with pytest.raises(TypeError):
+            compact_config.corge = Key()
+
+        with pytest.raises(TypeError):
+            del compact_config.foo
+
+        compact_config.not_a_key = 1
+        assert compact_config.not_a_key == 1
+
+        key = Key()
+
+        class DuplicateKeys(CompactConfig):
+            a = key
+            b = key
+
+        with pytest.raises(TypeError):
+            DuplicateKeys()
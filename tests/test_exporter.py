@@ -1,11 +1,14 @@
 """Tests for ``fica.exporter``"""
 
+import io
 import pytest
 
+from collections import Counter
 from textwrap import dedent
+from unittest import mock
 
 from fica import Config, Key
-from fica.exporter import create_exporter, JsonExporter, YamlExporter
+from fica.exporter import create_exporter, ExportCache, JsonExporter, YamlExporter
 
 
 def test_that_sample_config_raise_if_not_in_doc_mode_works(sample_config):
@@ -46,6 +49,48 @@ class TestJsonExporter:
             }
         """).strip()
 
+    def test_export_values_with_multiple_lines(self):
+        """
+        Tests that descriptions are added to the right lines when values span multiple lines or
+        contain colons.
+        """
+        class ValuesConfig(Config):
+
+            foo = Key(description="foo", default=["a: b", {"c": 1, 2: [None]}, []])
+
+            class BarValue(Config):
+                pass
+
+            bar = Key(description="bar", subkey_container=BarValue, default="b:")
+
+            baz = Key(description="baz", default="\n:\n", name="b:a:z")
+
+        exporter = JsonExporter()
+        exported_config = exporter.export(ValuesConfig)
+        assert exported_config == dedent("""\
+            {
+              "foo": [          // foo
+                "a: b",
+                {
+                  "c": 1,
+                  "2": [
+                    null
+                  ]
+                },
+                []
+              ],
+              // Default value: "b:"
+              "bar": {},        // bar
+              "b:a:z": "\\n:\\n"  // baz
+            }
+        """).strip()
+        assert "\n".join(exporter.export_iter(ValuesConfig)) == exported_config
+
+        class EmptyConfig(Config):
+            pass
+
+        assert exporter.export(EmptyConfig) == "{}"
+
 
 class TestYamlExporter:
     """
@@ -71,6 +116,198 @@ class TestYamlExporter:
             garplish: 3
         """).strip()
 
+    def test_export_empty_subkey_container(self):
+        """
+        Tests exporting a key with an empty subkey container and a default followed by a value
+        spanning several lines, which leaves more lines than descriptions.
+        """
+        class EmptyConfig(Config):
+            pass
+
+        class A(Config):
+            a = Key(description="a", default=1, subkey_container=EmptyConfig)
+            b = Key(description="b", default=[1, 2])
+
+        exporter = YamlExporter()
+        expected = dedent("""\
+            a: {}  # a
+            # Default value: 1
+            b:     # b
+            - 1
+            - 2
+        """).strip()
+        assert exporter.export(A) == expected
+        assert "\n".join(exporter.export_iter(A)) == expected
+
+
+@pytest.mark.parametrize("exporter_type", ["json", "yaml"])
+def test_export_creates_each_config_once(exporter_type):
+    """
+    Tests that exporting a config creates each config in its tree only once, in documentation mode.
+    """
+    created = Counter()
+
+    class CountingConfig(Config):
+
+        def __init__(self, *args, documentation_mode=False, **kwargs):
+            assert documentation_mode
+            created[type(self).__name__] += 1
+            super().__init__(*args, documentation_mode=documentation_mode, **kwargs)
+
+    class A(CountingConfig):
+
+        class BValue(CountingConfig):
+
+            class CValue(CountingConfig):
+                d = Key(description="d", default=1)
+
+            c = Key(description="c", subkey_container=CValue)
+            e = Key(description="e", subkey_container=CValue)
+
+        b = Key(description="b", subkey_container=BValue)
+        f = Key(description="f", subkey_container=BValue, default=2)
+
+    exporter = create_exporter(exporter_type)
+    exported = exporter.export(A)
+    assert created == {"A": 1, "BValue": 2, "CValue": 4}
+    assert "Default value: 2" in exported
+
+    # the output is the same as when it is produced from config_to_dict and get_descriptions
+    created.clear()
+    config_dict, descriptions = exporter.collect(A)
+    assert config_dict == exporter.config_to_dict(A)
+    with mock.patch.object(CountingConfig, "__init__", autospec=True, side_effect=Config.__init__):
+        assert descriptions == exporter.get_descriptions(A, config_dict)
+
+
+@pytest.mark.parametrize("exporter_type", ["json", "yaml"])
+def test_export_iter(sample_config, exporter_type):
+    """
+    Tests that ``export_iter`` and ``export_to`` produce the same output as ``export``.
+    """
+    sample_config.raise_if_not_in_doc_mode = True
+    sample_config.foo.required = True
+    exporter = create_exporter(exporter_type)
+    exported = exporter.export(sample_config)
+
+    lines = exporter.export_iter(sample_config)
+    assert not isinstance(lines, list)
+    assert list(lines) == exported.split("\n")
+
+    fp = io.StringIO()
+    exporter.export_to(sample_config, fp)
+    assert fp.getvalue() == exported
+
+    # values that must be dumped as aliases are handled
+    class AliasConfig(Config):
+        shared = ["a", "b"]
+        foo = Key(description="foo", default=shared)
+        bar = Key(description="bar", default=shared)
+
+    with mock.patch.object(exporter, "should_add_description", return_value=False):
+        assert "\n".join(exporter.export_iter(AliasConfig)) == exporter.export(AliasConfig)
+
+
+class TestExportCache:
+    """
+    Tests for ``fica.exporter.ExportCache``.
+    """
+
+    def test_export(self, sample_config):
+        """
+        Tests for the ``export`` method.
+        """
+        cache = ExportCache()
+        yaml_exporter, json_exporter = YamlExporter(), JsonExporter()
+        expected = YamlExporter().export(sample_config)
+
+        with mock.patch.object(YamlExporter, "export", autospec=True,
+                side_effect=YamlExporter.export) as mocked_export:
+            assert cache.export(yaml_exporter, sample_config) == expected
+            assert cache.export(yaml_exporter, sample_config) == expected
+            assert cache.export(create_exporter("yaml"), sample_config) == expected
+            assert mocked_export.call_count == 1
+
+            # outputs are cached separately for each exporter type
+            assert cache.export(json_exporter, sample_config) == \
+                JsonExporter().export(sample_config)
+            assert len(cache) == 2
+
+            # changing the config's keys invalidates its output
+            sample_config.grault.default = 4
+            assert cache.export(yaml_exporter, sample_config) != expected
+            assert mocked_export.call_count == 2
+
+            sample_config.BarValue.baz.description = "new description"
+            assert "# new description" in cache.export(yaml_exporter, sample_config)
+            assert mocked_export.call_count == 3
+
+            sample_config.garply = Key(default=5, name="garplish")
+            assert "garplish: 5" in cache.export(yaml_exporter, sample_config)
+            assert mocked_export.call_count == 4
+            assert len(cache) == 2
+
+            cache.clear()
+            assert len(cache) == 0
+            cache.export(yaml_exporter, sample_config)
+            assert mocked_export.call_count == 5
+
+    def test_custom_exporter(self, sample_config):
+        """
+        Tests that subclasses of ``ConfigExporter`` that override ``export`` can be cached.
+        """
+        class CustomExporter(YamlExporter):
+
+            def __init__(self, prefix):
+                self.prefix = prefix
+
+            def export(self, config):
+                return self.prefix + super().export(config)
+
+        cache = ExportCache()
+        expected = CustomExporter("# custom\n").export(sample_config)
+        with mock.patch.object(CustomExporter, "export", autospec=True,
+                side_effect=CustomExporter.export) as mocked_export:
+            for _ in range(2):
+                assert cache.export(CustomExporter("# custom\n"), sample_config) == expected
+            assert mocked_export.call_count == 1
+
+            # outputs are cached separately for each set of options
+            assert cache.export(CustomExporter("# other\n"), sample_config).startswith("# other")
+            assert mocked_export.call_count == 2
+
+            # outputs aren't cached for exporters with unhashable options
+            exporter = CustomExporter("# custom\n")
+            exporter.options = {}
+            for _ in range(2):
+                assert cache.export(exporter, sample_config) == expected
+            assert mocked_export.call_count == 4
+            assert len(cache) == 2
+
+    def test_maxsize(self):
+        """
+        Tests that the least recently used outputs are evicted from the cache.
+        """
+        cache = ExportCache(maxsize=2)
+        exporter = YamlExporter()
+        configs = [type(f"C{i}", (Config, ), {"a": Key(default=i)}) for i in range(3)]
+        for c in configs:
+            cache.export(exporter, c)
+        assert len(cache) == 2
+
+        with mock.patch.object(YamlExporter, "export", autospec=True,
+                side_effect=YamlExporter.export) as mocked_export:
+            cache.export(exporter, configs[2])
+            cache.export(exporter, configs[1])
+            assert mocked_export.call_count == 0
+            cache.export(exporter, configs[0])
+            assert mocked_export.call_count == 1
+
+        unbounded_cache = ExportCache(maxsize=None)
+        for c in configs:
+            unbounded_cache.export(exporter, c)
+        assert len(unbounded_cache) == 3
+
 
 def test_create_exporter():
     """
@@ -1,5 +1,7 @@
 """Tests for ``fica.key``"""
 
+import copy
+import pickle
 import pytest
 
 from unittest import mock
@@ -10,6 +12,14 @@ from fica.validators import _Validator
 from .utils import assert_object_attrs
 
 
+class PickledConfig(Config):
+    """
+    A config class that can be pickled by reference for ``TestKey.test_pickle``.
+    """
+
+    a = Key(default=1)
+
+
 @pytest.fixture
 def default_key_attrs():
     """
@@ -25,6 +35,7 @@ def default_key_attrs():
         "enforce_subkeys": False,
         "name": None,
         "required": False,
+        "share_default": False,
     }
 
 
@@ -106,6 +117,14 @@ class TestKey:
         key = Key(required=True)
         assert_object_attrs(key, {**default_key_attrs, "required": True})
 
+        key = Key(subkey_container=SubkeyValue, share_default=True)
+        assert_object_attrs(key, {
+            **default_key_attrs,
+            "subkey_container": SubkeyValue,
+            "default": SUBKEYS,
+            "share_default": True,
+        })
+
         # test errors
         with pytest.raises(TypeError):
             Key(type_=[int])
@@ -146,6 +165,9 @@ class TestKey:
         with pytest.raises(ValueError):
             Key(required=True, factory=lambda: [1])
 
+        with pytest.raises(ValueError):
+            Key(share_default=True)
+
     def test_get_value(self):
         """
         Test for the ``get_value`` method.
@@ -212,6 +234,12 @@ class TestKey:
         value = key.get_value(1)
         assert value == 1
 
+        key = Key(subkey_container=SubkeyValue, share_default=True)
+        value = key.get_value()
+        assert value == SubkeyValue()
+        assert key.get_value() is value
+        assert key.get_value({"bar": 2}) == SubkeyValue({"bar": 2})
+
         # test errors
         with pytest.raises(TypeError):
             value = Key(default=1, type_=(int, float)).get_value("quux")
@@ -265,3 +293,61 @@ class TestKey:
         with mock.patch.object(key, "get_value") as mocked_get_value:
             assert key.get_default() == None
             mocked_get_value.assert_not_called()
+
+    def test__compile_plan(self):
+        """
+        Test for the ``_compile_plan`` method and the recompilation of plans when keys are modified.
+        """
+        for key, user_value, expected in [
+            (Key(default=1), EMPTY, 1),
+            (Key(default=1), 2, 2),
+            (Key(default=1, type_=int), 2, 2),
+            (Key(default=1, type_=int, allow_none=True), None, None),
+            (Key(factory=lambda: [1]), EMPTY, [1]),
+        ]:
+            assert key._plan(user_value, False) == expected
+
+        with pytest.raises(TypeError):
+            Key(default=1, type_=int)._plan("1", False)
+
+        with pytest.raises(TypeError):
+            Key(default=1, type_=int, allow_none=True)._plan("1", False)
+
+        key = Key()
+        plan = key._plan
+        key.required = True
+        assert key._plan is not plan
+        with pytest.raises(ValueError):
+            key.get_value()
+
+        key.validator = validators.choice([2])
+        with pytest.raises(ValueError):
+            key.get_value(1)
+        assert key.get_value(2) == 2
+
+    def test_pickle(self):
+        """
+        Tests that keys can be pickled and copied.
+        """
+        key = Key(subkey_container=PickledConfig)
+        for copied in [pickle.loads(pickle.dumps(key)), copy.deepcopy(key)]:
+            assert copied.default is SUBKEYS
+            assert copied.subkey_container is PickledConfig
+            assert copied.get_value() == PickledConfig()
+            assert copied.get_value({"a": 2}).a == 2
+
+        key = Key(default=1, type_=int, validator=validators.choice([1, 2]))
+        copied = pickle.loads(pickle.dumps(key))
+        assert copied.get_value() == 1
+        with pytest.raises(TypeError):
+            copied.get_value("1")
+        with pytest.raises(ValueError):
+            copied.get_value(3)
+
+        # plans of unpickled keys are recompiled when they are modified
+        copied.default = 2
+        assert copied.get_value() == 2
+        assert key.get_value() == 1
+
+        assert pickle.loads(pickle.dumps(EMPTY)) is EMPTY
+        assert pickle.loads(pickle.dumps(PickledConfig({"a": 3}))) == PickledConfig({"a": 3})
@@ -0,0 +1,214 @@
+"""Tests for ``fica.loader``"""
+
+import io
+import json
+import pytest
+import yaml
+
+from unittest import mock
+
+from fica import Config, Key
+from fica.loader import iter_json_items, iter_yaml_items
+from fica.utils import ConfigProcessingException
+from fica.validators import _Validator
+
+
+class LoaderConfig(Config):
+
+    foo = Key(default=1, type_=int)
+
+    class BarValue(Config):
+        baz = Key(default=True)
+        quux = Key(default="quux", type_=str)
+
+    bar = Key(subkey_container=BarValue)
+
+    lst = Key(type_=list, allow_none=True)
+
+
+USER_CONFIG = {"foo": 12345, "bar": {"quux": "ünïcødé \"q\""}, "lst": [1.5, None, {"a": []}]}
+
+
+class ReadCountingStream(io.BytesIO):
+    """
+    A binary stream that records how much of it has been read.
+    """
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        ret = super().read(size)
+        self.bytes_read += len(ret)
+        return ret
+
+
+class TestLoader:
+    """
+    Tests for ``fica.loader``.
+    """
+
+    def test_iter_json_items(self):
+        """
+        Tests for ``iter_json_items``.
+        """
+        contents = json.dumps({**USER_CONFIG, "other": {"x": [1, 2, "}"]}}, indent=2)
+        for chunk_size in [1, 2, 7, 65536]:
+            for stream in [io.StringIO(contents), io.BytesIO(contents.encode("utf-8"))]:
+                on_key = mock.Mock()
+                items = list(iter_json_items(stream, on_key, chunk_size=chunk_size))
+                assert items == list(json.loads(contents).items())
+                assert on_key.call_args_list == [mock.call(k) for k, _ in items]
+
+        assert list(iter_json_items(io.StringIO(" {} "), mock.Mock())) == []
+
+        # test errors
+        for contents in ["", "{", '{"foo": }', '{"foo" 1}', '{"foo": 1,}', '{"foo": 1} 2', "{1: 2}"]:
+            with pytest.raises(json.JSONDecodeError):
+                list(iter_json_items(io.StringIO(contents), mock.Mock()))
+
+        with pytest.raises(TypeError):
+            list(iter_json_items(io.StringIO("[1, 2]"), mock.Mock()))
+
+        # numbers and literals split across chunks are decoded once the rest has been read
+        contents = '{"a": [1.5e-3, -20, true, null, "\\u00e9"], "b": -1.25E+2}'
+        for chunk_size in range(1, 12):
+            items = list(iter_json_items(io.StringIO(contents), mock.Mock(), chunk_size=chunk_size))
+            assert items == list(json.loads(contents).items())
+
+        # invalid values stop the stream from being read any further
+        for value in ["tru e", "[1, 2 3]", '"a\x01"', "{1: 2}", "-x"]:
+            stream = ReadCountingStream(
+                ('{"foo": ' + value + ', "lst": [' + "1, " * 100000 + "1]}").encode("utf-8"))
+            with pytest.raises(json.JSONDecodeError):
+                list(iter_json_items(stream, mock.Mock(), chunk_size=1024))
+            assert stream.bytes_read < 4096
+
+    def test_iter_yaml_items(self):
+        """
+        Tests for ``iter_yaml_items``.
+        """
+        contents = yaml.safe_dump(USER_CONFIG) + "other: &a [1, 2]\nanother: *a\n"
+        for stream in [io.StringIO(contents), io.BytesIO(contents.encode("utf-8"))]:
+            on_key = mock.Mock()
+            items = list(iter_yaml_items(stream, on_key))
+            assert items == list(yaml.safe_load(contents).items())
+            assert on_key.call_args_list == [mock.call(k) for k, _ in items]
+
+        for contents in ["", "---\n", "null"]:
+            assert list(iter_yaml_items(io.StringIO(contents), mock.Mock())) == []
+
+        # merged keys don't override keys specified in the mapping, wherever they are
+        for contents in [
+            "<<: {a: 5}\nb: 3\n",
+            "b: 3\n<<: {b: 5, c: 1}\nd: 4\n",
+            "a: 1\n<<: {a: 2}\na: 3\n",
+            "base: &b {a: 1, x: 2}\nx: 0\n<<: [*b, {a: 9, y: 3}]\na: 7\nx: 8\n",
+        ]:
+            on_key = mock.Mock()
+            items = list(iter_yaml_items(io.StringIO(contents), on_key))
+            assert dict(items) == yaml.safe_load(contents)
+            assert on_key.call_args_list == [mock.call(k) for k, _ in items]
+
+        # test errors
+        for contents in ["foo: [1", "foo: 1\n---\nfoo: 2\n"]:
+            with pytest.raises(yaml.YAMLError):
+                list(iter_yaml_items(io.StringIO(contents), mock.Mock()))
+
+        with pytest.raises(TypeError):
+            list(iter_yaml_items(io.StringIO("- 1\n- 2\n"), mock.Mock()))
+
+    def test_from_stream(self):
+        """
+        Tests for ``fica.Config.from_stream``.
+        """
+        expected = LoaderConfig(USER_CONFIG)
+        contents = {
+            "json": json.dumps({**USER_CONFIG, "other": 1}),
+            "yaml": yaml.safe_dump({**USER_CONFIG, "other": 1}),
+        }
+        for fmt, c in contents.items():
+            assert LoaderConfig.from_stream(io.StringIO(c), format=fmt) == expected
+            assert LoaderConfig.from_stream(io.BytesIO(c.encode("utf-8")), format=fmt) == expected
+
+            with pytest.raises(ValueError, match="Unexpected key found in config: 'other'"):
+                LoaderConfig.from_stream(io.StringIO(c), format=fmt, require_valid_keys=True)
+
+        assert LoaderConfig.from_stream(io.StringIO("{}")) == LoaderConfig()
+
+        # values are only checked and computed once
+        calls = []
+
+        class CountingValidator(_Validator):
+
+            def validate(self, value):
+                calls.append(value)
+
+        class ValidatedConfig(Config):
+
+            a = Key(validator=CountingValidator())
+
+            class BValue(Config):
+                c = Key(validator=CountingValidator())
+
+            b = Key(subkey_container=BValue)
+
+        with mock.patch.object(
+            ValidatedConfig.BValue, "__init__", autospec=True,
+            side_effect=ValidatedConfig.BValue.__init__,
+        ) as mocked_init:
+            config = ValidatedConfig.from_stream(io.StringIO('{"a": 1, "b": {"c": 2}}'))
+        assert mocked_init.call_count == 1
+        assert calls == [1, 2]
+        assert config == ValidatedConfig({"a": 1, "b": {"c": 2}})
+        assert config.get_user_config() == {"a": 1, "b": {"c": 2}}
+
+        # errors are raised as soon as the invalid key is parsed
+        for prefix, error_cls in [
+            ('{"foo": "a", ', ConfigProcessingException),
+            ('{"bar": {"quux": 1}, ', ConfigProcessingException),
+            ('{"other": ', ValueError),
+        ]:
+            stream = ReadCountingStream(
+                (prefix + '"lst": [' + "1, " * 100000 + "1]}").encode("utf-8"))
+            with pytest.raises(error_cls):
+                LoaderConfig.from_stream(stream, require_valid_keys=True)
+            assert stream.bytes_read < 100000
+
+        with pytest.raises(ConfigProcessingException) as exc_info:
+            LoaderConfig.from_stream(io.StringIO("bar:\n  quux: 1\n"), format="yaml")
+        assert exc_info.value.key == "bar.quux"
+
+        with pytest.raises(TypeError):
+            LoaderConfig.from_stream(io.StringIO("1: 2\n"), format="yaml")
+
+        # top-level merge keys are supported
+        contents = "<<: {foo: 5, lst: [1]}\nfoo: 3\n"
+        assert LoaderConfig.from_stream(io.StringIO(contents), format="yaml") == \
+            LoaderConfig(yaml.safe_load(contents)) == LoaderConfig({"foo": 3, "lst": [1]})
+
+        # test errors
+        with pytest.raises(ValueError):
+            LoaderConfig.from_stream(io.StringIO("{}"), format="toml")
+
+    def test_from_file(self, tmp_path):
+        """
+        Tests for ``fica.Config.from_file``.
+        """
+        expected = LoaderConfig(USER_CONFIG)
+        for name, dump in [
+            ("config.json", json.dumps),
+            ("config.yml", yaml.safe_dump),
+            ("config.YAML", yaml.safe_dump),
+        ]:
+            path = tmp_path / name
+            path.write_text(dump(USER_CONFIG), encoding="utf-8")
+            assert LoaderConfig.from_file(path) == expected
+            assert LoaderConfig.from_file(str(path)) == expected
+
+        path = tmp_path / "config.txt"
+        path.write_text(json.dumps(USER_CONFIG), encoding="utf-8")
+        assert LoaderConfig.from_file(path, format="json") == expected
+
+        # test errors
+        with pytest.raises(ValueError):
+            LoaderConfig.from_file(path)
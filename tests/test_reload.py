@@ -0,0 +1,202 @@
+"""Tests for ``fica.reload``"""
+
+import json
+import os
+import pytest
+import time
+
+from unittest import mock
+
+from fica import Config, Key
+from fica.reload import ConfigReloader
+from fica.utils import ConfigProcessingException
+
+
+class ReloadConfig(Config):
+
+    foo = Key(default=1, type_=int)
+
+    class BarValue(Config):
+        baz = Key(default=True)
+        quux = Key(default="quux")
+
+    bar = Key(subkey_container=BarValue)
+
+
+def write_file(path, contents: str) -> None:
+    """
+    Write a file and bump its modification time so that the change is always detected.
+    """
+    with open(path, "w") as f:
+        f.write(contents)
+
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+class TestConfigReloader:
+    """
+    Tests for ``fica.reload.ConfigReloader``.
+    """
+
+    def test_check_and_reload(self, tmp_path):
+        """
+        Tests for the ``check`` and ``reload`` methods.
+        """
+        path = tmp_path / "config.json"
+        write_file(path, json.dumps({"foo": 2, "bar": {"baz": False}}))
+
+        reloader = ConfigReloader(ReloadConfig, path, debounce=0)
+        callback = mock.Mock()
+        reloader.add_callback(callback)
+        assert reloader.config == ReloadConfig({"foo": 2, "bar": {"baz": False}})
+        assert reloader.check() is None
+
+        config = reloader.config
+        write_file(path, json.dumps({"foo": 3, "bar": {"baz": False, "quux": "q"}}))
+        with mock.patch.object(
+                ReloadConfig, "update", autospec=True, side_effect=ReloadConfig.update) as \
+                mocked_update:
+            changes = reloader.check()
+            # only the keys that changed are applied
+            mocked_update.assert_called_once_with(
+                reloader.config, {"foo": 3, "bar": {"quux": "q"}})
+        assert changes == {"foo": (2, 3), "bar.quux": ("quux", "q")}
+        assert reloader.config == ReloadConfig({"foo": 3, "bar": {"baz": False, "quux": "q"}})
+        callback.assert_called_once_with(reloader.config, changes)
+
+        # reloads are applied to a copy of the config, which replaces it, and carry its generation
+        # and dirty keys across
+        assert reloader.config is not config
+        assert reloader.config.bar is not config.bar
+        assert config == ReloadConfig({"foo": 2, "bar": {"baz": False}})
+        assert config.get_generation() == 0
+        config = reloader.config
+        assert config.get_generation() == 1
+        assert config.get_dirty_keys() == ["foo", "bar"]
+        assert config.bar.get_dirty_keys() == ["quux"]
+        config.clear_dirty()
+
+        # keys removed from the file are reset to their defaults
+        callback.reset_mock()
+        write_file(path, json.dumps({"bar": {"quux": "q"}}))
+        assert reloader.check() == {"foo": (3, 1), "bar.baz": (False, True)}
+        assert reloader.config == ReloadConfig({"bar": {"quux": "q"}})
+        assert reloader.config.get_user_config() == {"bar": {"quux": "q"}}
+        assert reloader.config.get_generation() == 2
+        assert reloader.config.get_dirty_keys() == ["foo", "bar"]
+        callback.assert_called_once()
+
+        # files whose contents haven't changed aren't parsed
+        callback.reset_mock()
+        write_file(path, json.dumps({"bar": {"quux": "q"}}))
+        loader = reloader._loader
+        with mock.patch("fica.reload.load_json") as mocked_load_json:
+            reloader._loader = mocked_load_json
+            assert reloader.check() is None
+            mocked_load_json.assert_not_called()
+        reloader._loader = loader
+        callback.assert_not_called()
+
+        # values of different types are applied even if they are equal
+        write_file(path, json.dumps({"bar": {"baz": True, "quux": "q"}}))
+        assert reloader.check() == {}
+        write_file(path, json.dumps({"bar": {"baz": 1, "quux": "q"}}))
+        assert reloader.check() == {}
+        assert type(reloader.config.bar.baz) is int
+
+        # nested configs that don't change aren't copied
+        config = reloader.config
+        write_file(path, json.dumps({"foo": 4, "bar": {"baz": 1, "quux": "q"}}))
+        assert reloader.check() == {"foo": (1, 4)}
+        assert reloader.config.bar is config.bar
+        assert config.foo == 1
+
+    def test_errors(self, tmp_path):
+        """
+        Tests that errors during reloads leave the config unchanged.
+        """
+        path = tmp_path / "config.json"
+        write_file(path, json.dumps({"foo": 2}))
+        reloader = ConfigReloader(ReloadConfig, path, debounce=0, require_valid_keys=True)
+        config = reloader.config
+
+        # none of the changed keys are applied if any of them are invalid
+        for contents in [
+            {"bar": {"quux": "q"}, "foo": "a"},
+            {"foo": 3, "doesnotexist": 1},
+            {"foo": 3, "bar": {"doesnotexist": 1}},
+        ]:
+            write_file(path, json.dumps(contents))
+            with pytest.raises(ConfigProcessingException):
+                reloader.check()
+            assert reloader.config is config
+            assert config == ReloadConfig({"foo": 2})
+            assert config.get_generation() == 0
+
+        write_file(path, "{")
+        with pytest.raises(json.JSONDecodeError):
+            reloader.check()
+
+        write_file(path, json.dumps({"foo": 4}))
+        assert reloader.check() == {"foo": (2, 4)}
+        assert reloader.config.get_generation() == 1
+        assert config.foo == 2
+
+        with pytest.raises(ValueError):
+            ConfigReloader(ReloadConfig, tmp_path / "config.txt")
+
+    def test_debounce(self, tmp_path):
+        """
+        Tests that changes are only reloaded once they settle.
+        """
+        path = tmp_path / "config.json"
+        write_file(path, json.dumps({"foo": 2}))
+        reloader = ConfigReloader(ReloadConfig, path, debounce=60)
+
+        write_file(path, json.dumps({"foo": 3}))
+        assert reloader.check() is None
+
+        with mock.patch("fica.reload.time.monotonic", return_value=time.monotonic() + 61):
+            assert reloader.check() == {"foo": (2, 3)}
+
+    def test_yaml(self, tmp_path):
+        """
+        Tests reloading YAML files.
+        """
+        path = tmp_path / "config.yml"
+        write_file(path, "foo: 2\n")
+        reloader = ConfigReloader(ReloadConfig, path, debounce=0)
+        assert reloader.config.foo == 2
+
+        write_file(path, "")
+        assert reloader.check() == {"foo": (2, 1)}
+
+    def test_background_thread(self, tmp_path):
+        """
+        Tests polling for changes in a background thread.
+        """
+        path = tmp_path / "config.json"
+        write_file(path, json.dumps({"foo": 2}))
+        reloader = ConfigReloader(ReloadConfig, path, poll_interval=0.01, debounce=0)
+        errors = []
+        reloader.start(errors.append)
+        try:
+            with pytest.raises(RuntimeError):
+                reloader.start()
+
+            write_file(path, json.dumps({"foo": "a"}))
+            deadline = time.monotonic() + 5
+            while not errors and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert isinstance(errors[0], ConfigProcessingException)
+
+            write_file(path, json.dumps({"foo": 3}))
+            while reloader.config.foo != 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert reloader.config.foo == 3
+
+        finally:
+            reloader.stop()
+
+        reloader.stop()
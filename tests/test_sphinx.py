@@ -1,10 +1,23 @@
 """Tests for ``fica.sphinx``"""
 
+import io
+import os
+import pytest
+import sys
+import time
+
+from sphinx.application import Sphinx
+from sphinx.util.parallel import parallel_available
+from textwrap import dedent
 from unittest import mock
 
-from fica import Config, __version__
+import fica.sphinx
+
+from fica import Config, Key, __version__
 from fica.exporter import create_exporter
-from fica.sphinx import FicaDirective, import_and_get_config, setup as setup_sphinx
+from fica.sphinx import (
+    _merge_info, _prune_env_cache, _purge_doc, FicaDirective, get_export, get_source_files,
+    import_and_get_config, setup as setup_sphinx)
 
 
 def generate_export(config: Config, fmt: str) -> str:
@@ -34,6 +47,251 @@ def test_import_and_get_config(mocked_import_module, mocked_create_exporter, sam
     mocked_create_exporter.return_value.export.assert_called_with(sample_config)
 
 
+def test_get_source_files(sample_config):
+    """
+    Test for ``fica.sphinx.get_source_files``.
+    """
+    class InheritedConfig(sample_config):
+        pass
+
+    assert get_source_files(InheritedConfig) == \
+        sorted([__file__, sys.modules[sample_config.__module__].__file__])
+
+    # dynamically-created classes are skipped
+    with mock.patch("inspect.getsourcefile", side_effect=TypeError):
+        assert get_source_files(InheritedConfig) == []
+
+
+@mock.patch("fica.sphinx.create_exporter")
+@mock.patch("fica.sphinx.import_module")
+def test_get_export(mocked_import_module, mocked_create_exporter, sample_config):
+    """
+    Test for ``fica.sphinx.get_export``.
+    """
+    mocked_import_module.return_value.MyObject = sample_config
+    mocked_create_exporter.return_value.export.return_value = "foo: 1"
+    env = mock.Mock(spec=["note_dependency", "docname"])
+    env.docname = "index"
+
+    for _ in range(2):
+        assert get_export(env, "mypackage.MyObject", "yaml") == "foo: 1"
+
+    # the config is only imported and exported once
+    mocked_import_module.assert_called_once_with("mypackage")
+    mocked_create_exporter.assert_called_once_with("yaml")
+    assert env.note_dependency.call_args_list == \
+        [mock.call(f) for f in get_source_files(sample_config)] * 2
+
+    get_export(env, "mypackage.MyObject", "json")
+    mocked_create_exporter.assert_called_with("json")
+    assert mocked_create_exporter.call_count == 2
+    assert env.fica_documented == {
+        "index": {("mypackage.MyObject", "yaml"), ("mypackage.MyObject", "json")},
+    }
+
+
+def test_env_hooks():
+    """
+    Tests for the handlers of the ``env-before-read-docs``, ``env-purge-doc``, and
+    ``env-merge-info`` events.
+    """
+    def make_env(exports, documented):
+        env = mock.Mock(spec=[])
+        env.fica_exports, env.fica_documented = exports, documented
+        return env
+
+    env = make_env(
+        {("a", "yaml"): ("a", []), ("b", "yaml"): ("b", []), ("c", "json"): ("c", [])},
+        {"foo": {("a", "yaml"), ("b", "yaml")}, "bar": {("b", "yaml")}, "baz": {("c", "json")}},
+    )
+
+    # exports are discarded unless they're used by a document that won't be re-read
+    _prune_env_cache(None, env, ["foo", "baz"])
+    assert env.fica_exports == {("b", "yaml"): ("b", [])}
+    assert env.fica_documented == {"bar": {("b", "yaml")}}
+
+    _purge_doc(None, env, "bar")
+    _purge_doc(None, env, "quux")
+    assert env.fica_documented == {}
+
+    # exports and records are merged from the environments of parallel processes
+    other = make_env(
+        {("b", "yaml"): ("other b", []), ("d", "yaml"): ("d", [])},
+        {"foo": {("b", "yaml"), ("d", "yaml")}, "bar": {("b", "yaml")}},
+    )
+    _merge_info(None, env, ["foo", "qux"], other)
+    assert env.fica_exports == {("b", "yaml"): ("b", []), ("d", "yaml"): ("d", [])}
+    assert env.fica_documented == {"foo": {("b", "yaml"), ("d", "yaml")}}
+
+    # the data is created if it doesn't exist
+    env = mock.Mock(spec=[])
+    _merge_info(None, env, ["foo"], other)
+    assert env.fica_exports == other.fica_exports
+
+
+def make_sphinx_project(path, n_docs=2):
+    """
+    Write a Sphinx project with ``n_docs`` documents documenting a config whose subkey container is
+    defined in a separate module to a directory.
+    """
+    srcdir = path / "src"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text(dedent("""\
+        import os, sys
+        sys.path.insert(0, os.path.dirname(__file__))
+        extensions = ["fica.sphinx"]
+    """))
+    others = ["other"] + [f"other{i}" for i in range(1, n_docs - 1)]
+    (srcdir / "index.rst").write_text(dedent(f"""\
+        Index
+        =====
+
+        .. toctree::
+
+        {{}}
+
+        .. fica:: {path.name}_config.Config
+    """).format("\n".join(f"    {o}" for o in others)))
+    for o in others:
+        (srcdir / f"{o}.rst").write_text(dedent(f"""\
+            {o.title()}
+            {"=" * len(o)}
+
+            .. fica:: {path.name}_config.Config
+
+            .. fica:: {path.name}_config.Config
+                :format: json
+        """))
+    (srcdir / f"{path.name}_config.py").write_text(dedent(f"""\
+        from fica import Config as _Config, Key
+        from {path.name}_subkeys import Subkeys
+
+        class Config(_Config):
+            foo = Key(description="foo", subkey_container=Subkeys)
+    """))
+    (srcdir / f"{path.name}_subkeys.py").write_text(dedent("""\
+        from fica import Config, Key
+
+        class Subkeys(Config):
+            bar = Key(description="bar", default=1)
+    """))
+    return srcdir
+
+
+def build_sphinx_project(srcdir, outdir, parallel=0):
+    """
+    Build a Sphinx project, returning the names of the documents that were read, the names of the
+    documents merged from parallel processes, and the build environment.
+    """
+    read, merged = [], []
+    app = Sphinx(
+        srcdir, srcdir, outdir / "html", outdir / "doctrees", "html", status=None,
+        warning=io.StringIO(), parallel=parallel)
+    app.connect("env-before-read-docs", lambda app, env, docnames: read.extend(docnames))
+    app.connect("env-merge-info", lambda app, env, docnames, other: merged.extend(docnames))
+    app.build()
+    return sorted(read), sorted(merged), app.env
+
+
+def test_incremental_build(tmp_path):
+    """
+    Tests that Sphinx builds export each config once per format and only re-read documents whose
+    configs have changed.
+    """
+    srcdir, outdir = make_sphinx_project(tmp_path), tmp_path / "out"
+    modules = [f"{tmp_path.name}_config", f"{tmp_path.name}_subkeys"]
+
+    try:
+        with mock.patch("fica.sphinx._import_object", wraps=fica.sphinx._import_object) as m:
+            assert build_sphinx_project(srcdir, outdir)[0] == ["index", "other"]
+            assert m.call_count == 2
+
+            # nothing is re-read if nothing has changed
+            m.reset_mock()
+            assert build_sphinx_project(srcdir, outdir)[0] == []
+            m.assert_not_called()
+
+        # documents are re-read if the module the subkey container is defined in changes
+        subkeys_file = srcdir / f"{tmp_path.name}_subkeys.py"
+        subkeys_file.write_text(subkeys_file.read_text().replace("default=1", "default=12345"))
+        mtime = time.time() + 10
+        os.utime(subkeys_file, (mtime, mtime))
+        for m in modules:
+            sys.modules.pop(m, None)
+
+        assert build_sphinx_project(srcdir, outdir)[0] == ["index", "other"]
+        assert "12345" in (outdir / "html" / "other.html").read_text()
+
+    finally:
+        for m in modules:
+            sys.modules.pop(m, None)
+
+
+@pytest.mark.skipif(not parallel_available, reason="parallel builds are not available")
+def test_parallel_build(tmp_path):
+    """
+    Tests that a parallel Sphinx build merges the exports of its reading processes, reuses them in
+    later builds, and produces the same output and cache as a serial one.
+    """
+    srcdir = make_sphinx_project(tmp_path, n_docs=12)
+    modules = [f"{tmp_path.name}_config", f"{tmp_path.name}_subkeys"]
+
+    try:
+        serial_read, serial_merged, serial_env = \
+            build_sphinx_project(srcdir, tmp_path / "serial")
+        parallel_read, parallel_merged, parallel_env = \
+            build_sphinx_project(srcdir, tmp_path / "parallel", parallel=2)
+
+        # the exports and the records of the documents that use them are merged from the reading
+        # processes into the main environment
+        assert len(parallel_read) == 12 and parallel_merged == parallel_read
+        config_path = f"{tmp_path.name}_config.Config"
+        yaml_key, json_key = (config_path, "yaml"), (config_path, "json")
+        assert parallel_env.fica_exports.keys() == {yaml_key, json_key}
+        for (_, fmt), (export, source_files) in parallel_env.fica_exports.items():
+            assert export == import_and_get_config(config_path, fmt)
+            assert [os.path.basename(f) for f in source_files] == [f"{m}.py" for m in modules]
+        assert parallel_env.fica_documented == {
+            d: {yaml_key} if d == "index" else {yaml_key, json_key} for d in parallel_read}
+
+        # the merged exports are reused when documents are re-read later, so the config isn't
+        # imported again
+        doc = srcdir / "other1.rst"
+        doc.write_text(doc.read_text() + "\nText\n")
+        mtime = time.time() + 10
+        os.utime(doc, (mtime, mtime))
+        with mock.patch("fica.sphinx._import_object", wraps=fica.sphinx._import_object) as m:
+            assert build_sphinx_project(srcdir, tmp_path / "parallel", parallel=2)[0] == \
+                ["other1"]
+            m.assert_not_called()
+        doc.write_text(doc.read_text()[:-len("\nText\n")])
+
+        parallel_read, parallel_merged, parallel_env = \
+            build_sphinx_project(srcdir, tmp_path / "parallel4", parallel=4)
+
+    finally:
+        for m in modules:
+            sys.modules.pop(m, None)
+
+    assert len(serial_read) == 12 and serial_merged == []
+    assert parallel_read == parallel_merged == serial_read
+
+    assert parallel_env.fica_exports == serial_env.fica_exports
+    assert parallel_env.fica_documented == serial_env.fica_documented
+    assert parallel_env.dependencies == serial_env.dependencies
+
+    serial_files = sorted(
+        p.relative_to(tmp_path / "serial") for p in (tmp_path / "serial" / "html").rglob("*")
+        if p.is_file())
+    parallel_files = sorted(
+        p.relative_to(tmp_path / "parallel4") for p in (tmp_path / "parallel4" / "html").rglob("*")
+        if p.is_file())
+    assert serial_files == parallel_files
+    for f in serial_files:
+        assert (tmp_path / "serial" / f).read_bytes() == (tmp_path / "parallel4" / f).read_bytes(), \
+            f
+
+
 class TestFicaDirective:
     """
     Tests for ``fica.sphinx.FicaDirective``.
@@ -41,7 +299,7 @@ class TestFicaDirective:
 
     @mock.patch("fica.sphinx.CodeBlock.__init__")
     @mock.patch("fica.sphinx.CodeBlock.run")
-    @mock.patch("fica.sphinx.import_and_get_config")
+    @mock.patch("fica.sphinx.get_export")
     def test_default_format(self, mocked_get_config, mocked_run, mocked_init, sample_config):
         """
         Test the default format (YAML) of the directive.
@@ -49,16 +307,19 @@ class TestFicaDirective:
         mocked_init.return_value = None
         mocked_get_config.return_value = generate_export(sample_config, "yaml")
         directive = FicaDirective()
+        directive.state = mock.Mock()
         directive.arguments = ["mypackage.MyConfig"]
         directive.options = {}
         directive.run()
+        mocked_get_config.assert_called_with(
+            directive.state.document.settings.env, "mypackage.MyConfig", directive.options["format"])
         assert directive.content == mocked_get_config.return_value.split("\n")
         assert directive.arguments[0] == "yaml"
         mocked_run.assert_called()
 
     @mock.patch("fica.sphinx.CodeBlock.__init__")
     @mock.patch("fica.sphinx.CodeBlock.run")
-    @mock.patch("fica.sphinx.import_and_get_config")
+    @mock.patch("fica.sphinx.get_export")
     def test_yaml_format(self, mocked_get_config, mocked_run, mocked_init, sample_config):
         """
         Test the explicitly-set YAML format of the directive.
@@ -66,16 +327,19 @@ class TestFicaDirective:
         mocked_init.return_value = None
         mocked_get_config.return_value = generate_export(sample_config, "yaml")
         directive = FicaDirective()
+        directive.state = mock.Mock()
         directive.arguments = ["mypackage.MyConfig"]
         directive.options = {"format": "yaml"}
         directive.run()
+        mocked_get_config.assert_called_with(
+            directive.state.document.settings.env, "mypackage.MyConfig", directive.options["format"])
         assert directive.content == mocked_get_config.return_value.split("\n")
         assert directive.arguments[0] == "yaml"
         mocked_run.assert_called()
 
     @mock.patch("fica.sphinx.CodeBlock.__init__")
     @mock.patch("fica.sphinx.CodeBlock.run")
-    @mock.patch("fica.sphinx.import_and_get_config")
+    @mock.patch("fica.sphinx.get_export")
     def test_json_format(self, mocked_get_config, mocked_run, mocked_init, sample_config):
         """
         Test the JSON format of the directive.
@@ -83,9 +347,12 @@ class TestFicaDirective:
         mocked_init.return_value = None
         mocked_get_config.return_value = generate_export(sample_config, "json")
         directive = FicaDirective()
+        directive.state = mock.Mock()
         directive.arguments = ["mypackage.MyConfig"]
         directive.options = {"format": "json"}
         directive.run()
+        mocked_get_config.assert_called_with(
+            directive.state.document.settings.env, "mypackage.MyConfig", directive.options["format"])
         assert directive.content == mocked_get_config.return_value.split("\n")
         assert directive.arguments[0] == "javascript"
         mocked_run.assert_called()
@@ -98,6 +365,11 @@ def test_setup():
     app = mock.Mock()
     ret = setup_sphinx(app)
     app.add_directive.assert_called_with("fica", FicaDirective)
+    app.connect.assert_has_calls([
+        mock.call("env-before-read-docs", _prune_env_cache),
+        mock.call("env-purge-doc", _purge_doc),
+        mock.call("env-merge-info", _merge_info),
+    ])
     assert ret == {
         "version": __version__,
         "parallel_read_safe": True,
@@ -1,8 +1,14 @@
 """Tests for ``fica.validators``"""
 
+import numpy as np
 import pytest
+import re
+import threading
 
-from fica.validators import choice, validator
+from unittest import mock
+
+from fica.validators import (
+    all_of, any_of, cached, CacheInfo, choice, each, length, range_, regex, validator)
 
 
 def test_choice():
@@ -23,6 +29,36 @@ def test_choice():
         value = as_str(c)
         assert ret == f"{value} is not one of {choices_str}"
 
+    # unhashable choices and values
+    validator = choice([1, [2], {"a": 3}])
+    for c in [1, [2], {"a": 3}, 1.0, True]:
+        assert validator.validate(c) is None
+
+    for c in [2, [3], {"a": 4}, {1}]:
+        assert validator.validate(c) is not None
+
+    # frozensets and ranges
+    validator = choice(frozenset({3, 1, 2}))
+    for c in [1, 2, 3, 2.0]:
+        assert validator.validate(c) is None
+    assert validator.validate(4) == "4 is not one of {1, 2, 3}"
+    assert validator.validate([1]) is not None
+
+    validator = choice(range(0, 10 ** 12, 2))
+    for c in [0, 2, 10 ** 12 - 2, 4.0, False]:
+        assert validator.validate(c) is None
+
+    for c in [1, 10 ** 12, 2.5, float("inf"), float("nan"), "2", None]:
+        assert validator.validate(c) == \
+            f"{as_str(c)} is not one of range(0, 1000000000000, 2)"
+
+    # the formatted choices are cached
+    validator = choice(choices)
+    validator.validate(4)
+    with mock.patch("fica.validators._format_value", side_effect=as_str) as mocked_format_value:
+        validator.validate(5)
+        assert mocked_format_value.call_count == 1
+
     # test errors
     with pytest.raises(TypeError):
         choice({1, 2, 3})
@@ -30,6 +66,15 @@ def test_choice():
     with pytest.raises(TypeError):
         choice(1)
 
+    # lists are checked against the index as a whole
+    validator = choice(choices)
+    with mock.patch.object(validator, "validate", wraps=validator.validate) as wrapped_validate:
+        assert validator._validate_each([1, 2, 'a'] * 100) is None
+        wrapped_validate.assert_not_called()
+
+        assert validator._validate_each([1, 2, 4]) == \
+            f"invalid element at index 2: 4 is not one of {choices_str}"
+
 
 def test_validator():
     """
@@ -53,3 +98,232 @@ def test_validator():
     with pytest.raises(TypeError):
         vdtr = validator(lambda x: 1)
         vdtr.validate(2)
+
+
+def test_all_of():
+    """
+    Tests the ``all_of`` validator.
+    """
+    vdtr = all_of(range_(0, 10), choice([1, 2, 3, 20]))
+    for v in [1, 2, 3]:
+        assert vdtr.validate(v) is None
+
+    assert vdtr.validate(20) == "20 is greater than 10"
+    assert vdtr.validate(4) == "4 is not one of {1, 2, 3, 20}"
+
+    # test short-circuiting
+    second = mock.Mock(validate=mock.Mock(return_value=None))
+    vdtr = all_of(range_(0, 10), second)
+    assert vdtr.validate(11) is not None
+    second.validate.assert_not_called()
+    assert vdtr.validate(1) is None
+    second.validate.assert_called_once_with(1)
+
+    assert all_of().validate(1) is None
+
+
+def test_any_of():
+    """
+    Tests the ``any_of`` validator.
+    """
+    vdtr = any_of(range_(maximum=0), regex(r"\d+"))
+    for v in [-1, 0, "123"]:
+        assert vdtr.validate(v) is None
+
+    assert vdtr.validate(1) == \
+        "1 does not satisfy any of the following: 1 is greater than 0; 1 is not a string"
+
+    # test short-circuiting
+    second = mock.Mock(validate=mock.Mock(return_value=None))
+    vdtr = any_of(range_(maximum=0), second)
+    assert vdtr.validate(-1) is None
+    second.validate.assert_not_called()
+
+
+def test_range_():
+    """
+    Tests the ``range_`` validator.
+    """
+    vdtr = range_(0, 10)
+    for v in [0, 5, 10, 2.5, float("nan")]:
+        assert vdtr.validate(v) is None
+
+    assert vdtr.validate(-1) == "-1 is less than 0"
+    assert vdtr.validate(10.5) == "10.5 is greater than 10"
+    assert vdtr.validate("1") == "'1' cannot be compared to 0 and 10"
+    assert vdtr.validate(None) == "None cannot be compared to 0 and 10"
+
+    assert range_(minimum=0).validate(10 ** 12) is None
+    assert range_(maximum="m").validate("z") == "'z' is greater than 'm'"
+
+    # lists are checked using their smallest and largest elements
+    with mock.patch.object(vdtr, "validate", wraps=vdtr.validate) as wrapped_validate:
+        assert vdtr._validate_each(list(range(11)) * 100) is None
+        assert wrapped_validate.call_count == 2
+
+    assert vdtr._validate_each([]) is None
+    assert vdtr._validate_each([1, 2, 11, -1]) == "invalid element at index 2: 11 is greater than 10"
+    assert vdtr._validate_each([float("nan"), -1]) == \
+        "invalid element at index 1: -1 is less than 0"
+    assert vdtr._validate_each([1, "a"]) == \
+        "invalid element at index 1: 'a' cannot be compared to 0 and 10"
+
+    # test errors
+    with pytest.raises(ValueError):
+        range_()
+
+
+def test_regex():
+    """
+    Tests the ``regex`` validator.
+    """
+    vdtr = regex(r"[a-z]+\d*")
+    for v in ["abc", "abc123", "z9"]:
+        assert vdtr.validate(v) is None
+
+    assert vdtr.validate("123") == "'123' does not match the pattern '[a-z]+\\d*'"
+    assert vdtr.validate("abc!") is not None
+    assert vdtr.validate(1) == "1 is not a string"
+
+    assert regex("abc", flags=re.IGNORECASE).validate("ABC") is None
+
+    # the pattern is only compiled once
+    with mock.patch("re.compile", wraps=re.compile) as wrapped_compile:
+        vdtr = regex(r"\w+")
+        for _ in range(10):
+            vdtr.validate("abc")
+        wrapped_compile.assert_called_once()
+
+    # test errors
+    with pytest.raises(re.error):
+        regex("(")
+
+
+def test_length():
+    """
+    Tests the ``length`` validator.
+    """
+    vdtr = length(1, 3)
+    for v in ["a", "abc", [1, 2], {"a": 1}]:
+        assert vdtr.validate(v) is None
+
+    assert vdtr.validate("") == "'' has length 0, which is less than 1"
+    assert vdtr.validate([1, 2, 3, 4]) == "[1, 2, 3, 4] has length 4, which is greater than 3"
+    assert vdtr.validate(1) == "1 does not have a length"
+
+    assert length(maximum=0).validate([]) is None
+
+    # test errors
+    with pytest.raises(ValueError):
+        length()
+
+
+def test_each():
+    """
+    Tests the ``each`` validator.
+    """
+    vdtr = each(range_(0, 10))
+    for v in [[], [1, 2, 3], (0, 10), np.array([1.0, 2.5]), np.arange(10).reshape(2, 5)]:
+        assert vdtr.validate(v) is None
+
+    assert vdtr.validate([1, 11]) == "invalid element at index 1: 11 is greater than 10"
+    assert vdtr.validate(np.array([1, -1, 11])) == "invalid element at index 1: -1 is less than 0"
+    assert vdtr.validate(np.array([[1, 2], [3, 11]])) == \
+        "invalid element at index (1, 1): 11 is greater than 10"
+    assert vdtr.validate(np.array(["a"])) == \
+        "invalid element at index 0: 'a' cannot be compared to 0 and 10"
+    assert vdtr.validate(1) == "1 is not a list"
+    assert vdtr.validate("abc") == "'abc' is not a list"
+
+    # arrays are checked without calling the inner validator for each element
+    inner = range_(0, 10)
+    with mock.patch.object(inner, "validate", wraps=inner.validate) as wrapped_validate:
+        assert each(inner).validate(np.arange(10 ** 5) % 10) is None
+        wrapped_validate.assert_not_called()
+
+    # inner validators without batched implementations are called for each element
+    vdtr = each(all_of(regex("[a-z]+"), length(maximum=3)))
+    assert vdtr.validate(["a", "bc"]) is None
+    assert vdtr.validate(np.array(["a", "bc"])) is None
+    assert vdtr.validate(["a", "bcde"]) == \
+        "invalid element at index 1: 'bcde' has length 4, which is greater than 3"
+
+    assert each(each(choice([1, 2]))).validate([[1], [2, 3]]) == \
+        "invalid element at index 1: invalid element at index 1: 3 is not one of {1, 2}"
+
+
+def test_cached():
+    """
+    Tests the ``cached`` validator.
+    """
+    func = mock.Mock(side_effect=lambda x: None if x % 2 == 0 else f"{x} is not even")
+    vdtr = cached(validator(func), maxsize=2)
+    assert vdtr.cache_info() == CacheInfo(0, 0, 2, 0)
+
+    assert vdtr.validate(2) is None
+    assert vdtr.validate(3) == "3 is not even"
+    assert vdtr.validate(2) is None
+    assert vdtr.validate(3) == "3 is not even"
+    assert func.call_count == 2
+    assert vdtr.cache_info() == CacheInfo(2, 2, 2, 2)
+
+    # values of different types are cached separately
+    assert vdtr.validate(2.0) is None
+    assert func.call_count == 3
+
+    # as are tuples and frozensets whose elements are of different types
+    tuple_vdtr = cached(validator(lambda x: f"{x!r} is invalid"), maxsize=None)
+    values = [
+        (1, ), (True, ), (1.0, ), ((1, ), ), ((True, ), ), frozenset({1}), frozenset({True}),
+        frozenset({(1, )}), frozenset({(1.0, )}),
+    ]
+    for v in values:
+        assert tuple_vdtr.validate(v) == f"{v!r} is invalid"
+    assert tuple_vdtr.cache_info() == CacheInfo(0, len(values), None, len(values))
+    assert tuple_vdtr.validate((1, )) == "(1,) is invalid"
+    assert tuple_vdtr.cache_info().hits == 1
+
+    # tuples containing unhashable values bypass the cache
+    assert tuple_vdtr.validate((1, [2])) == "(1, [2]) is invalid"
+    assert tuple_vdtr.cache_info().currsize == len(values)
+
+    # the least recently used value is evicted
+    assert vdtr.cache_info().currsize == 2
+    vdtr.validate(3)
+    vdtr.validate(2)
+    assert func.call_count == 4
+
+    # unhashable values bypass the cache
+    list_vdtr = cached(length(maximum=1))
+    assert list_vdtr.validate([1]) is None
+    assert list_vdtr.validate([1, 2]) is not None
+    assert list_vdtr.cache_info() == CacheInfo(0, 0, 128, 0)
+
+    vdtr.cache_clear()
+    assert vdtr.cache_info() == CacheInfo(0, 0, 2, 0)
+
+    # test unbounded and disabled caches
+    vdtr = cached(range_(0, 10), maxsize=None)
+    for i in range(1000):
+        vdtr.validate(i)
+    assert vdtr.cache_info() == CacheInfo(0, 1000, None, 1000)
+
+    vdtr = cached(range_(0, 10), maxsize=0)
+    vdtr.validate(1)
+    vdtr.validate(1)
+    assert vdtr.cache_info() == CacheInfo(0, 2, 0, 0)
+
+    # test sharing the cache between threads
+    func = mock.Mock(return_value=None)
+    vdtr = cached(validator(func), maxsize=64)
+    threads = [
+        threading.Thread(target=lambda: [vdtr.validate(i % 100) for i in range(1000)])
+        for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    info = vdtr.cache_info()
+    assert info.hits + info.misses == 8000
+    assert info.currsize == 64
@@ -0,0 +1,121 @@
+"""Tests for ``fica._yaml``"""
+
+import io
+import pytest
+import random
+import string
+import yaml
+
+from unittest import mock
+
+from fica import _yaml
+from fica.exporter import YamlExporter
+from fica.loader import iter_yaml_items
+
+from .utils import make_documented_config
+
+
+pytestmark = pytest.mark.skipif(not _yaml.LIBYAML_AVAILABLE, reason="libyaml is not available")
+
+
+def generate_value(rng: random.Random, depth: int = 0):
+    """
+    Generate a random value containing nested lists and dicts of strings and other scalars.
+    """
+    def generate_string(max_len):
+        chars = string.printable + "ü\u0085 \U0001F600\x00"
+        return "".join(rng.choice(chars) for _ in range(rng.randint(0, max_len)))
+
+    r = rng.random()
+    if depth < 3 and r < 0.2:
+        return [generate_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    if depth < 3 and r < 0.4:
+        return {
+            generate_string(rng.choice([10, 130])): generate_value(rng, depth + 1)
+            for _ in range(rng.randint(0, 4))
+        }
+    return rng.choice([
+        generate_string(rng.choice([5, 30, 150])),
+        rng.randint(-10 ** 20, 10 ** 20),
+        rng.random() * 10 ** rng.randint(-5, 20),
+        None,
+        rng.random() < 0.5,
+        (1, 2),
+    ])
+
+
+def test_dump_parity():
+    """
+    Tests that ``dump`` produces the same output as PyYAML's pure-Python dumper.
+    """
+    rng, n_libyaml = random.Random(42), 0
+    for _ in range(1000):
+        value = {"key": generate_value(rng), "list": [generate_value(rng)]}
+        for kwargs in [{}, {"indent": 2, "sort_keys": False}]:
+            expected = yaml.dump(value, Dumper=yaml.Dumper, **kwargs)
+            assert _yaml.dump(value, **kwargs) == expected
+
+            # check libyaml's output directly for values that it is used for
+            if _yaml._emits_identically(value):
+                n_libyaml += 1
+                assert yaml.dump(value, Dumper=yaml.CDumper, **kwargs) == expected
+
+    # make sure that a substantial portion of the values were dumped with libyaml
+    assert n_libyaml > 300
+
+    for value in [1, "a", None, [], {}, [1, "a"], {"a": [1.5, True]}, ("a", )]:
+        assert _yaml.dump(value) == yaml.dump(value, Dumper=yaml.Dumper)
+
+
+def test__emits_identically():
+    """
+    Tests for ``_emits_identically``.
+    """
+    for value in [[], {}, [1, 1.5, "a b", None, True], {"a": {"b": ["c: d", "'e'"]}}, {"a" * 100: 1}]:
+        assert _yaml._emits_identically(value)
+
+    for value in [1, "a", None, (1, ), {"": 1}, {"a" * 101: 1}, {1: "a"}, ["ü"], ["a\nb"],
+            [{"a": "\t"}], [set()]]:
+        assert not _yaml._emits_identically(value)
+
+
+def test_dump_uses_libyaml():
+    """
+    Tests that ``dump`` only uses libyaml when it is available and the output would be identical.
+    """
+    with mock.patch("yaml.dump") as mocked_dump:
+        _yaml.dump({"a": 1}, indent=2)
+        mocked_dump.assert_called_once_with({"a": 1}, Dumper=yaml.CDumper, indent=2)
+
+        mocked_dump.reset_mock()
+        _yaml.dump({"a": "ü"})
+        mocked_dump.assert_called_once_with({"a": "ü"}, Dumper=yaml.Dumper)
+
+        mocked_dump.reset_mock()
+        with mock.patch("fica._yaml.LIBYAML_AVAILABLE", False):
+            _yaml.dump({"a": 1})
+        mocked_dump.assert_called_once_with({"a": 1}, Dumper=yaml.Dumper)
+
+
+def test_export_parity(sample_config):
+    """
+    Tests that exporting configs produces the same output with and without libyaml.
+    """
+    exporter = YamlExporter()
+    for config in [sample_config, make_documented_config(20, 2)]:
+        exported = exporter.export(config)
+        with mock.patch("fica._yaml.LIBYAML_AVAILABLE", False):
+            assert exporter.export(config) == exported
+
+
+def test_load_parity():
+    """
+    Tests that YAML documents are loaded the same way with and without libyaml.
+    """
+    rng = random.Random(0)
+    for _ in range(300):
+        value = {"key": generate_value(rng), "list": [generate_value(rng)]}
+        contents = yaml.dump(value, Dumper=yaml.SafeDumper)
+        assert _yaml.safe_load(contents) == yaml.safe_load(contents)
+        assert list(iter_yaml_items(io.StringIO(contents), mock.Mock())) == \
+            list(yaml.safe_load(contents).items())
@@ -1,8 +1,13 @@
 """Testing utilities"""
 
 import numpy as np
+import time
 
-from typing import Any, Dict, List
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Type
+from unittest import mock
+
+from fica import Config, Key
 
 
 def assert_object_attrs(obj: Any, attrs: Dict[str, Any]) -> None:
@@ -66,3 +71,103 @@ class CustomIterable:
             self.idx = -1
             raise StopIteration
         return self.lst[self.idx]
+
+
+def make_flat_config(n_keys: int) -> Type[Config]:
+    """
+    Create a :py:class:`fica.Config` subclass with ``n_keys`` typed integer keys named ``k0``,
+    ``k1``, etc.
+
+    Args:
+        n_keys (``int``): the number of keys to create
+
+    Returns:
+        ``type[fica.Config]``: the generated config class
+    """
+    return type(f"Flat{n_keys}Config", (Config, ), {
+        f"k{i}": Key(default=i, type_=int) for i in range(n_keys)
+    })
+
+
+def make_documented_config(n_keys: int, depth: int) -> Type[Config]:
+    """
+    Create a :py:class:`fica.Config` subclass with ``n_keys`` described keys with scalar defaults of
+    various types and three keys whose subkey container is a config created by this function with
+    depth ``depth - 1`` (if ``depth`` is positive).
+
+    Args:
+        n_keys (``int``): the number of keys with scalar defaults at each level
+        depth (``int``): the number of levels of nesting
+
+    Returns:
+        ``type[fica.Config]``: the generated config class
+    """
+    attrs = {}
+    for i in range(n_keys):
+        default = [f"value {i}", i, i / 2, i % 2 == 0, None][i % 5]
+        attrs[f"key_{i}"] = Key(description=f"the value of key {i}", default=default)
+
+    if depth > 0:
+        subkey_container = make_documented_config(n_keys, depth - 1)
+        for i in range(3):
+            attrs[f"nested_{i}"] = Key(
+                description=f"nested config {i}", subkey_container=subkey_container)
+
+    return type(f"Documented{depth}Config", (Config, ), attrs)
+
+
+def make_half_user_config(config_cls: Type[Config]) -> Dict[str, Any]:
+    """
+    Create a user config that specifies every other scalar key of a config and all of its subkey
+    containers, recursively.
+
+    Args:
+        config_cls (``type[fica.Config]``): the config class
+
+    Returns:
+        ``dict[str, object]``: the user config
+    """
+    schema, user_config = config_cls._get_schema(), {}
+    for i, (name, attr) in enumerate(schema.names_to_attrs.items()):
+        if attr in schema.subkey_containers:
+            user_config[name] = make_half_user_config(schema.subkey_containers[attr])
+        elif i % 2 == 0:
+            user_config[name] = schema.keys[attr].default
+    return user_config
+
+
+def best_time(fn: Callable[[], Any], number: int = 10, repeat: int = 5) -> float:
+    """
+    Time ``fn`` and return the fastest average time per call in seconds across ``repeat`` runs of
+    ``number`` calls each.
+
+    Args:
+        fn (``callable[[], object]``): the function to time
+        number (``int``): the number of calls per run
+        repeat (``int``): the number of runs
+
+    Returns:
+        ``float``: the best time per call
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+@contextmanager
+def generic_routines() -> Iterator[None]:
+    """
+    A context manager that makes configs use the generic population and validation routines
+    instead of those generated for their classes.
+    """
+    with mock.patch("fica.config.GENERATE_AFTER", float("inf")):
+        # discard the cached schemas of all config classes along with their generated routines
+        Config._invalidate_schema()
+        try:
+            yield
+        finally:
+            Config._invalidate_schema()